@@ -0,0 +1,330 @@
+"""
+Run this file to time the parser.
+
+``python benchmark.py``
+
+Or pass the names of the benchmarks to run.
+
+``python benchmark.py threads``
+
+Timings are only comparable between runs on the same machine and
+interpreter build.
+"""
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import os
+import sys
+import threading
+import time
+
+from nameparser import HumanName
+from nameparser import Parser
+from nameparser.config import Constants
+from tests import TEST_NAMES
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+@benchmark
+def threads(rounds=20):
+    """
+    Parse the test names from 1, 2, 4 and 8 threads sharing one thread safe
+    config. Throughput only scales with the thread count on interpreters
+    without a GIL.
+    """
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print("GIL enabled: {0}".format(gil))
+    constants = Constants()
+    constants.thread_safe = True
+    names = list(TEST_NAMES) * rounds
+
+    def work():
+        for name in names:
+            HumanName(name, constants)
+
+    base = None
+    for count in (1, 2, 4, 8):
+        workers = [threading.Thread(target=work) for i in range(count)]
+        start = time.time()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        rate = len(names) * count / (time.time() - start)
+        base = base or rate
+        print("{0} threads: {1:,.0f} names/s ({2:.2f}x)".format(count, rate, rate / base))
+
+
+@benchmark
+def batch(rounds=50):
+    """
+    Parse the test names with Parser.parse_many and with Parser.parse_batch,
+    which classifies each distinct token only once.
+    """
+    names = list(TEST_NAMES) * rounds
+    parser = Parser()
+    for method in (parser.parse_many, parser.parse_batch):
+        start = time.time()
+        method(names)
+        rate = len(names) / (time.time() - start)
+        print("{0}: {1:,.0f} names/s".format(method.__name__, rate))
+
+
+@benchmark
+def suffixes(rounds=2000):
+    """
+    Parse names with long runs of suffixes, with and without the plan cache.
+    """
+    names = [
+        "John Smith Jr MD PhD MBA CPA CFA",
+        "Smith, John Jr MD PhD MBA CPA CFA",
+        "John Smith Jr, MD PhD MBA CPA CFA",
+        "Dr. John Q. Public III Esq. CPA CFA CFP ChFC CLU",
+    ]
+    constants = Constants()
+    uncached = Constants()
+    uncached.thread_safe = True
+    for label, config in (("plan cache", constants), ("no plan cache", uncached)):
+        start = time.time()
+        for i in range(rounds):
+            for name in names:
+                HumanName(name, config)
+        rate = rounds * len(names) / (time.time() - start)
+        print("{0}: {1:,.0f} names/s".format(label, rate))
+
+
+@benchmark
+def capitalize(rounds=50):
+    """
+    Parse the lower cased test names with and without capitalize_name.
+    """
+    names = [name.lower() for name in TEST_NAMES] * rounds
+    plain = Constants()
+    capitalized = Constants()
+    capitalized.capitalize_name = True
+    for label, config in (("parse", plain), ("parse and capitalize", capitalized)):
+        start = time.time()
+        for name in names:
+            HumanName(name, config)
+        rate = len(names) / (time.time() - start)
+        print("{0}: {1:,.0f} names/s".format(label, rate))
+
+
+@benchmark
+def initials(rounds=50):
+    """
+    Build initials and initials lists for the test names one name at a time
+    and with Parser.initials_many.
+    """
+    names = list(TEST_NAMES) * rounds
+    parser = Parser()
+    start = time.time()
+    for name in names:
+        hn = HumanName(name)
+        hn.initials()
+        hn.initials_list()
+    print("one at a time: {0:,.0f} names/s".format(len(names) / (time.time() - start)))
+    start = time.time()
+    parsed = parser.parse_many(names)
+    parser.initials_many(parsed)
+    parser.initials_many(parsed, as_list=True)
+    print("initials_many: {0:,.0f} names/s".format(len(names) / (time.time() - start)))
+
+
+@benchmark
+def render(rounds=50):
+    """
+    Render the parsed test names with str() one at a time and with
+    Formatter.render_many.
+    """
+    parsed = Parser().parse_many(list(TEST_NAMES) * rounds)
+    start = time.time()
+    for name in parsed:
+        str(name)
+    print("str: {0:,.0f} names/s".format(len(parsed) / (time.time() - start)))
+    formatter = parsed[0].formatter(parsed[0].string_format)
+    start = time.time()
+    formatter.render_many(parsed)
+    print("render_many: {0:,.0f} names/s".format(len(parsed) / (time.time() - start)))
+
+
+@benchmark
+def dedup(rounds=50):
+    """
+    Remove duplicates from the parsed test names with a set, which compares
+    names by their canonical key and fingerprint.
+    """
+    parsed = Parser().parse_many(list(TEST_NAMES) * rounds)
+    start = time.time()
+    unique = set(parsed)
+    rate = len(parsed) / (time.time() - start)
+    print("{0:,} names, {1:,} unique: {2:,.0f} names/s".format(len(parsed), len(unique), rate))
+
+
+@benchmark
+def sort(rounds=50):
+    """
+    Sort the parsed test names by their sort keys, ignoring last name
+    prefixes.
+    """
+    from nameparser.sorting import sort_names
+    parsed = Parser().parse_many(list(TEST_NAMES) * rounds)
+    for label in ("first sort", "sorted again"):
+        start = time.time()
+        sort_names(parsed, policy='ignore_prefixes')
+        rate = len(parsed) / (time.time() - start)
+        print("{0}: {1:,.0f} names/s".format(label, rate))
+
+
+@benchmark
+def index(rounds=50, queries=1000):
+    """
+    Build a NameIndex of the parsed test names and time a conjunctive query.
+    """
+    from nameparser.index import NameIndex
+    parsed = Parser().parse_many(list(TEST_NAMES) * rounds)
+    start = time.time()
+    name_index = NameIndex()
+    name_index.add_many(parsed)
+    print("add: {0:,.0f} names/s".format(len(parsed) / (time.time() - start)))
+    for terms in (dict(last='smith', first_initial='j'), dict(last='doe', first_initial='j')):
+        start = time.time()
+        for i in range(queries):
+            found = name_index.search(**terms)
+        print("search {0}: {1:,} found, {2:,.1f}us/query".format(
+            terms, len(found), (time.time() - start) / queries * 1e6))
+
+
+@benchmark
+def blocking(rounds=50):
+    """
+    Parse the test names and generate their blocking keys in one stream.
+    """
+    from nameparser.blocking import BlockingKeys
+    names = list(TEST_NAMES) * rounds
+    blocker = BlockingKeys()
+    start = time.time()
+    for name, keys in blocker.stream(names):
+        pass
+    print("parse and block: {0:,.0f} names/s".format(len(names) / (time.time() - start)))
+
+
+@benchmark
+def phonetics(rounds=50):
+    """
+    Parse the test names with and without Soundex and Double Metaphone codes
+    for the first and last names.
+    """
+    names = list(TEST_NAMES) * rounds
+    plain = Constants()
+    encoded = Constants()
+    encoded.phonetic_encoders = ('soundex', 'double_metaphone')
+    for label, config in (("parse", plain), ("parse and encode", encoded)):
+        start = time.time()
+        for name in names:
+            HumanName(name, config)
+        rate = len(names) / (time.time() - start)
+        print("{0}: {1:,.0f} names/s".format(label, rate))
+
+
+@benchmark
+def lsh(rounds=50):
+    """
+    Parse the test names into an LSH index and group the near duplicates.
+    """
+    from nameparser.lsh import LSHIndex
+    names = list(TEST_NAMES) * rounds
+    index = LSHIndex()
+    start = time.time()
+    index.add_many(names)
+    rate = len(names) / (time.time() - start)
+    print("parse and insert: {0:,.0f} names/s".format(rate))
+    start = time.time()
+    clusters = index.clusters()
+    print("clusters: {0:,} in {1:.3f}s".format(len(clusters), time.time() - start))
+
+
+@benchmark
+def compare(rounds=20):
+    """
+    Score every pair of the parsed test names.
+    """
+    from nameparser.compare import compare_many
+    names = [HumanName(name) for name in TEST_NAMES]
+    pairs = [(a, b) for a in names for b in names] * rounds
+    start = time.time()
+    compare_many(pairs)
+    print("compare: {0:,.0f} pairs/s".format(len(pairs) / (time.time() - start)))
+
+
+@benchmark
+def search(rounds=50, k=10):
+    """
+    Load the test names into a search corpus and look each of them up.
+    """
+    from nameparser.search import NameSearch
+    corpus = NameSearch()
+    start = time.time()
+    corpus.add_many(list(TEST_NAMES) * rounds)
+    print("parse and add: {0:,.0f} names/s".format(len(corpus) / (time.time() - start)))
+    start = time.time()
+    for name in TEST_NAMES:
+        corpus.search(name, k=k)
+    print("search: {0:,.2f}ms/query".format((time.time() - start) / len(TEST_NAMES) * 1e3))
+
+
+@benchmark
+def registry(tenants=20, rounds=50):
+    """
+    Parse the test names for tenants with their own titles, building a
+    config per request versus getting it from a config registry.
+    """
+    from nameparser.config.registry import ConfigRegistry
+    layers = [{'titles': ['tenant{0}'.format(i)]} for i in range(tenants)]
+    configs = ConfigRegistry()
+    for label, get in (("config per request", lambda layer: Constants().apply_layer(layer)),
+                       ("registry", configs.get)):
+        start = time.time()
+        for i in range(rounds):
+            for layer in layers:
+                constants = get(layer)
+                HumanName(TEST_NAMES[i % len(TEST_NAMES)], constants)
+        rate = rounds * tenants / (time.time() - start)
+        print("{0}: {1:,.0f} requests/s".format(label, rate))
+    print(configs.stats())
+
+
+@benchmark
+def packs(titles=100000):
+    """
+    Load a pack of generated titles into a config, building it and then
+    loading the compiled config from the on-disk cache.
+    """
+    import json
+    import shutil
+    import tempfile
+    from nameparser.config.packs import load_packs
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'titles.json')
+        with open(path, 'w') as f:
+            json.dump({'titles': ["Title{0}.".format(i) for i in range(titles)]}, f)
+        cache = os.path.join(directory, 'cache')
+        for label in ("build", "cached"):
+            start = time.time()
+            load_packs(path, cache_dir=cache)
+            print("{0}: {1:.3f}s".format(label, time.time() - start))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or sorted(BENCHMARKS):
+        print("-"*80)
+        print(name)
+        BENCHMARKS[name]()
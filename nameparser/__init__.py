@@ -7,3 +7,4 @@ __url__ = "https://github.com/derek73/python-nameparser"
 
 
 from nameparser.parser import HumanName
+from nameparser.parser import Parser
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for parsing names from asyncio applications without blocking the
+event loop.
+
+Parsing is pure Python and CPU bound, so running a single
+:py:class:`~nameparser.parser.HumanName` per ``run_in_executor()`` call costs
+more in scheduling than the parse itself. :py:func:`aparse_many` instead sends
+names to an executor in batches and yields the parsed results back to the
+caller as each batch completes.
+
+::
+
+    >>> from nameparser.aio import aparse_many
+    >>> async def main(names):
+    ...     async for name in aparse_many(names, batch_size=1000):
+    ...         print(name.last)
+
+Requires Python 3.7+.
+"""
+import asyncio
+import collections
+import functools
+
+from nameparser.parser import HumanName
+from nameparser.config import CONSTANTS
+from nameparser.config import Constants
+
+DEFAULT_BATCH_SIZE = 500
+"""
+Number of names sent to the executor in a single job.
+"""
+
+DEFAULT_MAX_PENDING = 2
+"""
+Number of batches allowed to be in flight in the executor at once.
+"""
+
+
+def parse_batch(names, constants=CONSTANTS):
+    """
+    Parse a list of name strings and return a list of
+    :py:class:`~nameparser.parser.HumanName` instances. This is the function
+    run in the executor by :py:func:`aparse_many`. All names in the batch
+    share one config, even when ``constants`` is ``None``.
+    """
+    if constants is None:
+        constants = Constants()
+    return [HumanName(name, constants) for name in names]
+
+
+async def _chunks(names, batch_size):
+    chunk = []
+    if hasattr(names, '__aiter__'):
+        async for name in names:
+            chunk.append(name)
+            if len(chunk) >= batch_size:
+                yield chunk
+                chunk = []
+    else:
+        for name in names:
+            chunk.append(name)
+            if len(chunk) >= batch_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+async def aparse_many(names, constants=CONSTANTS, executor=None,
+                      batch_size=DEFAULT_BATCH_SIZE,
+                      max_pending=DEFAULT_MAX_PENDING):
+    """
+    Asynchronously parse an iterable of name strings, yielding
+    :py:class:`~nameparser.parser.HumanName` instances in input order.
+
+    Names are grouped into batches of ``batch_size`` and each batch is parsed
+    by :py:func:`parse_batch` in ``executor`` (the loop's default thread pool
+    if ``None``). The event loop is free to run other tasks while a batch is
+    being parsed.
+
+    At most ``max_pending`` batches are submitted ahead of the consumer, so a
+    slow consumer applies backpressure to the reads from ``names`` instead of
+    buffering the whole input. If the consumer stops iterating or the task is
+    cancelled, batches that have not started yet are cancelled.
+
+    When using a ``ProcessPoolExecutor``, the module-level config is used in
+    the worker processes unless you pass your own ``constants``; changes made
+    to :py:data:`~nameparser.config.CONSTANTS` at runtime are not seen by the
+    workers.
+
+    :param names: iterable or async iterable of name strings
+    :param constants constants:
+        a :py:class:`~nameparser.config.Constants` instance. Pass ``None`` to
+        give the results their own config.
+    :param executor: a :py:class:`concurrent.futures.Executor`
+    :param int batch_size: number of names parsed per executor job
+    :param int max_pending: number of batches submitted ahead of the consumer
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+    if constants is None:
+        constants = Constants()
+
+    if constants is CONSTANTS:
+        # let each worker use its own module-level config rather than
+        # sending it along with every batch
+        job = parse_batch
+    else:
+        job = functools.partial(parse_batch, constants=constants)
+
+    loop = asyncio.get_running_loop()
+    pending = collections.deque()
+    try:
+        async for chunk in _chunks(names, batch_size):
+            pending.append(loop.run_in_executor(executor, job, chunk))
+            if len(pending) < max_pending:
+                continue
+            for name in await pending.popleft():
+                name.C = constants
+                yield name
+        while pending:
+            for name in await pending.popleft():
+                name.C = constants
+                yield name
+    finally:
+        for future in pending:
+            future.cancel()
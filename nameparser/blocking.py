@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Blocking keys for record linkage. Names that share a blocking key are
+candidate matches worth comparing; names that share none are never compared.
+
+:py:class:`BlockingKeys` normalizes the components of a parsed name once and
+emits every configured key from them, so a stream of names can be parsed and
+blocked in a single stage.
+
+::
+
+    >>> from nameparser.blocking import BlockingKeys
+    >>> blocker = BlockingKeys()
+    >>> for name, keys in blocker.stream(["Bob van Dyke", "Robert Van Dijk"]):
+    ...     print(keys)
+    ['last_prefix=dyk', 'first_initial=b&last_soundex=D200', 'first_name=robert&last_soundex=D200']
+    ['last_prefix=dij', 'first_initial=r&last_soundex=D200', 'first_name=robert&last_soundex=D200']
+
+"""
+from __future__ import unicode_literals
+
+from nameparser.util import lc
+from nameparser.config.nicknames import NICKNAMES
+from nameparser.parser import HumanName
+from nameparser.parser import Parser
+from nameparser.phonetics import ENCODERS
+
+
+def last_prefix(parts, blocker):
+    """The first ``prefix_length`` characters of the last name."""
+    return parts['last'][:blocker.prefix_length]
+
+
+def first_initial(parts, blocker):
+    """The first letter of the first name."""
+    return parts['first'][:1]
+
+
+def last_soundex(parts, blocker):
+    """The :py:func:`~nameparser.phonetics.soundex` code of the last name."""
+    return ENCODERS['soundex'](parts['last'])
+
+
+def first_name(parts, blocker):
+    """The first name, with nicknames replaced by the formal name."""
+    return blocker.nicknames.get(parts['first'], parts['first'])
+
+
+#: The key components available by name.
+KEY_FUNCTIONS = {
+    'last_prefix': last_prefix,
+    'first_initial': first_initial,
+    'last_soundex': last_soundex,
+    'first_name': first_name,
+}
+
+#: The keys emitted by default. A tuple combines several components into one
+#: key.
+DEFAULT_KEYS = (
+    'last_prefix',
+    ('first_initial', 'last_soundex'),
+    ('first_name', 'last_soundex'),
+)
+
+
+class BlockingKeys(object):
+    """
+    A configurable blocking key generator. Calling it with a parsed name
+    returns a list of key strings like ``'last_prefix=smi'`` or
+    ``'first_initial=j&last_soundex=S530'``. Keys with an empty component
+    are left out.
+
+    :param keys: the keys to emit; names in :py:data:`KEY_FUNCTIONS`, tuples
+        of them, or functions taking the normalized components and the
+        generator
+    :param int prefix_length: length of the ``last_prefix`` key
+    :param dict nicknames: lower case nicknames and the formal first name to
+        use for ``first_name``, by default
+        :py:data:`~nameparser.config.nicknames.NICKNAMES`
+    :param bool ignore_prefixes: skip leading last name words in the name's
+        :py:attr:`~nameparser.config.Constants.prefixes`, so "van Dyke"
+        blocks with "Dyke"
+    :param Parser parser: parser used for names given as strings
+    """
+
+    def __init__(self, keys=DEFAULT_KEYS, prefix_length=3, nicknames=None,
+                 ignore_prefixes=True, parser=None):
+        self.prefix_length = prefix_length
+        self.nicknames = NICKNAMES if nicknames is None else nicknames
+        self.ignore_prefixes = ignore_prefixes
+        self.parser = parser or Parser()
+        self.keys = []
+        for key in keys:
+            parts = key if isinstance(key, tuple) else (key,)
+            labels = []
+            functions = []
+            for part in parts:
+                if callable(part):
+                    labels.append(part.__name__)
+                    functions.append(part)
+                elif part in KEY_FUNCTIONS:
+                    labels.append(part)
+                    functions.append(KEY_FUNCTIONS[part])
+                else:
+                    raise ValueError("Unknown blocking key: {0}".format(part))
+            self.keys.append((tuple(labels), tuple(functions)))
+
+    def __repr__(self):
+        return "<BlockingKeys() {0} keys>".format(len(self.keys))
+
+    def components(self, name):
+        """
+        Return the normalized components of a parsed name that the keys are
+        built from: ``first``, ``middle`` and ``last``, lower case without
+        periods.
+
+        :rtype: dict
+        """
+        last = lc(" ".join(name.last_list))
+        if self.ignore_prefixes:
+            words = last.split(" ")
+            i = 0
+            while i < len(words) - 1 and words[i] in name.C.prefixes:
+                i += 1
+            last = " ".join(words[i:])
+        return {
+            'first': lc(" ".join(name.first_list)),
+            'middle': lc(" ".join(name.middle_list)),
+            'last': last,
+        }
+
+    def __call__(self, name):
+        """
+        Return the blocking keys of a name.
+
+        :param name: a :py:class:`~nameparser.parser.HumanName` or a name string
+        :rtype: list
+        """
+        if not isinstance(name, HumanName):
+            name = self.parser.parse(name)
+        parts = self.components(name)
+        keys = []
+        for labels, functions in self.keys:
+            values = [function(parts, self) for function in functions]
+            if all(values):
+                keys.append("&".join(["{0}={1}".format(label, value)
+                                      for label, value in zip(labels, values)]))
+        return keys
+
+    def stream(self, names):
+        """
+        Parse and block an iterable of names as they are read, yielding
+        ``(name, keys)`` pairs.
+
+        :param names: iterable of :py:class:`~nameparser.parser.HumanName`
+            instances or name strings
+        """
+        parse = self.parser.parse
+        for name in names:
+            if not isinstance(name, HumanName):
+                name = parse(name)
+            yield name, self(name)
+
+    def block(self, names):
+        """
+        Group an iterable of names by blocking key.
+
+        :param names: iterable of :py:class:`~nameparser.parser.HumanName`
+            instances or name strings
+        :return: a dictionary of each key and the list of parsed names with it
+        :rtype: dict
+        """
+        blocks = {}
+        for name, keys in self.stream(names):
+            for key in keys:
+                blocks.setdefault(key, []).append(name)
+        return blocks
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Pairwise comparison of parsed names, component by component.
+
+:py:func:`compare` scores two names between 0 and 1. It looks at the
+cheapest evidence first and returns 0 as soon as the names conflict:
+
+* Last names must be equal, or equal once leading
+  :py:attr:`~nameparser.config.Constants.prefixes` are skipped, so
+  "van Dyke" matches "Dyke".
+* Generational suffixes must not differ, so "Jr." conflicts with "Sr." and
+  "II" with "III". Other suffixes like "PhD" are ignored.
+* First names must be equal, or one must be an initial of the other as
+  decided by :py:meth:`~nameparser.parser.HumanName.is_an_initial`.
+* Middle names are compared piece by piece the same way.
+
+A component missing from either name counts as unknown rather than as a
+conflict. Titles and nicknames are not compared.
+
+::
+
+    >>> from nameparser import HumanName
+    >>> from nameparser.compare import compare
+    >>> compare(HumanName("John A. Smith"), HumanName("J. Smith"))
+    0.855
+    >>> compare(HumanName("John Smith Jr."), HumanName("John Smith Sr."))
+    0.0
+
+"""
+from __future__ import unicode_literals
+
+from nameparser.util import lc
+from nameparser.parser import HumanName
+from nameparser.parser import Parser
+from nameparser.sorting import ignore_prefixes
+
+#: The weight of each component in the score.
+WEIGHTS = {
+    'last': 0.5,
+    'first': 0.35,
+    'middle': 0.15,
+}
+
+#: Score of a component that matches but is abbreviated in one name, i.e. an
+#: initial, or a last name with its prefixes left out.
+PARTIAL = 0.8
+
+#: Score of a component that is missing from one of the names.
+UNKNOWN = 0.5
+
+_JUNIOR = frozenset(['jr', 'jnr', 'junior'])
+_SENIOR = frozenset(['sr', 'snr'])
+
+
+def generations(name):
+    """
+    Return the set of generational suffixes of a name, like ``'jr'``,
+    ``'sr'`` or ``'iii'``. Only suffixes in the name's
+    :py:attr:`~nameparser.config.Constants.suffix_not_acronyms` count, and
+    spelling variants like "Jnr." are normalized.
+
+    :param name: a :py:class:`~nameparser.parser.HumanName`
+    :rtype: set
+    """
+    found = set()
+    for piece in name.suffix_list:
+        value = lc(piece)
+        if value not in name.C.suffix_not_acronyms:
+            continue
+        if value in _JUNIOR:
+            found.add('jr')
+        elif value in _SENIOR:
+            found.add('sr')
+        elif value.isdigit() or name.is_roman_numeral(value):
+            found.add(value)
+    return found
+
+
+def _given(a, a_pieces, b, b_pieces):
+    # score of two lists of given name pieces that are not equal
+    if not a_pieces or not b_pieces:
+        return UNKNOWN
+    partial = len(a_pieces) != len(b_pieces)
+    for x, y in zip(a_pieces, b_pieces):
+        x_value, y_value = lc(x), lc(y)
+        if x_value == y_value:
+            continue
+        if x_value[:1] != y_value[:1] \
+                or not (a.is_an_initial(x) or b.is_an_initial(y)):
+            return 0.0
+        partial = True
+    return PARTIAL if partial else 1.0
+
+
+def compare(a, b):
+    """
+    Score how likely two parsed names are to be the same person, between
+    0.0 for conflicting names and 1.0 for names with equal first, middle and
+    last names and no conflicting suffixes.
+
+    :param a: a :py:class:`~nameparser.parser.HumanName`
+    :param b: a :py:class:`~nameparser.parser.HumanName`
+    :rtype: float
+    """
+    a_key, b_key = a.canonical_key(), b.canonical_key()
+    if a_key == b_key:
+        return 1.0
+    title, a_first, a_middle, a_last, a_suffix, nickname = a_key
+    title, b_first, b_middle, b_last, b_suffix, nickname = b_key
+
+    if a_last == b_last:
+        last = 1.0
+    elif not a_last or not b_last:
+        last = UNKNOWN
+    elif ignore_prefixes(a, a_key)[0] == ignore_prefixes(b, b_key)[0]:
+        last = PARTIAL
+    else:
+        return 0.0
+
+    if a_suffix != b_suffix:
+        a_generations, b_generations = generations(a), generations(b)
+        if a_generations and b_generations and a_generations != b_generations:
+            return 0.0
+
+    if a_first == b_first:
+        first = 1.0
+    else:
+        first = _given(a, a.first_list, b, b.first_list)
+        if not first:
+            return 0.0
+
+    if a_middle == b_middle:
+        middle = 1.0
+    else:
+        middle = _given(a, a.middle_list, b, b.middle_list)
+        if not middle:
+            return 0.0
+
+    return round(last * WEIGHTS['last'] + first * WEIGHTS['first'] + middle * WEIGHTS['middle'], 6)
+
+
+def compare_many(pairs, parser=None):
+    """
+    Score an iterable of ``(a, b)`` pairs with :py:func:`compare` and return
+    a list of the scores. Names given as strings are parsed once per call
+    no matter how many pairs they appear in.
+
+    :param pairs: iterable of pairs of :py:class:`~nameparser.parser.HumanName`
+        instances or name strings
+    :param Parser parser: parser used for names given as strings
+    :rtype: list
+    """
+    parse = (parser or Parser()).parse
+    parsed = {}
+
+    def get(name):
+        if isinstance(name, HumanName):
+            return name
+        try:
+            return parsed[name]
+        except KeyError:
+            value = parsed[name] = parse(name)
+            return value
+
+    return [compare(get(a), get(b)) for a, b in pairs]
@@ -29,7 +29,10 @@ You can also adjust the configuration of individual instances by passing
 unexpected results. See `Customizing the Parser <customize.html>`_.
 """
 from __future__ import unicode_literals
+import io
+import re
 import sys
+import weakref
 try:
     # Python 3.3+
     from collections.abc import Set
@@ -38,6 +41,7 @@ except ImportError:
 
 from nameparser.util import binary_type
 from nameparser.util import lc
+from nameparser.util import fingerprint64
 from nameparser.config.prefixes import PREFIXES
 from nameparser.config.capitalization import CAPITALIZATION_EXCEPTIONS
 from nameparser.config.conjunctions import CONJUNCTIONS
@@ -46,9 +50,39 @@ from nameparser.config.suffixes import SUFFIX_NOT_ACRONYMS
 from nameparser.config.titles import TITLES
 from nameparser.config.titles import FIRST_NAME_TITLES
 from nameparser.config.regexes import REGEXES
+from nameparser.config.regexes import LazyRegex
+from nameparser.config.lexicon import MappedLexicon
 
 DEFAULT_ENCODING = 'UTF-8'
 
+#: Version of the state written by :py:meth:`Constants.__getstate__`.
+STATE_VERSION = 2
+
+# the parts of a Constants instance that make up its fingerprint and state
+_SETS = ('prefixes', 'suffix_acronyms', 'suffix_not_acronyms', 'titles',
+         'first_name_titles', 'conjunctions')
+_TUPLES = ('capitalization_exceptions', 'regexes')
+_DEFAULTS = {
+    'prefixes': PREFIXES,
+    'suffix_acronyms': SUFFIX_ACRONYMS,
+    'suffix_not_acronyms': SUFFIX_NOT_ACRONYMS,
+    'titles': TITLES,
+    'first_name_titles': FIRST_NAME_TITLES,
+    'conjunctions': CONJUNCTIONS,
+    'capitalization_exceptions': CAPITALIZATION_EXCEPTIONS,
+    'regexes': REGEXES,
+}
+_OPTIONS = ('string_format', 'initials_format', 'initials_delimiter',
+            'empty_attribute_default', 'capitalize_name',
+            'force_mixed_case_capitalization', 'phonetic_encoders', 'thread_safe')
+
+
+def _input_encoding():
+    # the encoding of binary strings added to the config without one
+    if sys.stdin and sys.stdin.encoding:
+        return sys.stdin.encoding
+    return DEFAULT_ENCODING
+
 
 class SetManager(Set):
     '''
@@ -60,24 +94,66 @@ class SetManager(Set):
     when they are add()ed and remove()d and allow passing multiple 
     string arguments to the :py:func:`add()` and :py:func:`remove()` methods.
 
+    A ``frozenset`` passed as ``elements``, like the default lexicons, is
+    shared rather than copied until the first change to this instance, so
+    creating new :py:class:`Constants` instances is cheap.
+
+    Read-only :py:class:`~nameparser.config.lexicon.MappedLexicon` files can
+    be attached with :py:meth:`Constants.attach_lexicon` to extend the set
+    without loading their contents into memory.
+
     '''
 
+    lexicons = ()
+
+    revision = 0
+    """
+    Incremented whenever the set may have changed, so caches built from
+    the set can tell when they are stale.
+    """
+
+    frozen = False
+    """
+    Set by :py:meth:`Constants.freeze`. Changing a frozen set raises
+    ``TypeError``.
+    """
+
     def __init__(self, elements):
-        self.elements = set(elements)
+        if isinstance(elements, frozenset):
+            self.elements = elements
+        else:
+            self.elements = set(elements)
 
     def __call__(self):
+        return self._writable()
+
+    def _writable(self):
+        # copy a shared frozenset on first write
+        if self.frozen:
+            raise TypeError("Cannot change a frozen config set")
+        if isinstance(self.elements, frozenset):
+            self.elements = set(self.elements)
+        self.revision += 1
         return self.elements
 
     def __repr__(self):
         return "SetManager({})".format(self.elements)  # used for docs
 
     def __iter__(self):
-        return iter(self.elements)
+        for value in self.elements:
+            yield value
+        for lexicon in self.lexicons:
+            for value in lexicon:
+                if value not in self.elements:
+                    yield value
 
     def __contains__(self, value):
-        return value in self.elements
+        return value in self.elements \
+            or (bool(self.lexicons) and any(value in l for l in self.lexicons))
 
     def __len__(self):
+        if self.lexicons:
+            return sum(1 for value in self)
         return len(self.elements)
 
     def next(self):
@@ -98,20 +174,32 @@ class SetManager(Set):
         explicit `encoding` parameter to specify the encoding of binary strings that
         are not DEFAULT_ENCODING (UTF-8).
         """
-        stdin_encoding = None
-        if sys.stdin:
-            stdin_encoding = sys.stdin.encoding
-        encoding = encoding or stdin_encoding or DEFAULT_ENCODING
+        encoding = encoding or _input_encoding()
         if type(s) == binary_type:
             s = s.decode(encoding)
-        self.elements.add(lc(s))
+        self._writable().add(lc(s))
 
     def add(self, *strings):
         """
         Add the lower case and no-period version of the string arguments to the set.
         Can pass a list of strings. Returns ``self`` for chaining.
         """
-        [self.add_with_encoding(s) for s in strings]
+        return self.update(strings)
+
+    def update(self, strings, encoding=None):
+        """
+        Add the lower case and no-period version of every string in an
+        iterable to the set, e.g. the lines of a large lexicon. The encoding
+        of binary strings is worked out once for the whole iterable. Returns
+        ``self`` for chaining.
+
+        :param strings: iterable of strings
+        :param str encoding: encoding of binary strings, like for
+            :py:meth:`add_with_encoding`
+        """
+        encoding = encoding or _input_encoding()
+        self._writable().update(
+            lc(s.decode(encoding) if type(s) == binary_type else s) for s in strings)
         return self
 
     def remove(self, *strings):
@@ -119,7 +207,7 @@ class SetManager(Set):
         Remove the lower case and no-period version of the string arguments from the set.
         Returns ``self`` for chaining.
         """
-        [self.elements.remove(lc(s)) for s in strings if lc(s) in self.elements]
+        [self._writable().remove(lc(s)) for s in strings if lc(s) in self.elements]
         return self
 
 
@@ -127,12 +215,59 @@ class TupleManager(dict):
     '''
     A dictionary with dot.notation access. Subclass of ``dict``. Makes the tuple constants 
     more friendly.
+
+    :py:class:`~nameparser.config.regexes.LazyRegex` values are compiled on
+    first access, including through :py:meth:`get`, :py:meth:`values` and
+    :py:meth:`items`, and the compiled pattern is stored in their place.
+
+    ``revision`` is incremented when a value is set or deleted, so caches
+    built from the values can tell when they are stale. Once ``frozen`` is
+    set by :py:meth:`Constants.freeze`, setting or deleting values raises
+    ``TypeError``.
     '''
 
+    revision = 0
+    frozen = False
+
     def __getattr__(self, attr):
         return self.get(attr)
-    __setattr__ = dict.__setitem__
-    __delattr__ = dict.__delitem__
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, LazyRegex):
+            value = value.compile()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def _changed(self):
+        if self.frozen:
+            raise TypeError("Cannot change a frozen config")
+        object.__setattr__(self, 'revision', self.revision + 1)
+
+    def __setitem__(self, key, value):
+        self._changed()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._changed()
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        self._changed()
+        dict.update(self, *args, **kwargs)
+    __setattr__ = __setitem__
+    __delattr__ = __delitem__
 
     def __getstate__(self):
         return dict(self)
@@ -231,6 +366,48 @@ class Constants(object):
 
     """
 
+    phonetic_encoders = ()
+    """
+    Names of the :py:data:`~nameparser.phonetics.ENCODERS` to run on the
+    first and last name while parsing. The codes are stored in
+    :py:attr:`~nameparser.parser.HumanName.phonetic_codes`.
+
+    .. doctest::
+
+        >>> from nameparser.config import CONSTANTS
+        >>> CONSTANTS.phonetic_encoders = ('soundex', 'double_metaphone')
+        >>> name = HumanName("Bob Schmidt")
+        >>> name.phonetic_codes['last_soundex']
+        'S530'
+        >>> name.phonetic_codes['last_double_metaphone']
+        ('XMT', 'SMT')
+
+    """
+
+    thread_safe = False
+    """
+    If set, :py:meth:`~nameparser.parser.HumanName.parse_full_name` does not
+    modify this config while parsing, so a single instance can be shared by
+    parsers running in parallel threads (e.g. on free-threaded Python builds).
+
+    By default the parser remembers new titles and conjunctions it assembles
+    from the input, like "Lt.Gov." or "Mr. and Mrs.", by adding them to the
+    config. In thread safe mode they are only remembered for the name being
+    parsed.
+
+    .. doctest::
+
+        >>> from nameparser.config import Constants
+        >>> constants = Constants()
+        >>> constants.thread_safe = True
+        >>> name = HumanName("Lt.Gov. John Doe", constants=constants)
+        >>> name.title
+        'Lt.Gov.'
+        >>> 'lt.gov' in constants.titles
+        False
+
+    """
+
     def __init__(self,
                  prefixes=PREFIXES,
                  suffix_acronyms=SUFFIX_ACRONYMS,
@@ -250,22 +427,398 @@ class Constants(object):
         self.capitalization_exceptions = TupleManager(capitalization_exceptions)
         self.regexes = TupleManager(regexes)
         self._pst = None
+        self._capitalization_cache = None
+        self._formatters = {}
+        self._fingerprint = None
 
     @property
     def suffixes_prefixes_titles(self):
-        if not self._pst:
-            self._pst = self.prefixes | self.suffix_acronyms | self.suffix_not_acronyms | self.titles
-        return self._pst
+        managers = (self.prefixes, self.suffix_acronyms, self.suffix_not_acronyms, self.titles)
+        # rebuilt when any of the sets was changed or replaced
+        stamp = tuple((id(m), m.revision) for m in managers)
+        if not self._pst or self._pst[0] != stamp:
+            pst = SetManager(set().union(*[m.elements for m in managers]))
+            pst.lexicons = tuple(l for m in managers for l in m.lexicons)
+            self._pst = (stamp, pst)
+        return self._pst[1]
+
+    def load_lexicon(self, path, kind, encoding=DEFAULT_ENCODING):
+        """
+        Add every line of a text file to one of the config sets, skipping
+        blank lines and lines starting with ``#``. The entries are
+        normalized like :py:meth:`SetManager.add` does, in one pass, and
+        :py:attr:`suffixes_prefixes_titles` is rebuilt once, the next time
+        it is used.
+
+        :param str path: the file to read
+        :param str kind: name of the set to extend, e.g. ``'titles'`` or
+            ``'suffix_acronyms'``
+        :param str encoding: encoding of the file
+        :return: the extended :py:class:`SetManager`
+        """
+        manager = getattr(self, kind, None)
+        if not isinstance(manager, SetManager):
+            raise ValueError("Not a lexicon set: {0}".format(kind))
+        with io.open(path, encoding=encoding) as f:
+            manager.update(line for line in (line.strip() for line in f)
+                           if line and not line.startswith('#'))
+        self._pst = None
+        return manager
+
+    def attach_lexicon(self, kind, lexicon):
+        """
+        Extend one of the config sets with a memory mapped lexicon file.
+        Entries in the file are looked up on disk instead of being loaded
+        into the set. They cannot be removed with
+        :py:meth:`~nameparser.config.SetManager.remove`.
+
+        :param str kind: name of the set to extend, e.g. ``'titles'`` or
+            ``'suffix_acronyms'``
+        :param lexicon: path to a file written by
+            :py:func:`~nameparser.config.lexicon.write_lexicon`, or a
+            :py:class:`~nameparser.config.lexicon.MappedLexicon`
+        :return: the extended :py:class:`SetManager`
+        """
+        manager = getattr(self, kind)
+        if not isinstance(manager, SetManager):
+            raise ValueError("Not a lexicon set: {0}".format(kind))
+        if manager.frozen:
+            raise TypeError("Cannot change a frozen config set")
+        if not isinstance(lexicon, MappedLexicon):
+            lexicon = MappedLexicon(lexicon)
+        manager.lexicons = manager.lexicons + (lexicon,)
+        manager.revision += 1
+        self._pst = None
+        return manager
+
+    def apply_layer(self, layer):
+        """
+        Apply a layer of customizations, like a tenant's or a lexicon pack's,
+        to this config. A layer is a dictionary with any of these keys:
+
+        * the name of a set, like ``'titles'``, with a list of strings to add,
+          or a dictionary with lists to ``'add'`` and to ``'remove'``
+        * ``'capitalization_exceptions'`` with a dictionary of lower case
+          words and their capitalization
+        * ``'regexes'`` with a dictionary of regex names and their patterns,
+          or ``False`` to turn one off
+        * ``'options'`` with a dictionary of options like
+          :py:attr:`string_format`
+
+        Returns ``self`` for chaining.
+
+        :param dict layer: the customizations
+        :raises ValueError: for an unknown key or option, or a value of the
+            wrong type, e.g. a string instead of a list of strings
+
+        .. doctest::
+
+            >>> constants = Constants().apply_layer({
+            ...     'titles': {'add': ['dean'], 'remove': ['hon']},
+            ...     'options': {'string_format': '{first} {last}'},
+            ... })
+            >>> 'dean' in constants.titles
+            True
+
+        """
+        for kind, values in layer.items():
+            if kind in _SETS:
+                if not isinstance(values, dict):
+                    values = {'add': values}
+                for action, strings in values.items():
+                    if action not in ('add', 'remove'):
+                        raise ValueError("Unknown config layer action for {0}: {1}".format(kind, action))
+                    # a bare string would add each of its letters
+                    if not isinstance(strings, (list, tuple, set, frozenset)):
+                        raise ValueError("Config layer {0} must be a list of strings".format(kind))
+                manager = getattr(self, kind)
+                manager.update(values.get('add', ()))
+                manager.remove(*values.get('remove', ()))
+            elif not isinstance(values, dict):
+                raise ValueError("Config layer {0} must be a dictionary".format(kind))
+            elif kind == 'capitalization_exceptions':
+                self.capitalization_exceptions.update(values)
+            elif kind == 'regexes':
+                self.regexes.update((key, LazyRegex(value, re.U) if value else value)
+                                    for key, value in values.items())
+            elif kind == 'options':
+                for name, value in values.items():
+                    if name not in _OPTIONS:
+                        raise ValueError("Unknown option: {0}".format(name))
+                    # JSON and TOML packs have lists for tuples
+                    setattr(self, name, tuple(value) if isinstance(value, list) else value)
+            else:
+                raise ValueError("Unknown config layer key: {0}".format(kind))
+        self._pst = None
+        return self
+
+    def freeze(self):
+        """
+        Prepare this config to be shared by parsers in many threads and make
+        it read-only. Compiles all the regular expressions, turns on
+        :py:attr:`thread_safe` and works out the :py:meth:`fingerprint`.
+        Changing its sets, capitalization exceptions, regexes or options
+        afterwards raises ``TypeError``. Returns ``self``.
+        """
+        for key in list(self.regexes):
+            self.regexes[key]
+        self.thread_safe = True
+        self.fingerprint()
+        for name in _SETS + _TUPLES:
+            object.__setattr__(getattr(self, name), 'frozen', True)
+        self._frozen = True
+        return self
+
+    _frozen = False
+
+    @property
+    def frozen(self):
+        """Whether :py:meth:`freeze` was called."""
+        return self._frozen
+
+    def __setattr__(self, name, value):
+        if self._frozen and not name.startswith('_'):
+            raise TypeError("Cannot change a frozen config")
+        object.__setattr__(self, name, value)
+
+    def _stamp(self):
+        # changes whenever the fingerprint may have
+        return tuple((id(getattr(self, name)), getattr(self, name).revision)
+                     for name in _SETS + _TUPLES) \
+            + tuple(getattr(self, name) for name in _OPTIONS)
+
+    def fingerprint(self):
+        """
+        A stable 64 bit fingerprint of the configuration: the contents of the
+        sets, the capitalization exceptions and regular expressions, the
+        checksums of attached lexicons and the options like
+        :py:attr:`string_format`. Configs with the same fingerprint parse and
+        format names the same way, in any process, so it can be used as a
+        cache key. It is worked out again only after the config changes.
+
+        :rtype: int
+        """
+        stamp = self._stamp()
+        if self._fingerprint and self._fingerprint[0] == stamp:
+            return self._fingerprint[1]
+        parts = []
+        for name in _SETS:
+            manager = getattr(self, name)
+            parts.append(name)
+            parts.extend(sorted(manager.elements))
+            parts.extend(lexicon.checksum for lexicon in manager.lexicons)
+        for name in _TUPLES:
+            parts.append(name)
+            for entry in _entries(getattr(self, name)):
+                parts.extend(repr(x) for x in entry)
+        for name in _OPTIONS:
+            parts.extend([name, repr(getattr(self, name))])
+        fingerprint = fingerprint64(parts)
+        self._fingerprint = (stamp, fingerprint)
+        return fingerprint
 
     def __repr__(self):
         return "<Constants() instance>"
 
+    def __getstate__(self):
+        """
+        Returns the configuration as a dictionary of plain values: the
+        sorted entries added to and removed from each set that differs from
+        the default, the paths of
+        attached lexicons, the entries of the capitalization exceptions and
+        regular expressions if they differ from the default, the options set
+        on this instance and the :py:meth:`fingerprint`.
+        """
+        sets = {}
+        lexicons = {}
+        for name in _SETS:
+            manager = getattr(self, name)
+            if manager.elements != _DEFAULTS[name]:
+                sets[name] = {
+                    'add': sorted(manager.elements - _DEFAULTS[name]),
+                    'remove': sorted(_DEFAULTS[name] - manager.elements),
+                }
+            if manager.lexicons:
+                lexicons[name] = [lexicon.path for lexicon in manager.lexicons]
+        tuples = {}
+        for name in _TUPLES:
+            entries = _entries(getattr(self, name))
+            if entries != _entries(_DEFAULTS[name]):
+                tuples[name] = entries
+        options = dict((name, self.__dict__[name]) for name in _OPTIONS if name in self.__dict__)
+        return {
+            'version': STATE_VERSION,
+            'sets': sets,
+            'lexicons': lexicons,
+            'tuples': tuples,
+            'options': options,
+            'fingerprint': self.fingerprint(),
+        }
+
+    def _shared_state(self):
+        # __getstate__, worked out again only after the config changes and
+        # shared by every name pickled with it, so a pickle of many names
+        # holds it once
+        stamp = self._stamp()
+        if self._state is None or self._state[0] != stamp:
+            self._state = (stamp, self.__getstate__())
+        return self._state[1]
+
+    _state = None
+
     def __setstate__(self, state):
-        self.__init__(state)
+        if state.get('version') != STATE_VERSION:
+            raise ValueError("Unsupported Constants state version: {0}".format(state.get('version')))
+        self.__init__()
+        for name, elements in state['sets'].items():
+            # already normalized
+            elements = _DEFAULTS[name].union(elements['add']).difference(elements['remove'])
+            setattr(self, name, SetManager(set(elements)))
+        for name, entries in state['tuples'].items():
+            setattr(self, name, TupleManager(
+                (key, value if flags is None else LazyRegex(value, flags))
+                for key, value, flags in entries))
+        for name, value in state['options'].items():
+            # a state stored as JSON has lists for tuples
+            setattr(self, name, tuple(value) if isinstance(value, list) else value)
+        for name, paths in state['lexicons'].items():
+            for path in paths:
+                self.attach_lexicon(name, path)
+        if not state['lexicons']:
+            # a lexicon file may have changed since, so configs with
+            # lexicons work their fingerprint out again
+            self._fingerprint = (self._stamp(), state['fingerprint'])
+
+
+def _entries(values):
+    # sorted (key, value, flags) entries of a tuple config, with regular
+    # expressions as their pattern and flags and other values with flags None
+    entries = []
+    # dict.items leaves lazy regexes uncompiled
+    for key, value in (dict.items(values) if isinstance(values, dict) else values):
+        if hasattr(value, 'pattern'):
+            # LazyRegex or compiled pattern, which adds re.U to str patterns
+            entries.append((key, value.pattern, value.flags | re.U))
+        else:
+            entries.append((key, value, None))
+    return sorted(entries)
 
-    def __getstate__(self):
-        attrs = [x for x in dir(self) if not x.startswith('_')]
-        return dict([(a, getattr(self, a)) for a in attrs])
+
+_registry = {}
+_default_fingerprint = []
+
+#: Maximum number of configs :py:func:`resolve` keeps after building them
+#: from a state.
+MAX_RESTORED = 64
+
+# configs built by resolve from states, oldest first
+_restored = {}
+
+# frozen configs shared by a ConfigRegistry, while they are in use
+_shared = weakref.WeakValueDictionary()
+
+
+def default_fingerprint():
+    """
+    The :py:meth:`~Constants.fingerprint` of a new, unchanged
+    :py:class:`Constants`.
+
+    :rtype: int
+    """
+    if not _default_fingerprint:
+        _default_fingerprint.append(Constants().fingerprint())
+    return _default_fingerprint[0]
+
+
+def register(constants):
+    """
+    Make a config available to :py:func:`resolve` under its
+    :py:meth:`~Constants.fingerprint`, e.g. so names pickled with it can be
+    loaded in another process that registered an identical config. Returns
+    the fingerprint.
+
+    :param Constants constants: the config to register
+    :rtype: int
+    """
+    fingerprint = constants.fingerprint()
+    _registry[fingerprint] = constants
+    return fingerprint
+
+
+def _share(constants):
+    # lets resolve find a frozen config built by a ConfigRegistry, so names
+    # pickled with it load with the same instance in this process
+    _shared[constants.fingerprint()] = constants
+
+
+def unregister(constants):
+    """
+    Remove a config passed to :py:func:`register`.
+
+    :param Constants constants: the registered config
+    """
+    for fingerprint, registered in list(_registry.items()):
+        if registered is constants:
+            del _registry[fingerprint]
+
+
+def resolve(fingerprint, shared=True, state=None):
+    """
+    Find the config with a :py:meth:`~Constants.fingerprint`, looking in
+    order at the configs passed to :py:func:`register`, then the frozen
+    configs of a :py:class:`~nameparser.config.registry.ConfigRegistry`
+    still in use, then :py:data:`CONSTANTS` if ``shared``, then a :py:class:`Constants` with
+    the defaults if the fingerprint is theirs. Failing that, the config is
+    built from ``state`` if one is given. Configs built for shared names
+    are reused for later calls with the same fingerprint.
+
+    :param int fingerprint: fingerprint to look for
+    :param bool shared: whether the config may be the module-wide
+        :py:data:`CONSTANTS`
+    :param dict state: the config's :py:meth:`~Constants.__getstate__`
+    :raises ValueError: if no config has that fingerprint
+    :rtype: Constants
+    """
+    constants = _registry.get(fingerprint)
+    if constants is not None:
+        if constants.fingerprint() == fingerprint:
+            return constants
+        # changed since it was registered
+        del _registry[fingerprint]
+    constants = _shared.get(fingerprint)
+    if constants is not None:
+        return constants
+    if shared and CONSTANTS.fingerprint() == fingerprint:
+        return CONSTANTS
+    default = default_fingerprint() == fingerprint
+    if default and not shared:
+        return Constants()
+    if not default and state is None:
+        raise ValueError("No config registered with fingerprint {0:016x}".format(fingerprint))
+    # a config built from the state, or the defaults if the module-wide
+    # config changed since, shared by the names loaded with it
+    constants = _restored.pop(fingerprint, None)
+    if constants is None or constants.fingerprint() != fingerprint:
+        constants = Constants()
+        if not default:
+            constants.__setstate__(state)
+        if len(_restored) >= MAX_RESTORED:
+            del _restored[next(iter(_restored))]
+    _restored[fingerprint] = constants
+    return constants
+
+
+def is_resolvable(constants):
+    """
+    Whether :py:func:`resolve` finds a config in any process by its
+    fingerprint alone: one equal to the defaults or passed to
+    :py:func:`register`.
+
+    :param Constants constants: the config
+    :rtype: bool
+    """
+    fingerprint = constants.fingerprint()
+    return fingerprint == default_fingerprint() or fingerprint in _registry
 
 
 #: A module-level instance of the :py:class:`Constants()` class.
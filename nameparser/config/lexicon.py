@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Compact on-disk lexicons that can be memory mapped and probed without
+loading them into a Python set.
+
+A lexicon file is a sorted string table: a header with a SHA-256 checksum
+of the rest of the file, an array of offsets and the UTF-8 encoded entries
+sorted by their bytes. Lookups are a binary search
+over the mapped file, so large custom title or suffix lists load instantly
+and the pages are shared by every process that maps the same file.
+
+::
+
+    >>> from nameparser.config import Constants
+    >>> from nameparser.config.lexicon import write_lexicon
+    >>> write_lexicon('titles.lex', open('titles.txt').read().splitlines())
+    >>> constants = Constants()
+    >>> constants.attach_lexicon('titles', 'titles.lex')
+
+"""
+from __future__ import unicode_literals
+import binascii
+import mmap
+import struct
+try:
+    # Python 3.3+
+    from collections.abc import Set
+except ImportError:
+    from collections import Set
+
+from nameparser.util import binary_type
+from nameparser.util import lc
+
+MAGIC = b'NPLX'
+VERSION = 2
+
+_HEADER = struct.Struct(str('<4sII'))
+# SHA-256 of the entries, follows the header
+_CHECKSUM = struct.Struct(str('<32s'))
+_OFFSETS = struct.Struct(str('<II'))
+
+
+def write_lexicon(path, strings, encoding='UTF-8'):
+    """
+    Write ``strings`` to a lexicon file at ``path`` that can be opened with
+    :py:class:`MappedLexicon`. Strings are normalized the same way as
+    :py:meth:`~nameparser.config.SetManager.add` (lower case, no periods) and
+    duplicates are removed.
+
+    :param str path: file to write
+    :param strings: iterable of strings to include
+    :param str encoding: encoding of any binary strings in ``strings``
+    """
+    entries = set()
+    for s in strings:
+        if isinstance(s, binary_type):
+            s = s.decode(encoding)
+        entries.add(lc(s).encode('utf-8'))
+    entries = sorted(entries)
+    offsets = [0]
+    for entry in entries:
+        offsets.append(offsets[-1] + len(entry))
+    import hashlib
+    body = struct.pack(str('<{0}I').format(len(offsets)), *offsets) + b''.join(entries)
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries)))
+        f.write(_CHECKSUM.pack(hashlib.sha256(body).digest()))
+        f.write(body)
+
+
+class MappedLexicon(Set):
+    """
+    A read-only set of strings backed by a memory mapped lexicon file
+    written by :py:func:`write_lexicon`. Subclass of ``collections.abc.Set``.
+
+    Attach it to a config set with
+    :py:meth:`~nameparser.config.Constants.attach_lexicon`.
+
+    :param str path: lexicon file to map
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError("Not a version {0} lexicon file: {1}".format(VERSION, path))
+        self._count = count
+        self._checksum = _CHECKSUM.unpack_from(self._map, _HEADER.size)[0]
+        self._offsets = _HEADER.size + _CHECKSUM.size
+        self._data = self._offsets + 4 * (count + 1)
+
+    def __repr__(self):
+        return "MappedLexicon({0!r})".format(self.path)
+
+    def __reduce__(self):
+        return (MappedLexicon, (self.path,))
+
+    @property
+    def checksum(self):
+        """
+        Hex SHA-256 checksum of the entries, read from the header. Used by
+        :py:meth:`~nameparser.config.Constants.fingerprint`, so configs with
+        lexicons of the same entries have the same fingerprint wherever the
+        files are.
+
+        :rtype: str
+        """
+        return binascii.hexlify(self._checksum).decode('ascii')
+
+    def _entry(self, i):
+        start, end = _OFFSETS.unpack_from(self._map, self._offsets + 4 * i)
+        return self._map[self._data + start:self._data + end]
+
+    def __contains__(self, value):
+        if isinstance(value, binary_type):
+            key = value
+        else:
+            try:
+                key = value.encode('utf-8')
+            except AttributeError:
+                return False
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self._count and self._entry(lo) == key
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._entry(i).decode('utf-8')
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+NICKNAMES = {
+    'abby': 'abigail',
+    'abe': 'abraham',
+    'al': 'albert',
+    'alex': 'alexander',
+    'andy': 'andrew',
+    'art': 'arthur',
+    'barb': 'barbara',
+    'becky': 'rebecca',
+    'ben': 'benjamin',
+    'bert': 'albert',
+    'beth': 'elizabeth',
+    'betsy': 'elizabeth',
+    'betty': 'elizabeth',
+    'bill': 'william',
+    'billy': 'william',
+    'bob': 'robert',
+    'bobby': 'robert',
+    'cathy': 'catherine',
+    'charlie': 'charles',
+    'chris': 'christopher',
+    'chuck': 'charles',
+    'cindy': 'cynthia',
+    'dan': 'daniel',
+    'danny': 'daniel',
+    'dave': 'david',
+    'deb': 'deborah',
+    'debbie': 'deborah',
+    'dick': 'richard',
+    'don': 'donald',
+    'doug': 'douglas',
+    'ed': 'edward',
+    'eddie': 'edward',
+    'fred': 'frederick',
+    'gene': 'eugene',
+    'greg': 'gregory',
+    'hank': 'henry',
+    'jack': 'john',
+    'jake': 'jacob',
+    'jeff': 'jeffrey',
+    'jen': 'jennifer',
+    'jenny': 'jennifer',
+    'jerry': 'gerald',
+    'jim': 'james',
+    'jimmy': 'james',
+    'joe': 'joseph',
+    'joey': 'joseph',
+    'johnny': 'john',
+    'jon': 'jonathan',
+    'kate': 'katherine',
+    'kathy': 'katherine',
+    'katie': 'katherine',
+    'ken': 'kenneth',
+    'kenny': 'kenneth',
+    'larry': 'lawrence',
+    'liz': 'elizabeth',
+    'maggie': 'margaret',
+    'matt': 'matthew',
+    'meg': 'margaret',
+    'mike': 'michael',
+    'mickey': 'michael',
+    'nate': 'nathaniel',
+    'nick': 'nicholas',
+    'pam': 'pamela',
+    'pat': 'patricia',
+    'patty': 'patricia',
+    'peggy': 'margaret',
+    'pete': 'peter',
+    'phil': 'philip',
+    'ray': 'raymond',
+    'rick': 'richard',
+    'rob': 'robert',
+    'ron': 'ronald',
+    'sam': 'samuel',
+    'sandy': 'sandra',
+    'steve': 'stephen',
+    'sue': 'susan',
+    'susie': 'susan',
+    'ted': 'theodore',
+    'tim': 'timothy',
+    'tom': 'thomas',
+    'tommy': 'thomas',
+    'tony': 'anthony',
+    'vicky': 'victoria',
+    'will': 'william',
+}
+"""
+Common English diminutives and the formal first name they are most often
+short for, used to expand first names when generating blocking keys. Keys
+and values are lower case.
+"""
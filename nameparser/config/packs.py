@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Load configs from lexicon packs, JSON or TOML files of customizations kept
+in version control and layered onto the default config in order.
+
+A pack holds a layer in the format of
+:py:meth:`~nameparser.config.Constants.apply_layer`, e.g. in TOML::
+
+    titles = ["dean", "provost"]
+
+    [suffix_acronyms]
+    add = ["cfa"]
+    remove = ["ret"]
+
+    [options]
+    string_format = "{first} {last}"
+
+or the same in JSON. TOML packs need Python 3.11's ``tomllib`` or the
+``tomli`` package.
+
+The config built from the packs is cached on disk as the JSON of its
+:py:meth:`~nameparser.config.Constants.__getstate__`, under a hash of their
+contents, so later processes load the normalized sets instead of building
+them again. Changing a pack, or upgrading to a version of nameparser with
+different defaults, changes the hash.
+
+::
+
+    >>> from nameparser.config.packs import load_packs
+    >>> constants = load_packs(["base.toml", "tenant.json"]) # doctest: +SKIP
+
+"""
+from __future__ import unicode_literals
+import hashlib
+import json
+import os
+import tempfile
+
+from nameparser.util import log
+from nameparser.util import text_types
+from nameparser.config import Constants
+from nameparser.config import STATE_VERSION
+from nameparser.config import default_fingerprint
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+# os.replace overwrites an existing file on Windows too, but is Python 3 only
+_replace = getattr(os, 'replace', os.rename)
+
+
+def default_cache_dir():
+    """
+    The directory compiled packs are cached in by default,
+    ``$XDG_CACHE_HOME/nameparser`` or ``~/.cache/nameparser``.
+
+    :rtype: str
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'nameparser')
+
+
+def parse_pack(data, path):
+    """
+    Parse the contents of a pack file into a layer. The format is picked by
+    the file extension, ``.toml`` or else JSON.
+
+    :param bytes data: the contents of the file
+    :param str path: the file name
+    :rtype: dict
+    """
+    text = data.decode('utf-8')
+    if path.lower().endswith('.toml'):
+        if tomllib is None:
+            raise ImportError("Reading TOML packs requires Python 3.11 or the tomli package")
+        layer = tomllib.loads(text)
+    else:
+        layer = json.loads(text)
+    if not isinstance(layer, dict):
+        raise ValueError("A pack must hold a table of customizations: {0}".format(path))
+    return layer
+
+
+def _compile(layers):
+    constants = Constants()
+    for layer in layers:
+        constants.apply_layer(layer)
+    return constants
+
+
+def load_packs(paths, cache_dir=None):
+    """
+    Build a config from the defaults and one or more packs applied in order,
+    using the compiled config cached on disk if the packs have not changed.
+
+    :param paths: the path of a pack, or a list of them
+    :param str cache_dir: where to cache compiled configs, by default
+        :py:func:`default_cache_dir`. ``False`` turns the cache off.
+    :rtype: Constants
+    """
+    if isinstance(paths, text_types):
+        paths = [paths]
+    contents = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            contents.append((path, f.read()))
+
+    if cache_dir is False:
+        return _compile([parse_pack(data, path) for path, data in contents])
+    cache_dir = cache_dir or default_cache_dir()
+
+    digest = hashlib.sha256()
+    digest.update("{0}/{1:016x}".format(STATE_VERSION, default_fingerprint()).encode('utf-8'))
+    for path, data in contents:
+        digest.update(os.path.splitext(path)[1].lower().encode('utf-8'))
+        digest.update(hashlib.sha256(data).digest())
+    cache_path = os.path.join(cache_dir, digest.hexdigest() + '.json')
+
+    # plain data rather than a pickle, so whoever can write to the cache
+    # directory cannot run code in the processes loading packs
+    try:
+        with open(cache_path, 'rb') as f:
+            state = json.loads(f.read().decode('utf-8'))
+        constants = Constants()
+        constants.__setstate__(state)
+        return constants
+    except (IOError, OSError):
+        pass
+    except Exception as e:
+        log.debug("Rebuilding unreadable compiled pack %s: %s", cache_path, e)
+
+    constants = _compile([parse_pack(data, path) for path, data in contents])
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        # write to a temporary file first so other processes never read a
+        # partly written cache file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json.dumps(constants.__getstate__()).encode('utf-8'))
+        _replace(tmp_path, cache_path)
+    except (IOError, OSError) as e:
+        log.debug("Could not cache compiled pack %s: %s", cache_path, e)
+    return constants
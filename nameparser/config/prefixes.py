@@ -10,7 +10,7 @@ from __future__ import unicode_literals
 #: appear after a prefixes. So in "pennie von bergen wessels MD", "von" will
 #: join with all following name pieces until the suffix "MD", resulting in the
 #: correct parsing of the last name "von bergen wessels".
-PREFIXES = set([
+PREFIXES = frozenset([
     'abu',
     'al',
     'bin',
@@ -2,36 +2,96 @@
 from __future__ import unicode_literals
 import re
 
+
+class LazyRegex(object):
+    """
+    A regular expression that is not compiled until it is first used.
+    :py:class:`~nameparser.config.TupleManager` compiles it on first
+    attribute access and replaces it with the compiled pattern.
+
+    :param str pattern: the regular expression
+    :param int flags: ``re`` module flags
+    :param str fallback: pattern to compile instead if ``pattern`` fails to
+        compile, e.g. on narrow unicode builds
+    """
+
+    def __init__(self, pattern, flags=0, fallback=None):
+        self.pattern = pattern
+        self.flags = flags
+        self.fallback = fallback
+        self._compiled = None
+
+    def __repr__(self):
+        return "LazyRegex({0!r}, {1})".format(self.pattern, self.flags)
+
+    def compile(self):
+        if self._compiled is None:
+            try:
+                self._compiled = re.compile(self.pattern, self.flags)
+            except re.error:
+                if self.fallback is None:
+                    raise
+                self._compiled = re.compile(self.fallback, self.flags)
+        return self._compiled
+
+    # the methods of a compiled pattern, for code that gets the lazy regex
+    # itself, e.g. from ``dict(CONSTANTS.regexes)``
+
+    def match(self, *args, **kwargs):
+        return self.compile().match(*args, **kwargs)
+
+    def fullmatch(self, *args, **kwargs):
+        return self.compile().fullmatch(*args, **kwargs)
+
+    def search(self, *args, **kwargs):
+        return self.compile().search(*args, **kwargs)
+
+    def sub(self, *args, **kwargs):
+        return self.compile().sub(*args, **kwargs)
+
+    def subn(self, *args, **kwargs):
+        return self.compile().subn(*args, **kwargs)
+
+    def split(self, *args, **kwargs):
+        return self.compile().split(*args, **kwargs)
+
+    def findall(self, *args, **kwargs):
+        return self.compile().findall(*args, **kwargs)
+
+    def finditer(self, *args, **kwargs):
+        return self.compile().finditer(*args, **kwargs)
+
+
 # emoji regex from https://stackoverflow.com/questions/26568722/remove-unicode-emoji-using-re-in-python
-try:
+re_emoji = LazyRegex(
     # Wide UCS-4 build
-    re_emoji = re.compile('['
-        '\U0001F300-\U0001F64F'
-        '\U0001F680-\U0001F6FF'
-        '\u2600-\u26FF\u2700-\u27BF]+', 
-        re.UNICODE)
-except re.error:
+    '['
+    '\U0001F300-\U0001F64F'
+    '\U0001F680-\U0001F6FF'
+    '\u2600-\u26FF\u2700-\u27BF]+',
+    re.UNICODE,
     # Narrow UCS-2 build
-    re_emoji = re.compile('('
-        '\ud83c[\udf00-\udfff]|'
-        '\ud83d[\udc00-\ude4f\ude80-\udeff]|'
-        '[\u2600-\u26FF\u2700-\u27BF])+', 
-        re.UNICODE)
+    fallback='('
+    '\ud83c[\udf00-\udfff]|'
+    '\ud83d[\udc00-\ude4f\ude80-\udeff]|'
+    '[\u2600-\u26FF\u2700-\u27BF])+')
 
 REGEXES = set([
-    ("spaces", re.compile(r"\s+", re.U)),
-    ("word", re.compile(r"(\w|\.)+", re.U)),
-    ("mac", re.compile(r'^(ma?c)(\w{2,})', re.I | re.U)),
-    ("initial", re.compile(r'^(\w\.|[A-Z])?$', re.U)),
-    ("quoted_word", re.compile(r'(?<!\w)\'([^\s]*?)\'(?!\w)', re.U)),
-    ("double_quotes", re.compile(r'\"(.*?)\"', re.U)),
-    ("parenthesis", re.compile(r'\((.*?)\)', re.U)),
-    ("roman_numeral", re.compile(r'^(X|IX|IV|V?I{0,3})$', re.I | re.U)),
-    ("no_vowels",re.compile(r'^[^aeyiuo]+$', re.I | re.U)),
-    ("period_not_at_end",re.compile(r'.*\..+$', re.I | re.U)),
-    ("emoji",re_emoji),
-    ("phd", re.compile(r'\s(ph\.?\s+d\.?)', re.I | re.U)),
+    ("spaces", LazyRegex(r"\s+", re.U)),
+    ("word", LazyRegex(r"(\w|\.)+", re.U)),
+    ("mac", LazyRegex(r'^(ma?c)(\w{2,})', re.I | re.U)),
+    ("initial", LazyRegex(r'^(\w\.|[A-Z])?$', re.U)),
+    ("quoted_word", LazyRegex(r'(?<!\w)\'([^\s]*?)\'(?!\w)', re.U)),
+    ("double_quotes", LazyRegex(r'\"(.*?)\"', re.U)),
+    ("parenthesis", LazyRegex(r'\((.*?)\)', re.U)),
+    ("roman_numeral", LazyRegex(r'^(X|IX|IV|V?I{0,3})$', re.I | re.U)),
+    ("no_vowels", LazyRegex(r'^[^aeyiuo]+$', re.I | re.U)),
+    ("period_not_at_end", LazyRegex(r'.*\..+$', re.I | re.U)),
+    ("emoji", re_emoji),
+    ("phd", LazyRegex(r'\s(ph\.?\s+d\.?)', re.I | re.U)),
 ])
 """
-All regular expressions used by the parser are precompiled and stored in the config.
+All regular expressions used by the parser. They are stored as
+:py:class:`LazyRegex` instances and compiled the first time the parser uses
+them, so patterns that are never needed are never compiled.
 """
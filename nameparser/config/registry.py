@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+A registry of compiled configs for services that parse names for many
+tenants, each with its own small customizations of the default config.
+
+Each tenant's customizations are described by a layer, see
+:py:meth:`~nameparser.config.Constants.apply_layer`. The registry builds
+the config for a layer once, :py:meth:`freezes <nameparser.config.Constants.freeze>`
+it so it can be shared by all threads, and keeps it under the layer's
+fingerprint. The least recently used configs are evicted when the estimated
+memory of the configs goes over a budget.
+
+::
+
+    >>> from nameparser import HumanName
+    >>> from nameparser.config.registry import ConfigRegistry
+    >>> registry = ConfigRegistry()
+    >>> constants = registry.get({'titles': ['dean']})
+    >>> HumanName("Dean Robert Johns", constants).title
+    'Dean'
+    >>> registry.get({'titles': ['dean']}) is constants
+    True
+
+Names pickled with a config from the registry load with the same config
+in the process that built it, while it is in use. Elsewhere they load with
+an unfrozen copy built from the state stored in the pickle, unless an
+identical config was passed to :py:func:`~nameparser.config.register`.
+
+"""
+from __future__ import unicode_literals
+import json
+import sys
+import threading
+
+from nameparser.util import fingerprint64
+from nameparser.config import Constants
+from nameparser.config import SetManager
+from nameparser.config import _share
+from nameparser.config import _DEFAULTS
+
+
+def _sorted_set(value):
+    # json.dumps hook for sets of strings
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError("Not a valid config layer value: {0!r}".format(value))
+
+
+def layer_fingerprint(layer):
+    """
+    Stable 64 bit fingerprint of a layer of customizations. Layers with the
+    same contents have the same fingerprint, whatever the order of their
+    keys, and sets have the fingerprint of their sorted lists.
+
+    :param dict layer: a layer for :py:meth:`~nameparser.config.Constants.apply_layer`
+    :rtype: int
+    """
+    return fingerprint64([json.dumps(layer or {}, sort_keys=True, default=_sorted_set)])
+
+
+def estimate_size(constants):
+    """
+    Estimate the memory in bytes used by a config beyond the default sets
+    it shares with every other config.
+
+    :param Constants constants: the config
+    :rtype: int
+    """
+    size = sys.getsizeof(constants)
+    for name, default in _DEFAULTS.items():
+        manager = getattr(constants, name)
+        if not isinstance(manager, SetManager):
+            # the tuples of a config are its own; count their compiled
+            # entries without compiling the lazy ones
+            size += sys.getsizeof(manager)
+            size += sum(_entry_size(key, value) for key, value in dict.items(manager))
+            continue
+        if manager.elements is default:
+            continue
+        size += sys.getsizeof(manager.elements)
+        size += sum(sys.getsizeof(value) for value in manager.elements)
+    return size
+
+
+def _entry_size(key, value):
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    pattern = getattr(value, 'pattern', None)
+    if pattern is not None:
+        # compiled patterns and LazyRegex keep their source
+        size += sys.getsizeof(pattern)
+    return size
+
+
+class ConfigRegistry(object):
+    """
+    A thread safe, least recently used cache of frozen configs keyed by the
+    fingerprint of the layer they were built from.
+
+    :param int max_bytes: memory budget for the configs, as estimated by
+        :py:func:`estimate_size`. The most recently used config is always
+        kept, even if it is over the budget on its own.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __repr__(self):
+        return "<ConfigRegistry() {0} configs, {1:,} bytes>".format(len(self), self.size)
+
+    def __len__(self):
+        return len(self.configs)
+
+    def __contains__(self, layer):
+        return layer_fingerprint(layer) in self.configs
+
+    def get(self, layer=None, key=None):
+        """
+        Return the frozen config for a layer of customizations of the default
+        config, building it if it is not in the registry.
+
+        :param dict layer: a layer for
+            :py:meth:`~nameparser.config.Constants.apply_layer`, or ``None``
+            for the default config
+        :param int key: the :py:func:`layer_fingerprint` of the layer, if
+            it is already known, e.g. stored with the tenant
+        :rtype: Constants
+        """
+        if key is None:
+            key = layer_fingerprint(layer)
+        with self._lock:
+            entry = self.configs.pop(key, None)
+            if entry is not None:
+                self.hits += 1
+                self.configs[key] = entry
+                return entry[0]
+        # built outside the lock so other tenants are not held up; if
+        # another thread built the same config meanwhile, theirs is kept
+        constants = Constants().apply_layer(layer or {}).freeze()
+        built = (constants, estimate_size(constants))
+        with self._lock:
+            entry = self.configs.pop(key, None)
+            if entry is not None:
+                self.hits += 1
+            else:
+                entry = built
+                _share(constants)
+                self.builds += 1
+                self.size += entry[1]
+                while self.configs and self.size > self.max_bytes:
+                    evicted = self.configs.pop(next(iter(self.configs)))
+                    self.size -= evicted[1]
+                    self.evictions += 1
+            self.configs[key] = entry
+            return entry[0]
+
+    def clear(self):
+        """Remove all configs and reset the counters."""
+        with self._lock:
+            self.configs = {}
+            self.size = 0
+            self.hits = 0
+            self.builds = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Return the registry counters as a dictionary.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'builds': self.builds,
+                'evictions': self.evictions,
+                'configs': len(self.configs),
+                'size': self.size,
+                'max_bytes': self.max_bytes,
+            }
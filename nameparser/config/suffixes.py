@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-SUFFIX_NOT_ACRONYMS = set([
+SUFFIX_NOT_ACRONYMS = frozenset([
     'dr',
     'esq',
     'esquire',
@@ -23,7 +23,7 @@ Post-nominal pieces that are not acronyms. The parser does not remove periods
 when matching against these pieces.
 
 """
-SUFFIX_ACRONYMS = set([
+SUFFIX_ACRONYMS = frozenset([
     '(ret)',
     '(vet)',
     '8-vsb',
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-FIRST_NAME_TITLES = set([
+FIRST_NAME_TITLES = frozenset([
     'aunt',
     'auntie',
     'brother',
@@ -34,7 +34,7 @@ When these titles appear with a single other name, that name is a first name, e.
 #: Many of these from wikipedia: https://en.wikipedia.org/wiki/Title.
 #: The parser recognizes chains of these including conjunctions allowing 
 #: recognition titles like "Deputy Secretary of State".
-TITLES = FIRST_NAME_TITLES | set([
+TITLES = FIRST_NAME_TITLES | frozenset([
     "attaché",
     "chargé d'affaires",
     "king's",
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Output formatters compiled from
+:py:attr:`~nameparser.config.Constants.string_format` and
+:py:attr:`~nameparser.config.Constants.initials_format` strings.
+
+Formatting a name the simple way fills every field, then searches the whole
+result for the leftovers of empty fields, like ``" ()"`` from a missing
+nickname, and collapses the whitespace they leave behind. A
+:py:class:`Formatter` does that clean up once for each combination of empty
+fields and reuses the result, so rendering a name only has to join its
+values into a cached template.
+
+::
+
+    >>> from nameparser import HumanName
+    >>> from nameparser.formatting import Formatter
+    >>> formatter = Formatter("{last}, {first} {middle}")
+    >>> formatter.render_many([HumanName("John Doe"), HumanName("Jane Q Public")])
+    ['Doe, John', 'Public, Jane Q']
+
+"""
+from __future__ import unicode_literals
+import re
+from string import Formatter as _StringFormatter
+
+from nameparser.config import CONSTANTS
+
+#: Attributes that a compiled format string can read straight from a name.
+ATTRIBUTES = ('title', 'first', 'middle', 'last', 'suffix', 'nickname')
+
+# characters the clean up could change depending on where the value is
+# placed: anything but letters, digits, periods, hyphens and spaces. Runs of
+# spaces and spaces at the ends of a value are checked separately.
+_UNSAFE = r"[^\w.\- \x00]"
+
+_PLACEHOLDER = re.compile(r"\x00(\d+)\x00")
+
+
+class Formatter(object):
+    """
+    A format string compiled for rendering names. The output is the same as
+    formatting the name's attributes with ``str.format()`` and cleaning up
+    the result the way :py:class:`~nameparser.parser.HumanName` always has.
+
+    Values with characters the clean up could change, like commas, quotes or
+    runs of whitespace, and format strings with conversions or format specs
+    are rendered the slow way.
+
+    :param str format_string: a format string with fields named after
+        :py:class:`~nameparser.parser.HumanName` attributes
+    :param constants constants: the :py:class:`~nameparser.config.Constants`
+        of the names to render, for their
+        :py:attr:`~nameparser.config.Constants.empty_attribute_default` and
+        ``spaces`` regex. Defaults to the module-level config.
+    :param bool initials: compile an
+        :py:attr:`~nameparser.config.Constants.initials_format`, which only
+        collapses whitespace
+    """
+
+    def __init__(self, format_string, constants=None, initials=False):
+        constants = constants or CONSTANTS
+        empty_attribute_default = constants.empty_attribute_default
+        self.format_string = format_string
+        self.empty_attribute_default = empty_attribute_default
+        self.spaces = constants.regexes.spaces
+        self.initials = initials
+        self.templates = {}
+
+        literals = []
+        fields = []
+        simple = True
+        for literal, field, spec, conversion in _StringFormatter().parse(format_string):
+            literals.append(literal)
+            if field is None:
+                continue
+            if spec or conversion or field not in ATTRIBUTES:
+                simple = False
+            fields.append(field)
+        self.fields = tuple(fields)
+        #: The distinct field names in the order they first appear.
+        self.members = tuple(sorted(set(fields), key=fields.index))
+
+        needle = "" if initials else "{0}".format(empty_attribute_default)
+        unsafe = _UNSAFE
+        if needle:
+            unsafe += "|" + re.escape(needle)
+            # a value next to another value or to a character of the empty
+            # value could join up with them and be removed by the clean up
+            inner = literals[1:len(fields)]
+            if any(not literal for literal in inner) \
+                    or any(literal and (literal[0] in needle or literal[-1] in needle)
+                           for literal in literals):
+                simple = False
+        self.simple = simple
+        self._unsafe = re.compile(unsafe)
+
+    def __repr__(self):
+        return "Formatter({0!r})".format(self.format_string)
+
+    def clean(self, string):
+        """
+        Clean up a formatted string the way
+        :py:class:`~nameparser.parser.HumanName` does.
+        """
+        if not self.initials:
+            # remove trailing punctuation from missing nicknames
+            string = string.replace("{0}".format(self.empty_attribute_default), '') \
+                .replace(" ()", "").replace(" ''", "").replace(' ""', "")
+        # collapse multiple spaces into single space
+        string = self.spaces.sub(" ", string.strip())
+        if string.endswith(","):
+            string = string[:-1]
+        if self.initials:
+            return string
+        return string.strip(', ')
+
+    def _template(self, empty):
+        # format with a placeholder for each value that is not empty, clean
+        # it up once and turn it back into a format string taking the values
+        # by position
+        values = {}
+        for i, member in enumerate(self.members):
+            values[member] = self.empty_attribute_default if empty[i] \
+                else "\x00{0}\x00".format(i)
+        parts = _PLACEHOLDER.split(self.clean(self.format_string.format(**values)))
+        for i in range(0, len(parts), 2):
+            parts[i] = parts[i].replace("{", "{{").replace("}", "}}")
+        for i in range(1, len(parts), 2):
+            parts[i] = "{" + parts[i] + "}"
+        return "".join(parts)
+
+    def format(self, values):
+        """
+        Return the clean formatted string for a dictionary of attribute
+        values.
+
+        :param dict values: attribute names and their values
+        :rtype: str
+        """
+        if not self.simple:
+            return self.clean(self.format_string.format(**values))
+        return self._format([values[member] for member in self.members])
+
+    def _format(self, values):
+        default = self.empty_attribute_default
+        empty = tuple([value == default for value in values])
+        present = "\x00".join(values if default == '' else [v for v in values if v != default])
+        if self._unsafe.search(present) or "  " in present or " \x00" in present \
+                or "\x00 " in present or present.startswith(" ") or present.endswith(" "):
+            return self.clean(self.format_string.format(**dict(zip(self.members, values))))
+        try:
+            template = self.templates[empty]
+        except KeyError:
+            template = self.templates[empty] = self._template(empty)
+        return template.format(*values)
+
+    def render(self, name):
+        """
+        Return the clean formatted string for a parsed name.
+
+        :param name: a :py:class:`~nameparser.parser.HumanName`
+        :rtype: str
+        """
+        if not self.simple:
+            return self.clean(self.format_string.format(**name.as_dict()))
+        return self._format([getattr(name, member) for member in self.members])
+
+    def render_many(self, names):
+        """
+        Render each name in an iterable of parsed names, returning a list of
+        strings in the same order.
+
+        :param names: iterable of :py:class:`~nameparser.parser.HumanName`
+        :rtype: list
+        """
+        render = self.render
+        return [render(name) for name in names]
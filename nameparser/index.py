@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+An inverted index over parsed names for looking up records by their name
+components.
+
+Each component value is normalized with :py:func:`~nameparser.util.lc`, the
+same normalization the parser uses for its config sets, and maps to a sorted
+array of record ids. Queries intersect the arrays of all the terms, starting
+with the shortest.
+
+::
+
+    >>> from nameparser.index import NameIndex
+    >>> index = NameIndex()
+    >>> index.add("John Smith")
+    0
+    >>> index.add("Dr. Jane Smith, PhD")
+    1
+    >>> index.search(last='smith', first_initial='J')
+    [0, 1]
+    >>> index.search(last='Smith', title='dr')
+    [1]
+
+"""
+from __future__ import unicode_literals
+from array import array
+from bisect import bisect_left
+
+from nameparser.util import lc
+from nameparser.parser import HumanName
+from nameparser.parser import Parser
+
+#: The components a :py:class:`NameIndex` can be searched by.
+COMPONENTS = ('last', 'first', 'first_initial', 'suffix', 'title')
+
+# record ids are stored as unsigned ints, at least 32 bits
+_TYPECODE = 'I' if array('I').itemsize >= 4 else 'L'
+
+
+def index_terms(name):
+    """
+    Return a list of the ``(component, value)`` pairs a parsed name is
+    indexed under. Names with several titles or suffixes are indexed under
+    each of them.
+
+    :param name: a :py:class:`~nameparser.parser.HumanName`
+    :rtype: list
+    """
+    first = lc(" ".join(name.first_list))
+    terms = [('last', lc(" ".join(name.last_list))), ('first', first),
+             ('first_initial', first[:1])]
+    terms.extend(('suffix', lc(piece)) for piece in name.suffix_list)
+    terms.extend(('title', lc(piece)) for piece in name.title_list)
+    return [(component, value) for component, value in terms if value]
+
+
+def _intersect(short, postings):
+    # binary search a much longer array for each id of a short sorted list,
+    # starting each search where the last one ended
+    found = []
+    end = len(postings)
+    i = 0
+    for record_id in short:
+        i = bisect_left(postings, record_id, i)
+        if i == end:
+            break
+        if postings[i] == record_id:
+            found.append(record_id)
+    return found
+
+
+class NameIndex(object):
+    """
+    An inverted index of parsed names supporting conjunctive queries on
+    :py:data:`COMPONENTS`, with records added and removed one at a time.
+
+    :param Parser parser: parser used for names added as strings
+    """
+
+    def __init__(self, parser=None):
+        self.parser = parser or Parser()
+        self.names = {}
+        self.postings = dict((component, {}) for component in COMPONENTS)
+        self._terms = {}
+        self._next_id = 0
+
+    def __repr__(self):
+        return "<NameIndex() {0} names>".format(len(self))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, record_id):
+        return record_id in self.names
+
+    def __getitem__(self, record_id):
+        return self.names[record_id]
+
+    def add(self, name, record_id=None):
+        """
+        Add a name to the index and return its record id.
+
+        :param name: a :py:class:`~nameparser.parser.HumanName` or a name string
+        :param int record_id: id to store the name under, replacing any name
+            already stored with it. Defaults to the next unused id.
+        :rtype: int
+        """
+        if not isinstance(name, HumanName):
+            name = self.parser.parse(name)
+        if record_id is None:
+            record_id = self._next_id
+        elif record_id in self.names:
+            self.remove(record_id)
+        self._next_id = max(self._next_id, record_id + 1)
+        self.names[record_id] = name
+        # kept to remove the record by, as the name itself may be changed
+        terms = self._terms[record_id] = set(index_terms(name))
+        for component, value in terms:
+            postings = self.postings[component].get(value)
+            if postings is None:
+                postings = self.postings[component][value] = array(_TYPECODE)
+            if not postings or postings[-1] < record_id:
+                postings.append(record_id)
+            else:
+                postings.insert(bisect_left(postings, record_id), record_id)
+        return record_id
+
+    def add_many(self, names):
+        """
+        Add each name in an iterable and return a list of their record ids.
+
+        :param names: iterable of :py:class:`~nameparser.parser.HumanName`
+            instances or name strings
+        :rtype: list
+        """
+        return [self.add(name) for name in names]
+
+    def remove(self, record_id):
+        """
+        Remove the name stored under ``record_id`` from the index, under
+        the terms it was indexed by when it was added.
+
+        :param int record_id: id returned by :py:meth:`add`
+        :raises KeyError: if there is no such record
+        """
+        del self.names[record_id]
+        for component, value in self._terms.pop(record_id):
+            values = self.postings[component]
+            postings = values.get(value, ())
+            i = bisect_left(postings, record_id)
+            if i < len(postings) and postings[i] == record_id:
+                del postings[i]
+                if not postings:
+                    del values[value]
+
+    def _postings(self, terms):
+        found = []
+        for component, value in terms.items():
+            if component not in self.postings:
+                raise ValueError("Not an indexed component: {0}".format(component))
+            value = lc(value)
+            if component == 'first_initial':
+                value = value[:1]
+            found.append(self.postings[component].get(value, ()))
+        return sorted(found, key=len)
+
+    def search(self, **terms):
+        """
+        Return the sorted record ids of the names matching all of the given
+        component values, e.g. ``search(last='Smith', first_initial='J')``.
+        Values are normalized like the indexed names.
+
+        :raises ValueError: if a component is not in :py:data:`COMPONENTS`
+        :rtype: list
+        """
+        if not terms:
+            return sorted(self.names)
+        postings = self._postings(terms)
+        result = list(postings[0])
+        for other in postings[1:]:
+            if not result:
+                break
+            if len(result) * 4 < len(other):
+                result = _intersect(result, other)
+            else:
+                result = sorted(set(result).intersection(other))
+        return result
+
+    def find(self, **terms):
+        """
+        Return the names matching all of the given component values, in
+        record id order. Takes the same arguments as :py:meth:`search`.
+
+        :rtype: list
+        """
+        return [self.names[record_id] for record_id in self.search(**terms)]
+
+    def count(self, component, value):
+        """
+        Return the number of names indexed under one component value.
+
+        :rtype: int
+        """
+        return len(self._postings({component: value})[0])
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Near-duplicate detection for parsed names with MinHash signatures and
+locality sensitive hashing (LSH).
+
+Each name is turned into a set of character shingles of its normalized
+first, middle and last name. Names with similar shingle sets get similar
+MinHash signatures, and :py:class:`LSHIndex` puts names whose signatures
+agree on any band of rows in the same bucket. Inserting a name only looks at
+its own buckets, so finding candidate duplicates in a stream of names takes
+roughly linear time instead of comparing all pairs.
+
+::
+
+    >>> from nameparser.lsh import LSHIndex
+    >>> index = LSHIndex()
+    >>> index.add_many(["Jon A. Smith", "John Smith Jr.", "Jane Doe"])
+    [0, 1, 2]
+    >>> index.clusters()
+    [[0, 1]]
+
+"""
+from __future__ import unicode_literals
+import random
+import zlib
+
+from nameparser.util import lc
+from nameparser.parser import HumanName
+from nameparser.parser import Parser
+
+# a Mersenne prime larger than any 32 bit shingle hash
+_PRIME = (1 << 61) - 1
+
+#: How many times the shingles of each component count towards similarity.
+#: Titles and suffixes are left out by default.
+DEFAULT_WEIGHTS = {
+    'title': 0,
+    'first': 1,
+    'middle': 1,
+    'last': 1,
+    'suffix': 0,
+}
+
+
+class MinHasher(object):
+    """
+    Computes MinHash signatures of parsed names.
+
+    :param int num_perm: number of hash functions, the length of a signature
+    :param int shingle_size: number of characters per shingle
+    :param dict weights: how many times the shingles of each component count,
+        see :py:data:`DEFAULT_WEIGHTS`. 0 leaves a component out.
+    :param int seed: seed of the hash functions. Signatures are only
+        comparable between hashers with the same settings and seed.
+    :param int maxsize: number of component hashes to remember
+    """
+
+    def __init__(self, num_perm=64, shingle_size=2, weights=None, seed=1, maxsize=65536):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(weights or {})
+        self.maxsize = maxsize
+        generator = random.Random(seed)
+        self.permutations = [(generator.randrange(1, _PRIME), generator.randrange(0, _PRIME))
+                             for i in range(num_perm)]
+        self._hashes = {}
+
+    def __repr__(self):
+        return "MinHasher(num_perm={0}, shingle_size={1})".format(self.num_perm, self.shingle_size)
+
+    def _values(self, name):
+        # the weighted, normalized components of a name
+        for component, weight in self.weights.items():
+            if weight:
+                value = lc(" ".join(getattr(name, component + '_list')))
+                if value:
+                    yield component, weight, value
+
+    def _grams(self, component, weight, value):
+        size = self.shingle_size
+        value = "^" + value + "$"
+        grams = [value[i:i + size] for i in range(max(len(value) - size + 1, 1))]
+        return set("{0}{1}:{2}".format(component, copy, gram)
+                   for copy in range(weight) for gram in grams)
+
+    def shingles(self, name):
+        """
+        Return the set of shingles of a parsed name. Each component is lower
+        cased without periods and padded with ``^`` and ``$`` so short names
+        and initials still make shingles, and shingles are tagged with their
+        component so "Smith John" differs from "John Smith".
+
+        :param name: a :py:class:`~nameparser.parser.HumanName`
+        :rtype: set
+        """
+        shingles = set()
+        for component, weight, value in self._values(name):
+            shingles.update(self._grams(component, weight, value))
+        return shingles
+
+    def _hash(self, component, weight, value):
+        # the minimum of every hash function over the shingles of one
+        # component value, which repeat far more often than whole names
+        key = (component, weight, value)
+        try:
+            return self._hashes[key]
+        except KeyError:
+            if len(self._hashes) >= self.maxsize:
+                self._hashes.clear()
+            columns = [[(a * x + b) % _PRIME for a, b in self.permutations]
+                       for x in [zlib.crc32(shingle.encode('utf-8')) & 0xffffffff
+                                 for shingle in self._grams(component, weight, value)]]
+            values = self._hashes[key] = tuple(map(min, *columns)) if len(columns) > 1 else tuple(columns[0])
+            return values
+
+    def signature(self, name):
+        """
+        Return the MinHash signature of a parsed name, a tuple of
+        ``num_perm`` integers, or ``None`` if the name has no shingles.
+
+        :param name: a :py:class:`~nameparser.parser.HumanName`
+        :rtype: tuple
+        """
+        hashes = [self._hash(*values) for values in self._values(name)]
+        if len(hashes) < 2:
+            return hashes[0] if hashes else None
+        return tuple(map(min, *hashes))
+
+
+def similarity(a, b):
+    """
+    Estimate the Jaccard similarity of the shingle sets of two names from
+    their signatures.
+
+    :rtype: float
+    """
+    return sum(1 for x, y in zip(a, b) if x == y) / float(len(a))
+
+
+class LSHIndex(object):
+    """
+    A streaming LSH index of parsed names. Signatures are split into
+    ``bands`` bands of rows, and names that agree on every row of any band
+    are candidates. With the defaults, names with a shingle similarity of
+    0.6 become candidates about 95% of the time and names with a similarity
+    of 0.3 less than 13% of the time.
+
+    :param int bands: number of bands, which must divide the hasher's
+        ``num_perm``
+    :param MinHasher hasher: the hasher used for signatures
+    :param Parser parser: parser used for names added as strings
+    """
+
+    def __init__(self, bands=16, hasher=None, parser=None):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.parser = parser or Parser()
+        self.names = {}
+        self.signatures = {}
+        self.buckets = [{} for i in range(bands)]
+        self._parents = {}
+        self._next_id = 0
+
+    def __repr__(self):
+        return "<LSHIndex() {0} names>".format(len(self))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, record_id):
+        return self.names[record_id]
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows] for i in range(self.bands)]
+
+    def _find(self, record_id):
+        parents = self._parents
+        root = record_id
+        while parents[root] != root:
+            root = parents[root]
+        while parents[record_id] != root:
+            parents[record_id], record_id = root, parents[record_id]
+        return root
+
+    def add(self, name, record_id=None):
+        """
+        Add a name to the index and join it to the clusters of the names it
+        shares a bucket with. Returns its record id.
+
+        :param name: a :py:class:`~nameparser.parser.HumanName` or a name string
+        :param int record_id: id to store the name under. Defaults to the
+            next unused id.
+        :rtype: int
+        """
+        if not isinstance(name, HumanName):
+            name = self.parser.parse(name)
+        if record_id is None:
+            record_id = self._next_id
+        elif record_id in self.names:
+            raise ValueError("Record id already in the index: {0}".format(record_id))
+        self._next_id = max(self._next_id, record_id + 1)
+        self.names[record_id] = name
+        self._parents[record_id] = record_id
+        signature = self.hasher.signature(name)
+        if signature is None:
+            return record_id
+        self.signatures[record_id] = signature
+        for buckets, key in zip(self.buckets, self._band_keys(signature)):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [record_id]
+                continue
+            # the first record in a bucket is already joined to the rest
+            root, other = self._find(record_id), self._find(bucket[0])
+            if root != other:
+                self._parents[root] = other
+            bucket.append(record_id)
+        return record_id
+
+    def add_many(self, names):
+        """
+        Add each name in an iterable and return a list of their record ids.
+
+        :rtype: list
+        """
+        return [self.add(name) for name in names]
+
+    def candidates(self, name):
+        """
+        Return the sorted ids of the indexed names that share a bucket with
+        ``name``.
+
+        :param name: a :py:class:`~nameparser.parser.HumanName` or a name string
+        :rtype: list
+        """
+        if not isinstance(name, HumanName):
+            name = self.parser.parse(name)
+        signature = self.hasher.signature(name)
+        if signature is None:
+            return []
+        found = set()
+        for buckets, key in zip(self.buckets, self._band_keys(signature)):
+            found.update(buckets.get(key, ()))
+        return sorted(found)
+
+    def similarity(self, a, b):
+        """
+        Estimated shingle similarity of two indexed names.
+
+        :param int a: record id
+        :param int b: record id
+        :rtype: float
+        """
+        return similarity(self.signatures[a], self.signatures[b])
+
+    def clusters(self, min_size=2):
+        """
+        Return the groups of record ids joined by sharing buckets, each
+        sorted, ordered by their smallest id.
+
+        :param int min_size: leave out smaller groups, e.g. names without
+            any candidate duplicates
+        :rtype: list
+        """
+        groups = {}
+        for record_id in self.names:
+            groups.setdefault(self._find(record_id), []).append(record_id)
+        return sorted(sorted(group) for group in groups.values() if len(group) >= min_size)
@@ -3,16 +3,21 @@ from __future__ import unicode_literals
 
 import sys
 import re
+import threading
 from operator import itemgetter
 from itertools import groupby
+from array import array
 
 from nameparser.util import u
 from nameparser.util import text_types, binary_type
 from nameparser.util import lc
 from nameparser.util import log
+from nameparser.util import fingerprint64
 from nameparser.config import CONSTANTS
 from nameparser.config import Constants
 from nameparser.config import DEFAULT_ENCODING
+from nameparser.config import resolve
+from nameparser.config import is_resolvable
 
 ENCODING = 'utf-8'
 
@@ -30,6 +35,228 @@ def group_contiguous_integers(data):
     return ranges
 
 
+# name piece classes used in name shape signatures
+EMPTY = 1
+TITLE = 2
+SUFFIX = 4
+ROMAN = 8
+INITIAL = 16
+PREFIX = 32
+CONJUNCTION = 64
+ROOTNAME = 128
+
+#: Maximum number of compiled formatters kept per config.
+MAX_FORMATTERS = 256
+
+#: Maximum number of capitalized pieces remembered per config.
+CAPITALIZATION_CACHE_SIZE = 4096
+
+#: Version of the compact pickle format written by
+#: :py:meth:`HumanName.__reduce__`.
+PICKLE_VERSION = 2
+
+# instance settings that are only pickled when they differ from the config
+_PICKLED_FORMATS = ('string_format', 'initials_format', 'initials_delimiter')
+
+# instance attributes pickled as arguments of _restore_name, or caches and
+# cursors that are worked out again. Any others, e.g. set by subclasses, are
+# pickled as they are.
+_PICKLED_ATTRS = frozenset(_PICKLED_FORMATS + (
+    'C', 'original', '_full_name', 'encoding', 'unparsable', '_learned', 'phonetic_codes',
+    'title_list', 'first_list', 'middle_list', 'last_list', 'suffix_list', 'nickname_list',
+    '_canonical', '_initials', '_sort_keys', '_count'))
+
+# attributes name pieces are assigned to by a plan
+TITLE_ROLE, FIRST_ROLE, MIDDLE_ROLE, LAST_ROLE, SUFFIX_ROLE = range(5)
+
+
+class PlanCache(object):
+    """
+    A bounded, least recently used cache of component assignment plans keyed
+    by name shape. Once name pieces are classified, the attribute each piece
+    is assigned to only depends on the sequence of piece classes and the
+    comma format, so names with the same shape reuse the same plan.
+
+    Lookups and evictions hold a lock, so a cache can be shared by parsers
+    running in parallel threads. Plans are built outside the lock.
+
+    The same cache is used by :py:meth:`HumanName.capitalization_cache` to
+    remember capitalized pieces.
+
+    :param int maxsize: maximum number of plans to keep
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __repr__(self):
+        return "<PlanCache(maxsize={0}) hits={1} misses={2}>".format(
+            self.maxsize, self.hits, self.misses)
+
+    def __len__(self):
+        return len(self.plans)
+
+    def get(self, signature, build):
+        """
+        Return the plan for ``signature``, calling ``build(signature)`` to
+        make it if it is not cached.
+        """
+        with self._lock:
+            try:
+                plan = self.plans.pop(signature)
+            except KeyError:
+                pass
+            else:
+                self.hits += 1
+                self.plans[signature] = plan
+                return plan
+        plan = build(signature)
+        with self._lock:
+            self.misses += 1
+            # another thread may have built the same plan meanwhile
+            self.plans.pop(signature, None)
+            if len(self.plans) >= self.maxsize:
+                del self.plans[next(iter(self.plans))]
+            self.plans[signature] = plan
+        return plan
+
+    def clear(self):
+        """Remove all plans and reset the counters."""
+        with self._lock:
+            self.plans = {}
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Return the cache counters as a dictionary.
+
+        :rtype: dict
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'size': len(self.plans),
+            'maxsize': self.maxsize,
+        }
+
+
+def _first_is_set(first_classes, has_default):
+    # mirrors the truthiness of HumanName.first while assigning pieces
+    return has_default or len(first_classes) > 1 \
+        or (len(first_classes) == 1 and not first_classes[0] & EMPTY)
+
+
+def suffix_tail(classes):
+    """
+    Return the index where the trailing run of ``SUFFIX`` pieces begins, or
+    ``len(classes)`` if the last piece is not a suffix. All pieces from
+    ``i + 1`` on are suffixes if ``i + 1 >= suffix_tail(classes)``.
+    """
+    i = len(classes)
+    while i and classes[i - 1] & SUFFIX:
+        i -= 1
+    return i
+
+
+def _plan_pieces(classes, has_nickname, has_default, check_numeral):
+    roles = []
+    first_classes = []
+    p_len = len(classes)
+    tail = suffix_tail(classes)
+    for i, c in enumerate(classes):
+        nxt = i + 1 < p_len and not classes[i + 1] & EMPTY
+
+        # title must have a next piece, unless it's just a title
+        if not _first_is_set(first_classes, has_default) \
+                and (nxt or p_len == 1) \
+                and c & TITLE:
+            roles.append(TITLE_ROLE)
+            continue
+        if not _first_is_set(first_classes, has_default):
+            if p_len == 1 and has_nickname:
+                roles.append(LAST_ROLE)
+                continue
+            roles.append(FIRST_ROLE)
+            first_classes.append(c)
+            continue
+        if i + 1 >= tail or (
+                # if the next piece is the last piece and a roman
+                # numeral but this piece is not an initial
+                check_numeral and i == p_len - 2
+                and classes[i + 1] & ROMAN and not c & INITIAL
+        ):
+            roles.append(LAST_ROLE)
+            roles += [SUFFIX_ROLE] * (p_len - i - 1)
+            break
+        if not nxt:
+            roles.append(LAST_ROLE)
+            continue
+        roles.append(MIDDLE_ROLE)
+    return tuple(roles)
+
+
+def plan_no_comma(signature):
+    """
+    Assignment plan for names without commas:
+    title first middle middle middle last suffix
+    """
+    _, classes, has_nickname, has_default = signature
+    return _plan_pieces(classes, has_nickname, has_default, True)
+
+
+def plan_suffix_comma(signature):
+    """
+    Assignment plan for the part before the comma in names with suffixes
+    after a comma: title first middle last [suffix], suffix [suffix]
+    """
+    _, classes, has_default = signature
+    return _plan_pieces(classes, False, has_default, False)
+
+
+def plan_lastname_comma(signature):
+    """
+    Assignment plans for the two parts of names with the last name first:
+    last [suffix], title first middles[,] suffix [,suffix]
+    """
+    _, lastname_classes, post_comma_classes, has_default = signature
+
+    # the first one is always a last name, even if it looks like a suffix
+    lastname_roles = tuple(
+        SUFFIX_ROLE if i and c & SUFFIX else LAST_ROLE
+        for i, c in enumerate(lastname_classes)
+    )
+
+    roles = []
+    first_classes = []
+    p_len = len(post_comma_classes)
+    for i, c in enumerate(post_comma_classes):
+        nxt = i + 1 < p_len and not post_comma_classes[i + 1] & EMPTY
+        if not _first_is_set(first_classes, has_default) \
+                and (nxt or p_len == 1) \
+                and c & TITLE:
+            roles.append(TITLE_ROLE)
+            continue
+        if not _first_is_set(first_classes, has_default):
+            roles.append(FIRST_ROLE)
+            first_classes.append(c)
+            continue
+        if c & SUFFIX:
+            roles.append(SUFFIX_ROLE)
+            continue
+        roles.append(MIDDLE_ROLE)
+    return lastname_roles, tuple(roles)
+
+
 class HumanName(object):
     """
     Parse a person's name into individual components.
@@ -80,10 +307,29 @@ class HumanName(object):
     The original string, untouched by the parser.
     """
 
+    plan_cache = PlanCache()
+    """
+    The :py:class:`PlanCache` shared by all instances that reuses the
+    assignment of name pieces to attributes for names with the same shape.
+    ``HumanName.plan_cache.stats()`` reports its hit rate.
+    """
+
     _count = 0
     _members = ['title', 'first', 'middle', 'last', 'suffix', 'nickname']
     unparsable = True
     _full_name = ''
+    _learned = {}
+    _initials = None
+    _canonical = None
+    _sort_keys = None
+
+    phonetic_codes = {}
+    """
+    Phonetic codes of the first and last name keyed
+    ``'<component>_<encoder>'``, e.g. ``'last_soundex'``, filled in while
+    parsing when :py:attr:`~nameparser.config.Constants.phonetic_encoders`
+    is set.
+    """
 
     def __init__(self, full_name="", constants=CONSTANTS, encoding=DEFAULT_ENCODING,
                  string_format=None, initials_format=None, initials_delimiter=None,
@@ -110,7 +356,10 @@ class HumanName(object):
             self.full_name = full_name
 
     def __iter__(self):
-        return self
+        for member in self._members:
+            value = getattr(self, member)
+            if value:
+                yield value
 
     def __len__(self):
         l = 0
@@ -120,13 +369,16 @@ class HumanName(object):
 
     def __eq__(self, other):
         """
-        HumanName instances are equal to other objects whose
+        HumanName instances are equal to each other if their
+        :py:meth:`canonical_key` is the same, and to other objects whose
         lower case unicode representation is the same.
         """
+        if isinstance(other, HumanName):
+            return self.canonical_key() == other.canonical_key()
         return (u(self)).lower() == (u(other)).lower()
 
     def __ne__(self, other):
-        return not (u(self)).lower() == (u(other)).lower()
+        return not self == other
 
     def __getitem__(self, key):
         if isinstance(key, slice):
@@ -155,14 +407,151 @@ class HumanName(object):
     def __unicode__(self):
         if self.string_format:
             # string_format = "{title} {first} {middle} {last} {suffix} ({nickname})"
-            _s = self.string_format.format(**self.as_dict())
-            # remove trailing punctuation from missing nicknames
-            _s = _s.replace(str(self.C.empty_attribute_default), '').replace(" ()", "").replace(" ''", "").replace(' ""', "")
-            return self.collapse_whitespace(_s).strip(', ')
+            return self.formatter(self.string_format).render(self)
         return " ".join(self)
 
     def __hash__(self):
-        return hash(str(self))
+        return self.fingerprint()
+
+    def canonical_key(self):
+        """
+        Returns a tuple of the lower case title, first, middle, last, suffix
+        and nickname. Names with the same key are equal. The key is worked
+        out once and reused until the name's pieces change.
+
+        :rtype: tuple
+
+        .. doctest::
+
+            >>> HumanName("Doe, John A.").canonical_key()
+            ('', 'john', 'a.', 'doe', '', '')
+        """
+        # a copy of the pieces, as the lists may be changed in place
+        pieces = (tuple(self.title_list), tuple(self.first_list), tuple(self.middle_list),
+                  tuple(self.last_list), tuple(self.suffix_list), tuple(self.nickname_list))
+        cached = self._canonical
+        if cached and cached[0] == pieces:
+            return cached[1]
+        key = tuple([" ".join(values).lower() for values in pieces])
+        self._canonical = (pieces, key, fingerprint64(key))
+        return key
+
+    def fingerprint(self):
+        """
+        Returns a 64 bit integer fingerprint of the :py:meth:`canonical_key`.
+        Equal names have the same fingerprint in every process, so it can be
+        stored for deduplication or used to pick a shard with :py:meth:`shard`.
+
+        :rtype: int
+        """
+        self.canonical_key()
+        return self._canonical[2]
+
+    def shard(self, count):
+        """
+        Returns a shard number from 0 to ``count - 1`` for this name, the same
+        for equal names on every worker.
+
+        :param int count: number of shards
+        :rtype: int
+        """
+        return self.fingerprint() % count
+
+    def __reduce__(self):
+        """
+        Pickles only the name's pieces, its settings that differ from its
+        config and the config's :py:meth:`~nameparser.config.Constants.fingerprint`.
+        On load the config is found with :py:func:`~nameparser.config.resolve`:
+        a config passed to :py:func:`~nameparser.config.register`, the
+        module-wide config, or a new default config for a name that had its
+        own.
+
+        A config that is neither registered nor equal to the defaults, e.g.
+        the module-wide config after the parser learned titles like
+        "Lt.Gov.", is also pickled as its compact
+        :py:meth:`~nameparser.config.Constants.__getstate__`, once per
+        pickle, and rebuilt from it if no config matches on load.
+
+        Other instance attributes, e.g. set by a subclass, are pickled as
+        they are.
+        """
+        state = None if is_resolvable(self.C) else self.C._shared_state()
+        extra = self._extra_attrs()
+        if extra:
+            return (_restore_name, self._pickle_args() + (state,), extra)
+        return (_restore_name, self._pickle_args() + (state,))
+
+    def _extra_attrs(self):
+        return dict((attr, value) for attr, value in self.__dict__.items()
+                    if attr not in _PICKLED_ATTRS)
+
+    def _pickle_args(self):
+        options = {}
+        for attr in _PICKLED_FORMATS:
+            value = getattr(self, attr)
+            if value != getattr(self.C, attr):
+                options[attr] = value
+        if self.encoding != DEFAULT_ENCODING:
+            options['encoding'] = self.encoding
+        if self.unparsable:
+            options['unparsable'] = True
+        if self._learned:
+            options['_learned'] = self._learned
+        if self.phonetic_codes:
+            options['phonetic_codes'] = self.phonetic_codes
+        lists = (self.title_list, self.first_list, self.middle_list,
+                 self.last_list, self.suffix_list, self.nickname_list)
+        return (type(self), PICKLE_VERSION, self.C.fingerprint(),
+                self.C is not CONSTANTS, self.original, self._full_name,
+                lists, options)
+
+    def __copy__(self):
+        name = _restore_name(*self._pickle_args(), state=None, constants=self.C)
+        name.__dict__.update(self._extra_attrs())
+        return name
+
+    def __deepcopy__(self, memo):
+        import copy
+        own = self.C is not CONSTANTS
+        name = _restore_name(*self._pickle_args(), state=None,
+                             constants=copy.deepcopy(self.C, memo) if own else self.C)
+        memo[id(self)] = name
+        name.__dict__.update(copy.deepcopy(self._extra_attrs(), memo))
+        return name
+
+    def sort_key(self, policy='as_written'):
+        """
+        Returns a key for sorting names by last name, first name, middle name
+        and suffix, ignoring case. The key is worked out once per policy and
+        reused until the name or the config's prefixes change. See
+        :py:mod:`~nameparser.sorting` for the policies.
+
+        :param policy: name of a policy in
+            :py:data:`~nameparser.sorting.POLICIES` or a function
+        :rtype: tuple
+
+        .. doctest::
+
+            >>> HumanName("Vincent van Gogh").sort_key('ignore_prefixes')
+            ('gogh', 'vincent', '', '', 'van gogh')
+        """
+        key = self.canonical_key()
+        stamp = (key, self.C.prefixes.revision)
+        cached = self._sort_keys
+        if cached is None or cached[0] != stamp:
+            cached = self._sort_keys = (stamp, {})
+        try:
+            return cached[1][policy]
+        except KeyError:
+            from nameparser.sorting import POLICIES
+            if policy in POLICIES:
+                make_key = POLICIES[policy]
+            elif callable(policy):
+                make_key = policy
+            else:
+                raise ValueError("Unknown sort policy: {0}".format(policy))
+            sort_key = cached[1][policy] = make_key(self, key)
+            return sort_key
 
     def __str__(self):
         if sys.version_info[0] >= 3:
@@ -228,6 +617,43 @@ class HumanName(object):
         else:
             return self.C.empty_attribute_default
 
+    def initials_groups(self, memo=None):
+        """
+            Returns a tuple of the first, middle and last name initials lists used by
+            :py:meth:`initials` and :py:meth:`initials_list`. They are worked out once
+            and reused until the first, middle or last name pieces change.
+
+            :param dict memo: initials of pieces already seen in other names parsed
+                with the same config, shared by :py:meth:`Parser.initials_many`
+            :rtype: tuple
+
+            .. doctest::
+
+                >>> name = HumanName("Sir Bob Andrew van Dole")
+                >>> name.initials_groups()
+                (["B"], ["A"], ["D"])
+        """
+        lists = (self.first_list, self.middle_list, self.last_list)
+        # a copy of the pieces, as the lists may be changed in place
+        pieces = tuple(map(tuple, lists))
+        cached = self._initials
+        if cached and cached[0] == pieces:
+            return cached[1]
+        if memo is None or self._learned:
+            memo = {}
+        groups = ([self.__process_initial__(name, True) for name in self.first_list if name], [], [])
+        for group, pieces in zip(groups[1:], lists[1:]):
+            for name in pieces:
+                if not name:
+                    continue
+                try:
+                    initial = memo[name]
+                except KeyError:
+                    initial = memo[name] = self.__process_initial__(name)
+                group.append(initial)
+        self._initials = (pieces, groups)
+        return groups
+
     def initials_list(self):
         """
             Returns the initials as a list
@@ -241,9 +667,7 @@ class HumanName(object):
                 >>> name.initials_list()
                 ["J", "D"]
         """
-        first_initials_list = [self.__process_initial__(name, True) for name in self.first_list if name]
-        middle_initials_list = [self.__process_initial__(name) for name in self.middle_list if name]
-        last_initials_list = [self.__process_initial__(name) for name in self.last_list if name]
+        first_initials_list, middle_initials_list, last_initials_list = self.initials_groups()
         return first_initials_list + middle_initials_list + last_initials_list
 
     def initials(self):
@@ -263,9 +687,7 @@ class HumanName(object):
                 "B. A."
         """
 
-        first_initials_list = [self.__process_initial__(name, True) for name in self.first_list if name]
-        middle_initials_list = [self.__process_initial__(name) for name in self.middle_list if name]
-        last_initials_list = [self.__process_initial__(name) for name in self.last_list if name]
+        first_initials_list, middle_initials_list, last_initials_list = self.initials_groups()
 
         initials_dict = {
             "first":  (self.initials_delimiter + " ").join(first_initials_list) + self.initials_delimiter
@@ -276,8 +698,29 @@ class HumanName(object):
             if len(last_initials_list) else self.C.empty_attribute_default
         }
 
-        _s = self.initials_format.format(**initials_dict)
-        return self.collapse_whitespace(_s)
+        return self.formatter(self.initials_format, initials=True).format(initials_dict)
+
+    def formatter(self, format_string, initials=False):
+        """
+        Return the :py:class:`~nameparser.formatting.Formatter` compiled from
+        ``format_string`` for this name's config. Formatters are compiled once
+        per config and reused by every name that shares it.
+
+        :param str format_string: a string or initials format
+        :param bool initials: ``format_string`` is an initials format
+        :rtype: :py:class:`~nameparser.formatting.Formatter`
+        """
+        C = self.C
+        key = (format_string, initials, C.empty_attribute_default,
+               id(C.regexes), C.regexes.revision)
+        try:
+            return C._formatters[key]
+        except KeyError:
+            from nameparser.formatting import Formatter
+            if len(C._formatters) >= MAX_FORMATTERS:
+                C._formatters.clear()
+            formatter = C._formatters[key] = Formatter(format_string, C, initials)
+            return formatter
 
     @property
     def has_own_config(self):
@@ -397,9 +840,23 @@ class HumanName(object):
 
     # Parse helpers
 
+    def learn(self, constant, piece):
+        """
+        Remember a piece the parser has identified as a new title, suffix or
+        conjunction so that it is recognized later in the parse. Adds it to
+        the config set named ``constant``, or in
+        :py:attr:`~nameparser.config.Constants.thread_safe` mode, to a set
+        that only lives as long as the current parse.
+        """
+        if self.C.thread_safe:
+            self._learned.setdefault(constant, set()).add(lc(piece))
+        else:
+            getattr(self.C, constant).add(piece)
+
     def is_title(self, value):
         """Is in the :py:data:`~nameparser.config.titles.TITLES` set."""
-        return lc(value) in self.C.titles
+        return lc(value) in self.C.titles \
+            or (bool(self._learned) and lc(value) in self._learned.get('titles', ()))
 
     def is_conjunction(self, piece):
         """Is in the conjunctions set and not :py:func:`is_an_initial()`."""
@@ -408,7 +865,9 @@ class HumanName(object):
                 if self.is_conjunction(item):
                     return True
         else:
-            return piece.lower() in self.C.conjunctions and not self.is_an_initial(piece)
+            return (piece.lower() in self.C.conjunctions
+                    or (bool(self._learned) and piece.lower() in self._learned.get('conjunctions', ()))) \
+                and not self.is_an_initial(piece)
 
     def is_prefix(self, piece):
         """
@@ -443,8 +902,10 @@ class HumanName(object):
                 if self.is_suffix(item):
                     return True
         else:
-            return ((lc(piece).replace('.', '') in self.C.suffix_acronyms)
-                    or (lc(piece) in self.C.suffix_not_acronyms)) \
+            value = lc(piece)
+            return ((value.replace('.', '') in self.C.suffix_acronyms)
+                    or (value in self.C.suffix_not_acronyms)
+                    or (bool(self._learned) and value in self._learned.get('suffix_not_acronyms', ()))) \
                 and not self.is_an_initial(piece)
 
     def are_suffixes(self, pieces):
@@ -458,8 +919,16 @@ class HumanName(object):
         """
         Is not a known title, suffix or prefix. Just first, middle, last names.
         """
-        return lc(piece) not in self.C.suffixes_prefixes_titles \
-            and not self.is_an_initial(piece)
+        if self.C.thread_safe:
+            # don't populate the shared suffixes_prefixes_titles cache
+            value = lc(piece)
+            known = value in self.C.prefixes or value in self.C.titles \
+                or value in self.C.suffix_acronyms or value in self.C.suffix_not_acronyms \
+                or (bool(self._learned) and (value in self._learned.get('titles', ())
+                                             or value in self._learned.get('suffix_not_acronyms', ())))
+        else:
+            known = lc(piece) in self.C.suffixes_prefixes_titles
+        return not known and not self.is_an_initial(piece)
 
     def is_an_initial(self, value):
         """
@@ -508,11 +977,12 @@ class HumanName(object):
     def post_process(self):
         """
         This happens at the end of the :py:func:`parse_full_name` after
-        all other processing has taken place. Runs :py:func:`handle_firstnames`
-        and :py:func:`handle_capitalization`.
+        all other processing has taken place. Runs :py:func:`handle_firstnames`,
+        :py:func:`handle_capitalization` and :py:func:`handle_phonetics`.
         """
         self.handle_firstnames()
         self.handle_capitalization()
+        self.handle_phonetics()
 
     def fix_phd(self):
         try:
@@ -580,6 +1050,9 @@ class HumanName(object):
 
         :py:func:`parse_pieces` then splits those parts on spaces and
         :py:func:`join_on_conjunctions` joins any pieces next to conjunctions.
+        The pieces are classified with :py:func:`classify_pieces` and assigned
+        to attributes by a plan for that shape of name from
+        :py:attr:`plan_cache`.
         """
 
         self.title_list = []
@@ -589,6 +1062,9 @@ class HumanName(object):
         self.suffix_list = []
         self.nickname_list = []
         self.unparsable = True
+        self._learned = {}
+        self._initials = None
+        self._canonical = None
 
         self.pre_process()
 
@@ -600,46 +1076,27 @@ class HumanName(object):
         log.debug("full_name: %s", self._full_name)
         log.debug("parts: %s", parts)
 
+        # an empty attribute default that is truthy makes HumanName.first
+        # truthy even before a first name is found
+        has_default = bool(self.C.empty_attribute_default)
+
         if len(parts) == 1:
 
             # no commas, title first middle middle middle last suffix
             #            part[0]
 
             pieces = self.parse_pieces(parts)
-            p_len = len(pieces)
-            for i, piece in enumerate(pieces):
-                try:
-                    nxt = pieces[i + 1]
-                except IndexError:
-                    nxt = None
-
-                # title must have a next piece, unless it's just a title
-                if not self.first \
-                        and (nxt or p_len == 1) \
-                        and self.is_title(piece):
-                    self.title_list.append(piece)
-                    continue
-                if not self.first:
-                    if p_len == 1 and self.nickname:
-                        self.last_list.append(piece)
-                        continue
-                    self.first_list.append(piece)
-                    continue
-                if self.are_suffixes(pieces[i+1:]) or \
-                        (
-                            # if the next piece is the last piece and a roman
-                            # numeral but this piece is not an initial
-                            self.is_roman_numeral(nxt) and i == p_len - 2
-                            and not self.is_an_initial(piece)
-                ):
-                    self.last_list.append(piece)
-                    self.suffix_list += pieces[i+1:]
-                    break
-                if not nxt:
-                    self.last_list.append(piece)
-                    continue
-
-                self.middle_list.append(piece)
+            classes = self.classify_pieces(pieces, edges=True)
+            if len(pieces) > 1:
+                # only the last piece can be a roman numeral suffix, and only
+                # if the piece before it is not an initial
+                classes = classes[:-2] + (
+                    classes[-2] | (INITIAL if self.is_an_initial(pieces[-2]) else 0),
+                    classes[-1] | (ROMAN if self.is_roman_numeral(pieces[-1]) else 0),
+                )
+            signature = ('no comma', classes, bool(self.nickname), has_default)
+            plan = self.plan(signature, plan_no_comma)
+            self.apply_plan(pieces, plan, self.suffix_list)
         else:
             # if all the end parts are suffixes and there is more than one piece
             # in the first part. (Suffixes will never appear after last names
@@ -658,28 +1115,12 @@ class HumanName(object):
                 self.suffix_list += parts[1:]
                 pieces = self.parse_pieces(parts[0].split(' '))
                 log.debug("pieces: %s", u(pieces))
-                for i, piece in enumerate(pieces):
-                    try:
-                        nxt = pieces[i + 1]
-                    except IndexError:
-                        nxt = None
-
-                    if not self.first \
-                            and (nxt or len(pieces) == 1) \
-                            and self.is_title(piece):
-                        self.title_list.append(piece)
-                        continue
-                    if not self.first:
-                        self.first_list.append(piece)
-                        continue
-                    if self.are_suffixes(pieces[i+1:]):
-                        self.last_list.append(piece)
-                        self.suffix_list = pieces[i+1:] + self.suffix_list
-                        break
-                    if not nxt:
-                        self.last_list.append(piece)
-                        continue
-                    self.middle_list.append(piece)
+                signature = ('suffix comma', self.classify_pieces(pieces, edges=True), has_default)
+                plan = self.plan(signature, plan_suffix_comma)
+                # suffixes from the first part come before the other parts
+                suffix_list = []
+                self.apply_plan(pieces, plan, suffix_list)
+                self.suffix_list = suffix_list + self.suffix_list
             else:
 
                 # lastname comma:
@@ -690,32 +1131,15 @@ class HumanName(object):
 
                 # lastname part may have suffixes in it
                 lastname_pieces = self.parse_pieces(parts[0].split(' '), 1)
-                for piece in lastname_pieces:
-                    # the first one is always a last name, even if it looks like
-                    # a suffix
-                    if self.is_suffix(piece) and len(self.last_list) > 0:
-                        self.suffix_list.append(piece)
-                    else:
-                        self.last_list.append(piece)
-
-                for i, piece in enumerate(post_comma_pieces):
-                    try:
-                        nxt = post_comma_pieces[i + 1]
-                    except IndexError:
-                        nxt = None
-
-                    if not self.first \
-                            and (nxt or len(post_comma_pieces) == 1) \
-                            and self.is_title(piece):
-                        self.title_list.append(piece)
-                        continue
-                    if not self.first:
-                        self.first_list.append(piece)
-                        continue
-                    if self.is_suffix(piece):
-                        self.suffix_list.append(piece)
-                        continue
-                    self.middle_list.append(piece)
+                signature = (
+                    'lastname comma',
+                    self.classify_pieces(lastname_pieces, titles=False),
+                    self.classify_pieces(post_comma_pieces),
+                    has_default,
+                )
+                lastname_plan, post_comma_plan = self.plan(signature, plan_lastname_comma)
+                self.apply_plan(lastname_pieces, lastname_plan, self.suffix_list)
+                self.apply_plan(post_comma_pieces, post_comma_plan, self.suffix_list)
                 try:
                     if parts[2]:
                         self.suffix_list += parts[2:]
@@ -728,6 +1152,60 @@ class HumanName(object):
             self.unparsable = False
         self.post_process()
 
+    def classify_pieces(self, pieces, titles=True, edges=False):
+        """
+        Return a tuple of bit flags describing each piece: ``EMPTY``,
+        ``TITLE`` and ``SUFFIX``. Together with the comma format these
+        classes determine how :py:func:`parse_full_name` assigns the pieces
+        to name attributes.
+
+        :param list pieces: name pieces
+        :param bool titles: check if the pieces are titles
+        :param bool edges: only check the pieces that can be titles or
+            suffixes when there are no commas: titles up to the first piece
+            that is not one, and suffixes back from the end up to the first
+            piece that is not one, which is where :py:func:`suffix_tail`
+            begins.
+        :rtype: tuple
+        """
+        classes = [0 if piece else EMPTY for piece in pieces]
+        if titles:
+            for i, piece in enumerate(pieces):
+                if self.is_title(piece):
+                    classes[i] |= TITLE
+                elif edges and piece:
+                    break
+        if edges:
+            for i in range(len(pieces) - 1, -1, -1):
+                if not self.is_suffix(pieces[i]):
+                    break
+                classes[i] |= SUFFIX
+        else:
+            for i, piece in enumerate(pieces):
+                if self.is_suffix(piece):
+                    classes[i] |= SUFFIX
+        return tuple(classes)
+
+    def plan(self, signature, build):
+        """
+        Return the assignment plan for a name shape ``signature``, from
+        :py:attr:`plan_cache` or by calling ``build(signature)``. The cache is
+        not used in :py:attr:`~nameparser.config.Constants.thread_safe` mode.
+        """
+        if self.C.thread_safe:
+            return build(signature)
+        return self.plan_cache.get(signature, build)
+
+    def apply_plan(self, pieces, plan, suffix_list):
+        """
+        Append each piece to the list of the attribute ``plan`` assigns it
+        to. Suffixes are appended to ``suffix_list``.
+        """
+        lists = (self.title_list, self.first_list, self.middle_list,
+                 self.last_list, suffix_list)
+        for piece, role in zip(pieces, plan):
+            lists[role].append(piece)
+
     def parse_pieces(self, parts, additional_parts_count=0):
         """
         Split parts on spaces and remove commas, join on conjunctions and
@@ -766,10 +1244,10 @@ class HumanName(object):
 
                 # add the part to the constant so it will be found
                 if len(list(titles)):
-                    self.C.titles.add(part)
+                    self.learn('titles', part)
                     continue
                 if len(list(suffixes)):
-                    self.C.suffix_not_acronyms.add(part)
+                    self.learn('suffix_not_acronyms', part)
                     continue
 
         return self.join_on_conjunctions(output, additional_parts_count)
@@ -831,7 +1309,7 @@ class HumanName(object):
                 delete_i += [i+1]
                 pieces[i] = new_piece
             # add newly joined conjunctions to constants to be found later
-            self.C.conjunctions.add(new_piece)
+            self.learn('conjunctions', new_piece)
 
         for i in reversed(delete_i):
             # delete pieces in reverse order or the index changes on each delete
@@ -856,7 +1334,7 @@ class HumanName(object):
                 new_piece = " ".join(pieces[i:i+2])
                 if self.is_title(pieces[i+1]):
                     # when joining to a title, make new_piece a title too
-                    self.C.titles.add(new_piece)
+                    self.learn('titles', new_piece)
                 pieces[i] = new_piece
                 pieces.pop(i+1)
                 # subtract 1 from the index of all the remaining conjunctions
@@ -868,7 +1346,7 @@ class HumanName(object):
                 new_piece = " ".join(pieces[i-1:i+2])
                 if self.is_title(pieces[i-1]):
                     # when joining to a title, make new_piece a title too
-                    self.C.titles.add(new_piece)
+                    self.learn('titles', new_piece)
                 pieces[i-1] = new_piece
                 pieces.pop(i)
                 rm_count = 2
@@ -952,6 +1430,45 @@ class HumanName(object):
         def replacement(m): return self.cap_word(m.group(0), attribute)
         return self.C.regexes.word.sub(replacement, piece)
 
+    def _cap_key(self, key):
+        return self.cap_piece(*key)
+
+    def capitalization_cache(self):
+        """
+        Return the :py:class:`PlanCache` of capitalized pieces for this name's
+        config, or ``None`` in :py:attr:`~nameparser.config.Constants.thread_safe`
+        mode. The cache is emptied when the prefixes, conjunctions,
+        capitalization exceptions or regexes of the config change.
+        """
+        C = self.C
+        if C.thread_safe:
+            return None
+        revisions = (C.prefixes.revision, C.conjunctions.revision,
+                     C.capitalization_exceptions.revision, C.regexes.revision)
+        cache = C._capitalization_cache
+        if cache is None or cache.revisions != revisions:
+            cache = C._capitalization_cache = PlanCache(CAPITALIZATION_CACHE_SIZE)
+            cache.revisions = revisions
+        return cache
+
+    def cap_pieces(self, pieces, attribute, cache=None):
+        """
+        Return a list of ``pieces`` capitalized with :py:meth:`cap_piece`,
+        reusing earlier results for the same piece and attribute from
+        ``cache``.
+        """
+        if cache is None:
+            return [self.cap_piece(piece, attribute) for piece in pieces]
+        return [cache.get((piece, attribute), self._cap_key) for piece in pieces]
+
+    def is_single_case(self):
+        """
+        True if the name's pieces are all upper case or all lower case.
+        """
+        text = " ".join(piece for member in self._members
+                        for piece in getattr(self, member + '_list'))
+        return text == text.upper() or text == text.lower()
+
     def capitalize(self, force=None):
         """
         The HumanName class can try to guess the correct capitalization of name
@@ -959,6 +1476,11 @@ class HumanName(object):
         case of names entered in mixed case. To run capitalization on all names
         pass the parameter `force=True`.
 
+        Capitalized pieces are remembered in a bounded cache per config (see
+        :py:meth:`capitalization_cache`), so common pieces are only
+        capitalized once when many names are parsed with
+        :py:attr:`~nameparser.config.Constants.capitalize_name` set.
+
         :param bool force: Forces capitalization of mixed case strings. This
             parameter overrides rules set within
             :py:class:`~nameparser.config.CONSTANTS`.
@@ -981,17 +1503,17 @@ class HumanName(object):
             'Shirley MacLaine'
 
         """
-        name = u(self)
         force = self.C.force_mixed_case_capitalization \
             if force is None else force
 
-        if not force and not (name == name.upper() or name == name.lower()):
+        if not force and not self.is_single_case():
             return
-        self.title_list = self.cap_piece(self.title, 'title').split(' ')
-        self.first_list = self.cap_piece(self.first, 'first').split(' ')
-        self.middle_list = self.cap_piece(self.middle, 'middle').split(' ')
-        self.last_list = self.cap_piece(self.last, 'last').split(' ')
-        self.suffix_list = self.cap_piece(self.suffix, 'suffix').split(', ')
+        cache = self.capitalization_cache()
+        self.title_list = self.cap_pieces(self.title_list, 'title', cache)
+        self.first_list = self.cap_pieces(self.first_list, 'first', cache)
+        self.middle_list = self.cap_pieces(self.middle_list, 'middle', cache)
+        self.last_list = self.cap_pieces(self.last_list, 'last', cache)
+        self.suffix_list = self.cap_pieces(self.suffix_list, 'suffix', cache)
 
     def handle_capitalization(self):
         """
@@ -1000,3 +1522,296 @@ class HumanName(object):
         """
         if self.C.capitalize_name:
             self.capitalize()
+
+    def handle_phonetics(self):
+        """
+        Encodes the first and last name with the
+        :py:attr:`~nameparser.config.Constants.phonetic_encoders` set within
+        :py:class:`~nameparser.config.CONSTANTS`.
+        """
+        if self.C.phonetic_encoders:
+            from nameparser import phonetics
+            self.phonetic_codes = phonetics.encode(self, self.C.phonetic_encoders)
+        elif self.phonetic_codes:
+            self.phonetic_codes = {}
+
+    def phonetic(self, component, encoder):
+        """
+        Returns the phonetic code of one component, e.g.
+        ``name.phonetic('last', 'soundex')``, using the code worked out while
+        parsing if there is one.
+
+        :param str component: a name attribute, e.g. ``'first'``
+        :param str encoder: name of an encoder in
+            :py:data:`~nameparser.phonetics.ENCODERS`
+        """
+        try:
+            return self.phonetic_codes[component + '_' + encoder]
+        except KeyError:
+            from nameparser import phonetics
+            return phonetics.encode(self, (encoder,), (component,))[component + '_' + encoder]
+
+
+def _restore_name(cls, version, fingerprint, own, original, full_name, lists,
+                  options, state, constants=None):
+    # loads a name pickled by HumanName.__reduce__
+    if version != PICKLE_VERSION:
+        raise ValueError("Unsupported HumanName pickle version: {0}".format(version))
+    name = cls.__new__(cls)
+    name.C = constants or resolve(fingerprint, shared=not own, state=state)
+    for attr in _PICKLED_FORMATS:
+        setattr(name, attr, options.get(attr, getattr(name.C, attr)))
+    name.encoding = options.get('encoding', DEFAULT_ENCODING)
+    name.original = original
+    name._full_name = full_name
+    (name.title_list, name.first_list, name.middle_list, name.last_list,
+     name.suffix_list, name.nickname_list) = [list(pieces) for pieces in lists]
+    name.unparsable = options.get('unparsable', False)
+    for attr in ('_learned', 'phonetic_codes'):
+        if attr in options:
+            setattr(name, attr, options[attr])
+    return name
+
+
+class TokenTable(object):
+    """
+    Dictionary encoding of the tokens seen while parsing a batch of names.
+    Each distinct token gets an integer id and is classified against the
+    config once, the first time the parser asks about it. After that the
+    ``is_*`` helpers and :py:meth:`~HumanName.classify_pieces` are answered
+    from the table instead of normalizing the token and probing the config
+    sets again.
+
+    Used by :py:meth:`Parser.parse_batch`. A table assumes the config does not
+    change while it is in use.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.tokens = []
+        self.classes = array(str('H'))
+        self.pending = set()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __repr__(self):
+        return "<TokenTable: {0} tokens>".format(len(self.tokens))
+
+    def encode(self, token):
+        """
+        Return the id of ``token``, adding it to the table if it is new.
+        """
+        try:
+            return self.ids[token]
+        except KeyError:
+            i = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+            self.classes.append(0)
+            return i
+
+    def classify(self, name, token):
+        """
+        Return the class bit flags of ``token``, asking the unmemoized
+        ``is_*`` helpers of ``name`` the first time the token is seen.
+        Returns ``None`` if called again for a token while it is being
+        classified.
+        """
+        try:
+            return self.classes[self.ids[token]]
+        except KeyError:
+            pass
+        if token in self.pending:
+            return None
+        self.pending.add(token)
+        cls = self.name_class
+        c = 0 if token else EMPTY
+        try:
+            if cls.is_title(name, token):
+                c |= TITLE
+            if cls.is_suffix(name, token):
+                c |= SUFFIX
+            if cls.is_prefix(name, token):
+                c |= PREFIX
+            if cls.is_conjunction(name, token):
+                c |= CONJUNCTION
+            if cls.is_an_initial(name, token):
+                c |= INITIAL
+            if cls.is_roman_numeral(name, token):
+                c |= ROMAN
+            if cls.is_rootname(name, token):
+                c |= ROOTNAME
+        finally:
+            self.pending.discard(token)
+        self.classes[self.encode(token)] = c
+        return c
+
+    def bind(self, name_class):
+        """
+        Return a subclass of ``name_class`` whose ``is_*`` helpers and
+        :py:meth:`~HumanName.classify_pieces` are answered from this table.
+        """
+        table = self
+        self.name_class = name_class
+
+        def memoized(flag, helper):
+            def is_flag(self, piece):
+                if not isinstance(piece, text_types):
+                    return helper(self, piece)
+                c = table.classify(self, piece)
+                if c is None:
+                    return helper(self, piece)
+                return bool(c & flag)
+            is_flag.__doc__ = helper.__doc__
+            return is_flag
+
+        def classify_pieces(self, pieces, titles=True, edges=False):
+            mask = EMPTY | SUFFIX | (TITLE if titles else 0)
+            return tuple(table.classify(self, piece) & mask for piece in pieces)
+
+        return type(str('Batch') + name_class.__name__, (name_class,), {
+            'is_title': memoized(TITLE, name_class.is_title),
+            'is_suffix': memoized(SUFFIX, name_class.is_suffix),
+            'is_prefix': memoized(PREFIX, name_class.is_prefix),
+            'is_conjunction': memoized(CONJUNCTION, name_class.is_conjunction),
+            'is_an_initial': memoized(INITIAL, name_class.is_an_initial),
+            'is_roman_numeral': memoized(ROMAN, name_class.is_roman_numeral),
+            'is_rootname': memoized(ROOTNAME, name_class.is_rootname),
+            'classify_pieces': classify_pieces,
+        })
+
+
+class Parser(object):
+    """
+    A reusable parser bound to a single config. The config's regular
+    expressions and lookup sets are prepared once when the parser is created,
+    and :py:meth:`parse` skips the argument handling done by
+    :py:class:`HumanName` instantiation, so it is the cheaper way to parse
+    many names in a loop.
+
+    The parsing rules themselves live on the name class, so subclasses of
+    :py:class:`HumanName` that override :py:meth:`~HumanName.pre_process`,
+    :py:meth:`~HumanName.post_process` or the ``is_*`` helpers work the same
+    way when passed as ``name_class``.
+
+    .. doctest::
+
+        >>> from nameparser import Parser
+        >>> parser = Parser()
+        >>> parser.parse("Dr. Juan Q. Xavier de la Vega III").last
+        'de la Vega'
+
+    :param constants constants:
+        a :py:class:`~nameparser.config.Constants` instance. Pass ``None`` to
+        give this parser its own config, shared by all the names it parses.
+    :param type name_class: :py:class:`HumanName` or a subclass, the type of
+        the parse results
+    :param str encoding: string representing the encoding of your input
+    :param str string_format: python string formatting
+    :param str initials_format: python initials string formatting
+    :param str initials_delimter: string delimiter for initials
+    """
+
+    def __init__(self, constants=CONSTANTS, name_class=HumanName,
+                 encoding=DEFAULT_ENCODING, string_format=None,
+                 initials_format=None, initials_delimiter=None):
+        self.C = constants
+        if type(self.C) is not type(CONSTANTS):
+            self.C = Constants()
+        self.name_class = name_class
+        self.encoding = encoding
+        self.string_format = string_format
+        self.initials_format = initials_format
+        self.initials_delimiter = initials_delimiter
+        self.compile()
+
+    def __repr__(self):
+        return "<%s(%s)>" % (self.__class__.__name__, self.name_class.__name__)
+
+    def compile(self):
+        """
+        Compile the config's regular expressions and build its combined
+        lookup sets. Run again after changing the config if you want to avoid
+        doing that work during the next parse.
+        """
+        for key in list(self.C.regexes):
+            getattr(self.C.regexes, key)
+        self.C.suffixes_prefixes_titles
+
+    def parse(self, full_name, name_class=None):
+        """
+        Parse a name string.
+
+        :param str full_name: The name string to be parsed.
+        :param type name_class: override the parser's ``name_class``
+        :rtype: :py:class:`HumanName`
+        """
+        name_class = name_class or self.name_class
+        name = name_class.__new__(name_class)
+        name.C = self.C
+        name.encoding = self.encoding
+        name.string_format = self.string_format or self.C.string_format
+        name.initials_format = self.initials_format or self.C.initials_format
+        name.initials_delimiter = self.initials_delimiter or self.C.initials_delimiter
+        name.full_name = full_name
+        return name
+
+    def parse_many(self, names):
+        """
+        Parse an iterable of name strings, returning a list of results in the
+        same order.
+
+        :param names: iterable of name strings
+        :rtype: list
+        """
+        parse = self.parse
+        return [parse(full_name) for full_name in names]
+
+    def parse_batch(self, names, table=None):
+        """
+        Parse an iterable of name strings like :py:meth:`parse_many`, but
+        classify each distinct token in the batch only once using a
+        :py:class:`TokenTable`. Faster than :py:meth:`parse_many` for large
+        batches where the same tokens appear in many names.
+
+        Titles and conjunctions the parser learns while parsing the batch
+        are still added to the config as usual.
+
+        :param names: iterable of name strings
+        :param TokenTable table: reuse the table of an earlier batch parsed
+            with the same config
+        :rtype: list
+        """
+        if table is None:
+            table = TokenTable()
+        batch_class = table.bind(self.name_class)
+        parse = self.parse
+        results = []
+        for full_name in names:
+            name = parse(full_name, batch_class)
+            # hand back plain results that don't keep the table alive
+            name.__class__ = self.name_class
+            results.append(name)
+        return results
+
+    def initials_many(self, names, as_list=False):
+        """
+        Return the initials of each name in an iterable of name strings or
+        :py:class:`HumanName` instances, in the same order. Strings are parsed
+        with :py:meth:`parse`. The initials of middle and last name pieces are
+        worked out once per distinct piece in the batch.
+
+        :param names: iterable of name strings or parsed names, e.g. a column
+            of a data frame
+        :param bool as_list: return :py:meth:`~HumanName.initials_list` lists
+            instead of :py:meth:`~HumanName.initials` strings
+        :rtype: list
+        """
+        memo = {}
+        results = []
+        for name in names:
+            if not isinstance(name, HumanName):
+                name = self.parse(name)
+            name.initials_groups(memo if name.C is self.C else None)
+            results.append(name.initials_list() if as_list else name.initials())
+        return results
@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+"""
+Phonetic codes for name components, so names that sound alike get the same
+code.
+
+::
+
+    >>> from nameparser.phonetics import soundex, double_metaphone
+    >>> soundex("Robert"), soundex("Rupert")
+    ('R163', 'R163')
+    >>> double_metaphone("Schmidt"), double_metaphone("Smith")
+    (('XMT', 'SMT'), ('SM0', 'XMT'))
+
+Set :py:attr:`~nameparser.config.Constants.phonetic_encoders` to have the
+parser encode the first and last name of every name it parses.
+
+"""
+from __future__ import unicode_literals
+import threading
+import unicodedata
+
+_SOUNDEX = {}
+for _letters, _digit in (("BFPV", "1"), ("CGJKQSXZ", "2"), ("DT", "3"),
+                         ("L", "4"), ("MN", "5"), ("R", "6")):
+    for _letter in _letters:
+        _SOUNDEX[_letter] = _digit
+
+
+def ascii_letters(word):
+    """
+    Return the upper case ASCII letters of ``word``, with accents removed
+    from accented letters.
+    """
+    word = unicodedata.normalize('NFKD', word).upper()
+    return "".join([c for c in word if 'A' <= c <= 'Z'])
+
+
+def soundex(word, length=4):
+    """
+    Return the American Soundex code of ``word``, or an empty string if it
+    has no letters.
+
+    :param str word: a name component
+    :param int length: length of the code
+    :rtype: str
+    """
+    word = ascii_letters(word)
+    if not word:
+        return ''
+    code = [word[0]]
+    last = _SOUNDEX.get(word[0], '')
+    for letter in word[1:]:
+        digit = _SOUNDEX.get(letter, '')
+        if digit and digit != last:
+            code.append(digit)
+        # H and W do not separate letters with the same code, vowels do
+        if letter not in "HW":
+            last = digit
+    return ("".join(code) + "0" * length)[:length]
+
+
+_VOWELS = frozenset("AEIOUY")
+_SLAVO_GERMANIC = ("W", "K", "CZ", "WITZ")
+
+
+def double_metaphone(word, length=4):
+    """
+    Return the primary and alternate Double Metaphone codes of ``word`` as a
+    tuple. The alternate code is the same as the primary one unless the word
+    has a second likely pronunciation, e.g. ``('XMT', 'SMT')`` for
+    "Schmidt". Both are empty strings if the word has no letters.
+
+    :param str word: a name component
+    :param int length: maximum length of each code
+    :rtype: tuple
+    """
+    word = ascii_letters(word)
+    if not word:
+        return ('', '')
+    primary = []
+    alternate = []
+    last = len(word) - 1
+    padded = word + "     "
+    slavo_germanic = any(s in word for s in _SLAVO_GERMANIC)
+
+    def at(start, *options):
+        # True if one of the options is found at ``start``
+        if start < 0:
+            return False
+        for option in options:
+            if padded[start:start + len(option)] == option:
+                return True
+        return False
+
+    def vowel(i):
+        return 0 <= i <= last and word[i] in _VOWELS
+
+    def add(main, alt=None):
+        primary.append(main)
+        alternate.append(main if alt is None else alt)
+
+    i = 0
+    # skip silent letters at the start of the word
+    if at(0, "GN", "KN", "PN", "WR", "PS"):
+        i = 1
+    if word[0] == "X":
+        # Xavier
+        add("S")
+        i = 1
+
+    while i <= last and (len("".join(primary)) < length or len("".join(alternate)) < length):
+        c = word[i]
+        if c in _VOWELS:
+            if i == 0:
+                add("A")
+            i += 1
+        elif c == "B":
+            add("P")
+            i += 2 if at(i + 1, "B") else 1
+        elif c == "C":
+            if i > 1 and not vowel(i - 2) and at(i - 1, "ACH") \
+                    and not at(i + 2, "I") and (not at(i + 2, "E") or at(i - 2, "BACHER", "MACHER")):
+                # various Germanic
+                add("K")
+                i += 2
+            elif i == 0 and at(i, "CAESAR"):
+                add("S")
+                i += 2
+            elif at(i, "CHIA"):
+                # Italian chianti
+                add("K")
+                i += 2
+            elif at(i, "CH"):
+                if i > 0 and at(i, "CHAE"):
+                    # Michael
+                    add("K", "X")
+                elif i == 0 and (at(i + 1, "HARAC", "HARIS") or at(i + 1, "HOR", "HYM", "HIA", "HEM")) \
+                        and not at(0, "CHORE"):
+                    # Greek roots, e.g. chemistry, chorus
+                    add("K")
+                elif at(0, "VAN ", "VON ", "SCH") or at(i - 2, "ORCHES", "ARCHIT", "ORCHID") \
+                        or at(i + 2, "T", "S") \
+                        or ((at(i - 1, "A", "O", "U", "E") or i == 0)
+                            and at(i + 2, "L", "R", "N", "M", "B", "H", "F", "V", "W", " ")):
+                    # Germanic, Greek or otherwise "ch" for "kh" sound
+                    add("K")
+                elif i > 0:
+                    if at(0, "MC"):
+                        # McHugh
+                        add("K")
+                    else:
+                        add("X", "K")
+                else:
+                    add("X")
+                i += 2
+            elif at(i, "CZ") and not at(i - 2, "WICZ"):
+                # Czerny
+                add("S", "X")
+                i += 2
+            elif at(i + 1, "CIA"):
+                # Focaccia
+                add("X")
+                i += 3
+            elif at(i, "CC") and not (i == 1 and word[0] == "M"):
+                # double "cc" but not McClellan
+                if at(i + 2, "I", "E", "H") and not at(i + 2, "HU"):
+                    if (i == 1 and word[0] == "A") or at(i - 1, "UCCEE", "UCCES"):
+                        # Accident, succeed
+                        add("KS")
+                    else:
+                        # Bacci, Bertucci
+                        add("X")
+                    i += 3
+                else:
+                    # Pierce's rule
+                    add("K")
+                    i += 2
+            elif at(i, "CK", "CG", "CQ"):
+                add("K")
+                i += 2
+            elif at(i, "CI", "CE", "CY"):
+                if at(i, "CIO", "CIE", "CIA"):
+                    # Italian vs English
+                    add("S", "X")
+                else:
+                    add("S")
+                i += 2
+            else:
+                add("K")
+                if at(i + 1, " C", " Q", " G"):
+                    # Mac Caffrey, Mac Gregor
+                    i += 3
+                elif at(i + 1, "C", "K", "Q") and not at(i + 1, "CE", "CI"):
+                    i += 2
+                else:
+                    i += 1
+        elif c == "D":
+            if at(i, "DG"):
+                if at(i + 2, "I", "E", "Y"):
+                    # Edge
+                    add("J")
+                    i += 3
+                else:
+                    # Edgar
+                    add("TK")
+                    i += 2
+            elif at(i, "DT", "DD"):
+                add("T")
+                i += 2
+            else:
+                add("T")
+                i += 1
+        elif c == "F":
+            add("F")
+            i += 2 if at(i + 1, "F") else 1
+        elif c == "G":
+            if at(i + 1, "H"):
+                if i > 0 and not vowel(i - 1):
+                    add("K")
+                    i += 2
+                elif i == 0:
+                    # Ghislane, Ghiradelli
+                    add("J" if at(i + 2, "I") else "K")
+                    i += 2
+                elif (i > 1 and at(i - 2, "B", "H", "D")) or (i > 2 and at(i - 3, "B", "H", "D")) \
+                        or (i > 3 and at(i - 4, "B", "H")):
+                    # Hugh, bough, broughton
+                    i += 2
+                else:
+                    if i > 2 and at(i - 1, "U") and at(i - 3, "C", "G", "L", "R", "T"):
+                        # laugh, McLaughlin, cough, rough, tough
+                        add("F")
+                    elif i > 0 and not at(i - 1, "I"):
+                        add("K")
+                    i += 2
+            elif at(i + 1, "N"):
+                if i == 1 and vowel(0) and not slavo_germanic:
+                    add("KN", "N")
+                elif not at(i + 2, "EY") and not at(i + 1, "Y") and not slavo_germanic:
+                    add("N", "KN")
+                else:
+                    add("KN")
+                i += 2
+            elif at(i + 1, "LI") and not slavo_germanic:
+                # Tagliaro
+                add("KL", "L")
+                i += 2
+            elif i == 0 and (at(i + 1, "Y") or at(i + 1, "ES", "EP", "EB", "EL", "EY", "IB", "IL", "IN", "IE", "EI", "ER")):
+                # -ges-, -gep-, -gel-, -gie- at the start
+                add("K", "J")
+                i += 2
+            elif (at(i + 1, "ER") or at(i + 1, "Y")) and not at(0, "DANGER", "RANGER", "MANGER") \
+                    and not at(i - 1, "E", "I") and not at(i - 1, "RGY", "OGY"):
+                # -ger-, -gy-
+                add("K", "J")
+                i += 2
+            elif at(i + 1, "E", "I", "Y") or at(i - 1, "AGGI", "OGGI"):
+                # Italian biaggi
+                if at(0, "VAN ", "VON ", "SCH") or at(i + 1, "ET"):
+                    # obvious Germanic
+                    add("K")
+                elif at(i + 1, "IER "):
+                    add("J")
+                else:
+                    add("J", "K")
+                i += 2
+            else:
+                add("K")
+                i += 2 if at(i + 1, "G") else 1
+        elif c == "H":
+            # only keep if first and before a vowel or between two vowels
+            if (i == 0 or vowel(i - 1)) and vowel(i + 1):
+                add("H")
+                i += 2
+            else:
+                i += 1
+        elif c == "J":
+            if at(i, "JOSE") or at(0, "SAN "):
+                # obvious Spanish, Jose, San Jacinto
+                if (i == 0 and at(i + 4, " ")) or at(0, "SAN "):
+                    add("H")
+                else:
+                    add("J", "H")
+            elif i == 0 and not at(i, "JOSE"):
+                # Yankelovich, Jankelowicz
+                add("J", "A")
+            elif vowel(i - 1) and not slavo_germanic and at(i + 1, "A", "O"):
+                # Spanish pronunciation of e.g. bajador
+                add("J", "H")
+            elif i == last:
+                add("J", "")
+            elif not at(i + 1, "L", "T", "K", "S", "N", "M", "B", "Z") and not at(i - 1, "S", "K", "L"):
+                add("J")
+            i += 2 if at(i + 1, "J") else 1
+        elif c == "K":
+            add("K")
+            i += 2 if at(i + 1, "K") else 1
+        elif c == "L":
+            if at(i + 1, "L"):
+                if (i == last - 2 and at(i - 1, "ILLO", "ILLA", "ALLE")) \
+                        or ((at(last - 1, "AS", "OS") or at(last, "A", "O")) and at(i - 1, "ALLE")):
+                    # Spanish, e.g. cabrillo, gallegos
+                    add("L", "")
+                else:
+                    add("L")
+                i += 2
+            else:
+                add("L")
+                i += 1
+        elif c == "M":
+            add("M")
+            if (at(i - 1, "UMB") and (i + 1 == last or at(i + 2, "ER"))) or at(i + 1, "M"):
+                # dumb, thumb
+                i += 2
+            else:
+                i += 1
+        elif c == "N":
+            add("N")
+            i += 2 if at(i + 1, "N") else 1
+        elif c == "P":
+            if at(i + 1, "H"):
+                add("F")
+                i += 2
+            else:
+                # Campbell, raspberry
+                add("P")
+                i += 2 if at(i + 1, "P", "B") else 1
+        elif c == "Q":
+            add("K")
+            i += 2 if at(i + 1, "Q") else 1
+        elif c == "R":
+            if i == last and not slavo_germanic and at(i - 2, "IE") \
+                    and not at(i - 4, "ME", "MA"):
+                # French, e.g. Rogier, but not Hochmeier
+                add("", "R")
+            else:
+                add("R")
+            i += 2 if at(i + 1, "R") else 1
+        elif c == "S":
+            if at(i - 1, "ISL", "YSL"):
+                # special cases island, isle, carlisle, carlysle
+                i += 1
+            elif i == 0 and at(i, "SUGAR"):
+                # special case sugar-
+                add("X", "S")
+                i += 1
+            elif at(i, "SH"):
+                if at(i + 1, "HEIM", "HOEK", "HOLM", "HOLZ"):
+                    # Germanic
+                    add("S")
+                else:
+                    add("X")
+                i += 2
+            elif at(i, "SIO", "SIA", "SIAN"):
+                # Italian and Armenian
+                if not slavo_germanic:
+                    add("S", "X")
+                else:
+                    add("S")
+                i += 3
+            elif (i == 0 and at(i + 1, "M", "N", "L", "W")) or at(i + 1, "Z"):
+                # German and Anglicisations, e.g. Smith matches Schmidt,
+                # Snider matches Schneider
+                add("S", "X")
+                i += 2 if at(i + 1, "Z") else 1
+            elif at(i, "SC"):
+                if at(i + 2, "H"):
+                    if at(i + 3, "OO", "ER", "EN", "UY", "ED", "EM"):
+                        # Dutch origin, e.g. school, schooner
+                        if at(i + 3, "ER", "EN"):
+                            # Schlesinger's rule
+                            add("X", "SK")
+                        else:
+                            add("SK")
+                    elif i == 0 and not vowel(3) and not at(3, "W"):
+                        add("X", "S")
+                    else:
+                        add("X")
+                elif at(i + 2, "I", "E", "Y"):
+                    add("S")
+                else:
+                    add("SK")
+                i += 3
+            else:
+                if i == last and at(i - 2, "AI", "OI"):
+                    # French, e.g. resnais, artois
+                    add("", "S")
+                else:
+                    add("S")
+                i += 2 if at(i + 1, "S", "Z") else 1
+        elif c == "T":
+            if at(i, "TION", "TIA", "TCH"):
+                add("X")
+                i += 3
+            elif at(i, "TH", "TTH"):
+                if at(i + 2, "OM", "AM") or at(0, "VAN ", "VON ", "SCH"):
+                    # special case Thomas, Thames or Germanic
+                    add("T")
+                else:
+                    add("0", "T")
+                i += 2
+            else:
+                add("T")
+                i += 2 if at(i + 1, "T", "D") else 1
+        elif c == "V":
+            add("F")
+            i += 2 if at(i + 1, "V") else 1
+        elif c == "W":
+            if at(i, "WR"):
+                # can also be in the middle of a word
+                add("R")
+                i += 2
+            else:
+                if i == 0 and (vowel(i + 1) or at(i, "WH")):
+                    # Wasserman should match Vasserman
+                    add("A", "F" if vowel(i + 1) else "A")
+                if (i == last and vowel(i - 1)) or at(i - 1, "EWSKI", "EWSKY", "OWSKI", "OWSKY") \
+                        or at(0, "SCH"):
+                    # Arnow should match Arnoff
+                    add("", "F")
+                    i += 1
+                elif at(i, "WICZ", "WITZ"):
+                    # Polish, e.g. Filipowicz
+                    add("TS", "FX")
+                    i += 4
+                else:
+                    i += 1
+        elif c == "X":
+            if not (i == last and (at(i - 3, "IAU", "EAU") or at(i - 2, "AU", "OU"))):
+                # French, e.g. breaux
+                add("KS")
+            i += 2 if at(i + 1, "C", "X") else 1
+        elif c == "Z":
+            if at(i + 1, "H"):
+                # Chinese pinyin, e.g. Zhao
+                add("J")
+                i += 2
+            else:
+                if at(i + 1, "ZO", "ZI", "ZA") or (slavo_germanic and i > 0 and not at(i - 1, "T")):
+                    add("S", "TS")
+                else:
+                    add("S")
+                i += 2 if at(i + 1, "Z") else 1
+        else:
+            i += 1
+    return ("".join(primary)[:length], "".join(alternate)[:length])
+
+
+class Memoized(object):
+    """
+    Wraps an encoder so repeated tokens are only encoded once. At most
+    ``maxsize`` results are kept; the memo is emptied when it is full.
+    Changes to the memo hold a lock, so the encoders can be shared by
+    parsers running in parallel threads.
+
+    :param function encoder: function taking a single string
+    :param int maxsize: number of results to keep
+    """
+
+    def __init__(self, encoder, maxsize=65536):
+        self.encoder = encoder
+        self.maxsize = maxsize
+        self.memo = {}
+        self._lock = threading.Lock()
+        self.__name__ = encoder.__name__
+        self.__doc__ = encoder.__doc__
+
+    def __repr__(self):
+        return "Memoized({0})".format(self.__name__)
+
+    def __call__(self, word):
+        try:
+            return self.memo[word]
+        except KeyError:
+            code = self.encoder(word)
+            with self._lock:
+                if len(self.memo) >= self.maxsize:
+                    self.memo.clear()
+                self.memo[word] = code
+            return code
+
+
+#: The memoized encoders available by name for
+#: :py:attr:`~nameparser.config.Constants.phonetic_encoders`.
+ENCODERS = {
+    'soundex': Memoized(soundex),
+    'double_metaphone': Memoized(double_metaphone),
+}
+
+#: The name components encoded during parsing.
+COMPONENTS = ('first', 'last')
+
+
+def encode(name, encoders, components=COMPONENTS):
+    """
+    Return a dictionary of phonetic codes for the components of a parsed
+    name, keyed ``'<component>_<encoder>'``, e.g. ``'last_soundex'``. Empty
+    components get empty codes.
+
+    :param name: a :py:class:`~nameparser.parser.HumanName`
+    :param encoders: names of encoders in :py:data:`ENCODERS`
+    :param components: names of the components to encode
+    :rtype: dict
+    """
+    codes = {}
+    for component in components:
+        value = " ".join(getattr(name, component + '_list'))
+        for encoder in encoders:
+            try:
+                function = ENCODERS[encoder]
+            except KeyError:
+                raise ValueError("Unknown phonetic encoder: {0}".format(encoder))
+            codes[component + '_' + encoder] = function(value)
+    return codes
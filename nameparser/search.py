@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Top-k "names like this" search over an in-memory corpus of parsed names.
+
+:py:class:`NameSearch` groups its records by normalized last name and first
+name. A query is parsed with the same
+:py:class:`~nameparser.config.Constants` as the corpus, and candidate last
+names are generated from the distinct last names that share its
+:py:func:`~nameparser.phonetics.double_metaphone` code or enough of its
+trigrams. Candidates are then ranked component by component: whole groups of
+records with the same last and first name are scored at once, and records
+are only scored individually, on their middle names and suffixes, while
+their group can still make it into the top k.
+
+::
+
+    >>> from nameparser.search import NameSearch
+    >>> corpus = NameSearch()
+    >>> corpus.add_many(["John Smith", "Jon Smyth", "J. Schmidt", "Jane Doe"])
+    [0, 1, 2, 3]
+    >>> [record_id for record_id, score in corpus.search("John Smith", k=3)]
+    [0, 2, 1]
+
+"""
+from __future__ import unicode_literals
+import heapq
+
+from nameparser.util import lc
+from nameparser.compare import WEIGHTS, PARTIAL, UNKNOWN, generations
+from nameparser.parser import HumanName
+from nameparser.parser import Parser
+from nameparser.phonetics import ENCODERS
+
+#: Lowest score a last name that sounds like the query's gets, however
+#: differently it is spelled.
+PHONETIC = 0.7
+
+
+def trigrams(value):
+    """
+    Return the set of three letter shingles of a normalized string, padded
+    with ``$`` at both ends.
+
+    :rtype: set
+    """
+    value = "$" + value + "$"
+    return set([value[i:i + 3] for i in range(max(len(value) - 2, 1))])
+
+
+def dice(a, b):
+    """
+    Dice coefficient of two sets, between 0.0 and 1.0.
+
+    :rtype: float
+    """
+    if not a and not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+def _phonetic_codes(value):
+    return set(code for code in ENCODERS['double_metaphone'](value) if code)
+
+
+def _given_score(a, b, similar=None):
+    # similarity of two normalized given names, optionally with the trigram
+    # similarities of ``a`` to other names already worked out
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return UNKNOWN
+    if (len(a) == 1 or len(b) == 1) and a[0] == b[0]:
+        return PARTIAL
+    if similar is not None:
+        return similar.get(b, 0.0)
+    return dice(trigrams(a), trigrams(b))
+
+
+class _Vocabulary(object):
+    # the distinct values of one component with an index of their trigrams,
+    # counting the records using each value
+
+    def __init__(self):
+        self.counts = {}
+        self.sizes = {}
+        self.grams = {}
+
+    def add(self, value):
+        # returns True for a new value
+        if value in self.counts:
+            self.counts[value] += 1
+            return False
+        self.counts[value] = 1
+        grams = trigrams(value)
+        self.sizes[value] = len(grams)
+        for gram in grams:
+            self.grams.setdefault(gram, set()).add(value)
+        return True
+
+    def discard(self, value):
+        # returns True when the last record using the value is gone
+        self.counts[value] -= 1
+        if self.counts[value]:
+            return False
+        del self.counts[value]
+        del self.sizes[value]
+        for gram in trigrams(value):
+            self.grams[gram].discard(value)
+            if not self.grams[gram]:
+                del self.grams[gram]
+        return True
+
+    def similar(self, value, minimum=0.0):
+        # the values sharing trigrams with value and their dice coefficients
+        grams = trigrams(value)
+        counts = {}
+        for gram in grams:
+            for other in self.grams.get(gram, ()):
+                counts[other] = counts.get(other, 0) + 1
+        size = len(grams)
+        sizes = self.sizes
+        found = {}
+        for other, count in counts.items():
+            score = 2.0 * count / (size + sizes[other])
+            if score >= minimum:
+                found[other] = score
+        return found
+
+
+class NameSearch(object):
+    """
+    A top-k nearest name search structure over parsed names, with records
+    added and removed one at a time.
+
+    :param Parser parser: parser for the names added as strings and for the
+        queries, and so the :py:class:`~nameparser.config.Constants` they are
+        parsed with
+    :param float min_similarity: the lowest trigram similarity of a last
+        name to the query's for its records to be candidates, unless it
+        sounds the same
+    """
+
+    def __init__(self, parser=None, min_similarity=0.4):
+        self.parser = parser or Parser()
+        self.min_similarity = min_similarity
+        self.names = {}
+        self._keys = {}
+        self._groups = {}
+        self._firsts = {}
+        self._lasts = _Vocabulary()
+        self._given = _Vocabulary()
+        self._codes = {}
+        self._next_id = 0
+
+    def __repr__(self):
+        return "<NameSearch() {0} names>".format(len(self))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, record_id):
+        return record_id in self.names
+
+    def __getitem__(self, record_id):
+        return self.names[record_id]
+
+    def _parse(self, name):
+        if isinstance(name, HumanName):
+            return name
+        return self.parser.parse(name)
+
+    def add(self, name, record_id=None):
+        """
+        Add a name to the corpus and return its record id.
+
+        :param name: a :py:class:`~nameparser.parser.HumanName` or a name string
+        :param int record_id: id to store the name under, replacing any name
+            already stored with it. Defaults to the next unused id.
+        :rtype: int
+        """
+        name = self._parse(name)
+        if record_id is None:
+            record_id = self._next_id
+        elif record_id in self.names:
+            self.remove(record_id)
+        self._next_id = max(self._next_id, record_id + 1)
+        key = self._keys[record_id] = (lc(" ".join(name.last_list)), lc(" ".join(name.first_list)))
+        self.names[record_id] = name
+        last, first = key
+        if self._lasts.add(last):
+            for code in _phonetic_codes(last):
+                self._codes.setdefault(code, set()).add(last)
+        self._given.add(first)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = []
+            self._firsts.setdefault(last, set()).add(first)
+        group.append(record_id)
+        return record_id
+
+    def add_many(self, names):
+        """
+        Add each name in an iterable and return a list of their record ids.
+
+        :param names: iterable of :py:class:`~nameparser.parser.HumanName`
+            instances or name strings
+        :rtype: list
+        """
+        return [self.add(name) for name in names]
+
+    def remove(self, record_id):
+        """
+        Remove the name stored under ``record_id`` from the corpus.
+
+        :param int record_id: id returned by :py:meth:`add`
+        :raises KeyError: if there is no such record
+        """
+        del self.names[record_id]
+        key = self._keys.pop(record_id)
+        last, first = key
+        group = self._groups[key]
+        group.remove(record_id)
+        if not group:
+            del self._groups[key]
+            firsts = self._firsts[last]
+            firsts.discard(first)
+            if not firsts:
+                del self._firsts[last]
+        self._given.discard(first)
+        if self._lasts.discard(last):
+            for code in _phonetic_codes(last):
+                self._codes[code].discard(last)
+                if not self._codes[code]:
+                    del self._codes[code]
+
+    def _last_names(self, last):
+        # the candidate last names and their scores
+        found = self._lasts.similar(last, self.min_similarity)
+        for code in _phonetic_codes(last):
+            for value in self._codes.get(code, ()):
+                found[value] = max(found.get(value, 0.0), PHONETIC)
+        if last in self._firsts:
+            found[last] = 1.0
+        return found
+
+    def search(self, query, k=10):
+        """
+        Return the ``k`` names most like the query as a list of
+        ``(record_id, score)`` pairs, best first. Scores are between 0.0 and
+        1.0 and weigh the components like :py:func:`~nameparser.compare.compare`,
+        but spelling variants of names score partially instead of conflicting,
+        and a conflicting generational suffix halves the score. A query
+        of a single word, which parses as a first name, is looked up as a
+        last name.
+
+        :param query: a :py:class:`~nameparser.parser.HumanName` or a name string
+        :param int k: the number of names to return
+        :rtype: list
+        """
+        query = self._parse(query)
+        last = lc(" ".join(query.last_list))
+        first = lc(" ".join(query.first_list))
+        if not last:
+            last, first = first, ''
+        if not last:
+            return []
+        middle = lc(" ".join(query.middle_list))
+        query_generations = generations(query)
+
+        similar = self._given.similar(first) if first else {}
+        first_scores = {}
+
+        def first_score(other):
+            try:
+                return first_scores[other]
+            except KeyError:
+                score = first_scores[other] = WEIGHTS['first'] * _given_score(first, other, similar)
+                return score
+
+        # every first name scoring above zero, to look up in last names with
+        # more first names than that once the best scores can't be reached
+        # without one. Any first name of one letter might be an initial of a
+        # query of one letter, so there is no such list for it.
+        ranked = None
+        if len(first) > 1:
+            ranked = set(similar)
+            ranked.update([first, first[0], ''])
+
+        best = []
+        for value, last_score in sorted(self._last_names(last).items(), key=lambda item: -item[1]):
+            last_score *= WEIGHTS['last']
+            full = len(best) == k
+            if full and last_score + WEIGHTS['first'] + WEIGHTS['middle'] < best[0][0]:
+                break
+            others = self._firsts[value]
+            if full and ranked is not None and len(ranked) < len(others) \
+                    and last_score + WEIGHTS['middle'] < best[0][0]:
+                others = [other for other in ranked if other in others]
+            for other in others:
+                group_score = last_score + first_score(other)
+                if len(best) == k and group_score + WEIGHTS['middle'] < best[0][0]:
+                    continue
+                for record_id in self._groups[(value, other)]:
+                    name = self.names[record_id]
+                    score = group_score + WEIGHTS['middle'] * _given_score(
+                        middle, lc(" ".join(name.middle_list)))
+                    if query_generations:
+                        found = generations(name)
+                        if found and found != query_generations:
+                            score /= 2
+                    item = (round(score, 6), -record_id)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+        return [(-record_id, score) for score, record_id in sorted(best, reverse=True)]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Sort keys for ordering parsed names by last name, first name, middle name
+and suffix, ignoring case.
+
+Whether a last name prefix like "van" or "de" counts when sorting depends on
+the locale. A policy decides how the last name is keyed:
+
+* ``'as_written'`` sorts "van Gogh" under V, as is usual in the US or Belgium.
+* ``'ignore_prefixes'`` sorts "van Gogh" under G, as is usual in the
+  Netherlands. Leading words of the last name that are in
+  :py:attr:`~nameparser.config.Constants.prefixes` are skipped.
+
+A policy can also be a function that takes a
+:py:class:`~nameparser.parser.HumanName` and its
+:py:meth:`~nameparser.parser.HumanName.canonical_key` and returns a sort key.
+
+::
+
+    >>> from nameparser import HumanName
+    >>> from nameparser.sorting import sort_names
+    >>> names = [HumanName(n) for n in ("Vincent van Gogh", "Frans Hals", "Johannes Vermeer")]
+    >>> [str(n) for n in sort_names(names, policy='ignore_prefixes')]
+    ['Vincent van Gogh', 'Frans Hals', 'Johannes Vermeer']
+
+"""
+from __future__ import unicode_literals
+
+from nameparser.util import lc
+
+
+def as_written(name, key):
+    """
+    Sort by the whole last name, then first name, middle name and suffix.
+    """
+    title, first, middle, last, suffix, nickname = key
+    return (last, first, middle, suffix)
+
+
+def ignore_prefixes(name, key):
+    """
+    Sort by the last name without its leading prefixes, then first name,
+    middle name and suffix, then the whole last name.
+    """
+    title, first, middle, last, suffix, nickname = key
+    words = last.split(" ")
+    prefixes = name.C.prefixes
+    i = 0
+    while i < len(words) - 1 and lc(words[i]) in prefixes:
+        i += 1
+    return (" ".join(words[i:]), first, middle, suffix, last)
+
+
+#: The sort policies available by name.
+POLICIES = {
+    'as_written': as_written,
+    'ignore_prefixes': ignore_prefixes,
+}
+
+
+def sort_names(names, policy='as_written', reverse=False):
+    """
+    Return a new list of parsed names sorted by their
+    :py:meth:`~nameparser.parser.HumanName.sort_key`.
+
+    :param names: iterable of :py:class:`~nameparser.parser.HumanName`
+    :param policy: name of a policy in :py:data:`POLICIES` or a function
+    :param bool reverse: sort in descending order
+    :rtype: list
+    """
+    return sorted(names, key=lambda name: name.sort_key(policy), reverse=reverse)
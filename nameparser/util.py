@@ -37,3 +37,38 @@ def lc(value):
     if not value:
         return ''
     return value.lower().strip('.')
+
+
+# set by _load_digest64 the first time a fingerprint is needed, as
+# hashlib adds milliseconds to importing the package
+_digest64 = None
+_unpack64 = None
+
+
+def _load_digest64():
+    global _digest64, _unpack64
+    import struct
+    _unpack64 = struct.Struct(str('<Q')).unpack
+    try:
+        from hashlib import blake2b
+
+        def _digest64(data):
+            return blake2b(data, digest_size=8).digest()
+    except ImportError:
+        # Python 2
+        from hashlib import md5
+
+        def _digest64(data):
+            return md5(data).digest()[:8]
+    return _digest64
+
+
+def fingerprint64(strings):
+    """
+    Stable unsigned 64 bit fingerprint of a sequence of strings. Unlike
+    ``hash()`` it is the same in every process, so it can be stored or used
+    to pick a shard.
+    """
+    data = "\x1f".join(strings).encode('utf-8')
+    digest = (_digest64 or _load_digest64())(data)
+    return _unpack64(digest)[0]
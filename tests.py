@@ -20,13 +20,17 @@ https://github.com/derek73/python-nameparser/pulls
 """
 
 import logging
+import os
+import pickle
 import re
+import sys
 try:
     import dill
 except ImportError:
     dill = False
 
 from nameparser import HumanName
+from nameparser import Parser
 from nameparser.util import u
 from nameparser.config import Constants, TupleManager
 
@@ -39,6 +43,13 @@ except AttributeError:
     import unittest2 as unittest
 
 
+class RecordName(HumanName):
+    # a subclass with attributes of its own, for the pickling tests
+    def __init__(self, full_name="", record_id=None, **kwargs):
+        self.record_id = record_id
+        super(RecordName, self).__init__(full_name, **kwargs)
+
+
 class HumanNameTestBase(unittest.TestCase):
     def m(self, actual, expected, hn):
         """assertEqual with a better message and awareness of hn.C.empty_attribute_default"""
@@ -80,11 +91,154 @@ class HumanNamePythonTests(HumanNameTestBase):
         constants = Constants()
         self.assertTrue(dill.pickles(constants))
 
+    def test_config_state(self):
+        from nameparser.config import STATE_VERSION
+        state = Constants().__getstate__()
+        self.assertEqual(state['version'], STATE_VERSION)
+        self.assertEqual(state['sets'], {})
+        constants = Constants()
+        constants.titles.add('zzz')
+        constants.titles.remove('dr')
+        self.assertEqual(constants.__getstate__()['sets'], {'titles': {'add': ['zzz'], 'remove': ['dr']}})
+        self.assertEqual(state['tuples'], {})
+        self.assertEqual(state['options'], {})
+        self.assertEqual(state['fingerprint'], Constants().fingerprint())
+        self.assertTrue(len(pickle.dumps(Constants())) < 400)
+        state['version'] = STATE_VERSION + 1
+        self.assertRaises(ValueError, Constants().__setstate__, state)
+
+    def test_config_round_trip(self):
+        import copy
+        constants = Constants()
+        constants.titles.add('dean')
+        constants.suffix_acronyms.remove('phd')
+        constants.capitalization_exceptions['mcdonald'] = 'McDonald'
+        constants.regexes.emoji = False
+        constants.string_format = "{last}, {first}"
+        for loaded in (pickle.loads(pickle.dumps(constants)), copy.deepcopy(constants)):
+            self.assertEqual(loaded.fingerprint(), constants.fingerprint())
+            self.assertTrue('dean' in loaded.titles)
+            self.assertFalse('phd' in loaded.suffix_acronyms)
+            self.assertEqual(loaded.capitalization_exceptions['mcdonald'], 'McDonald')
+            self.assertEqual(loaded.regexes.emoji, False)
+            self.assertEqual(loaded.regexes.initial.pattern, constants.regexes.initial.pattern)
+            self.assertFalse('string_format' in Constants().__getstate__()['options'])
+            hn = HumanName("Dean Robert Johns", loaded)
+            self.m(hn.title, "Dean", hn)
+            self.assertEqual(str(hn), "Johns, Robert")
+            loaded._fingerprint = None
+            self.assertEqual(loaded.fingerprint(), constants.fingerprint())
+
+    def test_config_fingerprint(self):
+        constants = Constants()
+        fingerprint = constants.fingerprint()
+        self.assertEqual(fingerprint, Constants().fingerprint())
+        constants.regexes.initial  # compiling a regex doesn't change it
+        self.assertEqual(constants.fingerprint(), fingerprint)
+        constants.titles.add('dean')
+        self.assertNotEqual(constants.fingerprint(), fingerprint)
+        constants.titles.remove('dean')
+        self.assertEqual(constants.fingerprint(), fingerprint)
+        constants.initials_delimiter = '-'
+        self.assertNotEqual(constants.fingerprint(), fingerprint)
+
     @unittest.skipUnless(dill, "requires python-dill module to test pickling")
     def test_name_instance_pickle(self):
         hn = HumanName("Title First Middle Middle Last, Jr.")
         self.assertTrue(dill.pickles(hn))
 
+    def test_compact_pickle(self):
+        self.assertTrue(len(pickle.dumps(HumanName("Dr. John Q. Smith, Jr.", None), 2)) < 400)
+        hn = HumanName("Dr. John Q. Smith, Jr.")
+        loaded = pickle.loads(pickle.dumps(hn, 2))
+        self.assertTrue(loaded.C is hn.C)
+        self.assertEqual(loaded, hn)
+        self.assertEqual(loaded.original, hn.original)
+        self.m(loaded.suffix, "Jr.", loaded)
+        hn = HumanName("john smith", string_format="{last}, {first}")
+        self.assertEqual(str(pickle.loads(pickle.dumps(hn))), "smith, john")
+
+    def test_pickle_resolves_config(self):
+        from nameparser.config import register, unregister
+        hn = HumanName("Dean Robert Johns", None)
+        loaded = pickle.loads(pickle.dumps(hn))
+        self.assertTrue(loaded.C is not hn.C)
+        self.assertTrue(loaded.C is not HumanName.C)
+        hn.C.titles.add('dean')
+        hn.parse_full_name()
+        # a changed config that is not registered travels with the name
+        loaded = pickle.loads(pickle.dumps(hn))
+        self.assertTrue(loaded.C is not hn.C)
+        self.assertEqual(loaded.C.fingerprint(), hn.C.fingerprint())
+        self.m(loaded.title, "Dean", loaded)
+        register(hn.C)
+        try:
+            data = pickle.dumps(hn)
+            loaded = pickle.loads(data)
+        finally:
+            unregister(hn.C)
+        self.assertTrue(loaded.C is hn.C)
+        self.m(loaded.title, "Dean", loaded)
+        self.assertRaises(ValueError, pickle.loads, data)
+
+    def test_pickle_learned_titles(self):
+        from nameparser.config import CONSTANTS
+        # the parser adds titles like "Lt.Gov." to the shared config
+        constants = Constants()
+        before = pickle.dumps(HumanName("John Doe", constants))
+        hn = HumanName("Lt.Gov. John Doe", constants)
+        self.assertIn('lt.gov', constants.titles)
+        names = pickle.loads(pickle.dumps([hn] * 3))
+        self.m(names[0].title, "Lt.Gov.", names[0])
+        self.assertTrue(names[0].C is names[2].C)
+        self.assertIn('lt.gov', names[0].C.titles)
+        self.m(pickle.loads(before).last, "Doe", hn)
+        # the same for names using the module config
+        before = pickle.dumps(HumanName("John Doe"))
+        HumanName("Capt.Gov. Bob Smith")
+        self.assertIn('capt.gov', CONSTANTS.titles)
+        loaded = pickle.loads(before)
+        self.m(loaded.last, "Doe", loaded)
+        self.assertTrue(pickle.loads(before).C is loaded.C)
+
+    def test_pickle_across_processes(self):
+        import subprocess
+        data = pickle.dumps([HumanName("Lt.Gov. John Doe"), HumanName("Mr. and Mrs. John Doe", None)])
+        script = ("import pickle, sys; names = pickle.loads(sys.stdin.buffer.read()); "
+                  "print('|'.join(name.title for name in names))")
+        output = subprocess.check_output([sys.executable, '-c', script], input=data,
+                                         cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(output.decode('utf-8').strip(), "Lt.Gov.|Mr. and Mrs.")
+
+    def test_pickle_version(self):
+        from nameparser.parser import PICKLE_VERSION
+        function, args = HumanName("John Smith").__reduce__()
+        self.assertEqual(args[1], PICKLE_VERSION)
+        args = args[:1] + (PICKLE_VERSION + 1,) + args[2:]
+        self.assertRaises(ValueError, function, *args)
+
+    def test_copy(self):
+        import copy
+        hn = HumanName("John Smith", None)
+        hn.C.titles.add('zzz')
+        self.assertTrue(copy.copy(hn).C is hn.C)
+        clone = copy.deepcopy(HumanName("John Smith"))
+        self.assertTrue(clone.C is HumanName.C)
+        clone.first_list.append("Q")
+        self.assertEqual(copy.copy(clone).first_list, ["John", "Q"])
+
+    def test_subclass_attributes_kept(self):
+        import copy
+        hn = RecordName("Dr. John Smith", record_id=7)
+        hn.source = ["crm"]
+        for clone in (pickle.loads(pickle.dumps(hn)), copy.copy(hn), copy.deepcopy(hn)):
+            self.assertTrue(type(clone) is RecordName)
+            self.assertEqual(clone.record_id, 7)
+            self.assertEqual(clone.source, ["crm"])
+            self.m(clone.title, "Dr.", clone)
+        self.assertTrue(copy.copy(hn).source is hn.source)
+        self.assertFalse(copy.deepcopy(hn).source is hn.source)
+
     def test_comparison(self):
         hn1 = HumanName("Doe-Ray, Dr. John P., CLU, CFP, LUTC")
         hn2 = HumanName("Dr. John P. Doe-Ray, CLU, CFP, LUTC")
@@ -152,6 +306,40 @@ class HumanNamePythonTests(HumanNameTestBase):
         self.assertTrue(hn1 is not hn2)
         self.assertTrue(hn1 == "Dr. John P. Doe-ray clu, CFP, LUTC")
 
+    def test_canonical_key_and_fingerprint(self):
+        hn1 = HumanName("Doe-Ray, Dr. John P., CLU, CFP, LUTC")
+        hn2 = HumanName("dr. john p. doe-Ray, CLU, CFP, LUTC")
+        self.assertEqual(hn1.canonical_key(), hn2.canonical_key())
+        self.assertEqual(hn1.fingerprint(), hn2.fingerprint())
+        self.assertEqual(hash(hn1), hash(hn2))
+        self.assertEqual(len(set([hn1, hn2])), 1)
+        self.assertTrue(0 <= hn1.fingerprint() < 2 ** 64)
+        self.assertEqual(hn1.shard(16), hn2.shard(16))
+        self.assertTrue(0 <= hn1.shard(16) < 16)
+
+    def test_canonical_key_follows_changes(self):
+        hn1 = HumanName("John Doe")
+        hn2 = HumanName("John Doe")
+        fingerprint = hn1.fingerprint()
+        hn1.last = "Smith"
+        self.assertEqual(hn1.canonical_key()[3], "smith")
+        self.assertNotEqual(hn1.fingerprint(), fingerprint)
+        self.assertTrue(hn1 != hn2)
+        hn1.full_name = "John Doe"
+        self.assertTrue(hn1 == hn2)
+
+    def test_canonical_key_follows_in_place_changes(self):
+        hn = HumanName("John Smith")
+        fingerprint = hn.fingerprint()
+        key = hash(hn)
+        hn.last_list.append('Jones')
+        self.assertEqual(hn.canonical_key()[3], "smith jones")
+        self.assertNotEqual(hn.fingerprint(), fingerprint)
+        self.assertNotEqual(hash(hn), key)
+        self.assertTrue(hn != HumanName("John Smith"))
+        hn.first_list[0] = 'Jon'
+        self.assertEqual(hn.sort_key(), ('smith jones', 'jon', '', ''))
+
     def test_slice(self):
         hn = HumanName("Doe-Ray, Dr. John P., CLU, CFP, LUTC")
         self.m(list(hn), ['Dr.', 'John', 'P.', 'Doe-Ray', 'CLU, CFP, LUTC'], hn)
@@ -1427,6 +1615,247 @@ class ConstantsCustomization(HumanNameTestBase):
         self.assertIn('béck', c.titles)
 
 
+    def test_default_lexicons_shared_until_modified(self):
+        c1 = Constants()
+        c2 = Constants()
+        self.assertTrue(c1.titles.elements is c2.titles.elements)
+        c1.titles.add('dean')
+        self.assertFalse(c1.titles.elements is c2.titles.elements)
+        self.assertIn('dean', c1.titles)
+        self.assertNotIn('dean', c2.titles)
+        c2.prefixes.remove('van')
+        self.assertIn('van', c1.prefixes)
+        self.assertNotIn('van', c2.prefixes)
+
+
+    def test_regexes_compiled_on_first_access(self):
+        from nameparser.config.regexes import LazyRegex
+        constants = Constants()
+        self.assertTrue(isinstance(dict.get(constants.regexes, 'mac'), LazyRegex))
+        self.assertTrue(constants.regexes.mac.match("macdonald"))
+        self.assertFalse(isinstance(dict.get(constants.regexes, 'mac'), LazyRegex))
+        self.assertTrue(constants.regexes["phd"].search(" ph. d."))
+
+    def test_lazy_regex_fallback(self):
+        from nameparser.config.regexes import LazyRegex
+        constants = Constants()
+        constants.regexes.custom = LazyRegex(r'(', fallback=r'\(')
+        self.assertTrue(constants.regexes.custom.match("("))
+
+    def test_regexes_dict_api(self):
+        constants = Constants()
+        self.assertTrue(constants.regexes.get('phd').search(" ph. d."))
+        self.assertEqual(constants.regexes.get('missing', 1), 1)
+        for key, value in constants.regexes.items():
+            self.assertTrue(hasattr(value, 'match'), key)
+        self.assertTrue(all(hasattr(value, 'sub') for value in Constants().regexes.values()))
+        # a plain dict copy keeps lazy regexes, which still work as patterns
+        regexes = dict(Constants().regexes)
+        self.assertEqual(regexes['spaces'].sub(" ", "a  b"), "a b")
+        self.assertTrue(regexes['mac'].match("macdonald"))
+
+
+
+class MappedLexiconTests(HumanNameTestBase):
+
+    def setUp(self):
+        import tempfile
+        from nameparser.config.lexicon import write_lexicon
+        fd, self.path = tempfile.mkstemp(suffix='.lex')
+        os.close(fd)
+        write_lexicon(self.path, ["Dean", "Provost", b"R\xc3\xa9gent", "Vice-Chancellor.", "dean"])
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_lookup(self):
+        from nameparser.config.lexicon import MappedLexicon
+        lexicon = MappedLexicon(self.path)
+        self.assertEqual(len(lexicon), 4)
+        self.assertEqual(list(lexicon), ["dean", "provost", "régent", "vice-chancellor"])
+        for value in ["dean", "provost", "régent", "vice-chancellor"]:
+            self.assertIn(value, lexicon)
+        for value in ["", "a", "deans", "zzz", "Dean"]:
+            self.assertNotIn(value, lexicon)
+        lexicon.close()
+
+    def test_not_a_lexicon(self):
+        from nameparser.config.lexicon import MappedLexicon
+        with open(self.path, 'wb') as f:
+            f.write(b'not a lexicon file')
+        with self.assertRaises(ValueError):
+            MappedLexicon(self.path)
+
+    def test_attach_to_constants(self):
+        constants = Constants()
+        hn = HumanName("Dean Robert Johns", constants)
+        self.m(hn.first, "Dean", hn)
+        constants.attach_lexicon('titles', self.path)
+        self.assertIn('dean', constants.titles)
+        self.assertIn('dean', constants.suffixes_prefixes_titles)
+        self.assertNotIn('dean', Constants().titles)
+        hn = HumanName("Dean Robert Johns", constants)
+        self.m(hn.title, "Dean", hn)
+        self.m(hn.first, "Robert", hn)
+        self.m(hn.last, "Johns", hn)
+
+    def test_attach_to_unknown_set(self):
+        with self.assertRaises(ValueError):
+            Constants().attach_lexicon('string_format', self.path)
+
+    def test_fingerprint_by_contents(self):
+        import shutil
+        from nameparser.config.lexicon import write_lexicon, MappedLexicon
+        copy_path = self.path + '.copy'
+        shutil.copy(self.path, copy_path)
+        try:
+            constants = Constants()
+            constants.attach_lexicon('titles', self.path)
+            other = Constants()
+            other.attach_lexicon('titles', copy_path)
+            self.assertEqual(constants.fingerprint(), other.fingerprint())
+            self.assertNotEqual(constants.fingerprint(), Constants().fingerprint())
+            write_lexicon(copy_path, ["Dean"])
+            other = Constants()
+            other.attach_lexicon('titles', copy_path)
+            self.assertNotEqual(constants.fingerprint(), other.fingerprint())
+            # files of another version are refused
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            with open(copy_path, 'wb') as f:
+                f.write(data[:4] + b'\x01\x00\x00\x00' + data[8:])
+            with self.assertRaises(ValueError):
+                MappedLexicon(copy_path)
+        finally:
+            os.remove(copy_path)
+
+
+class BulkLexiconLoadingTests(HumanNameTestBase):
+
+    def setUp(self):
+        import tempfile
+        fd, self.path = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        with open(self.path, 'wb') as f:
+            f.write("# our titles\nDean\n\n  Provost.  \nR\u00e9gent\n".encode('utf-8'))
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_update(self):
+        constants = Constants()
+        revision = constants.titles.revision
+        constants.titles.update(["Dean", "Provost.", "R\xe9gent".encode('latin-1')], encoding='latin-1')
+        for value in ["dean", "provost", "régent"]:
+            self.assertIn(value, constants.titles)
+        self.assertEqual(constants.titles.revision, revision + 1)
+        self.assertTrue(constants.titles.update([]) is constants.titles)
+
+    def test_update_after_combined_set_built(self):
+        constants = Constants()
+        hn = HumanName("Bursar Robert Johns", constants)
+        self.assertTrue(hn.is_rootname("Bursar"))
+        constants.titles.update(["Bursar"])
+        self.assertFalse(hn.is_rootname("Bursar"))
+        constants.suffix_acronyms.add("XYZ")
+        self.assertFalse(hn.is_rootname("XYZ"))
+        constants.titles.remove("Bursar")
+        self.assertTrue(hn.is_rootname("Bursar"))
+        hn = HumanName("Bursar Robert Johns", constants)
+        self.m(hn.first, "Bursar", hn)
+
+    def test_load_lexicon(self):
+        constants = Constants()
+        constants.suffixes_prefixes_titles
+        manager = constants.load_lexicon(self.path, 'titles')
+        self.assertTrue(manager is constants.titles)
+        for value in ["dean", "provost", "régent"]:
+            self.assertIn(value, constants.titles)
+            self.assertIn(value, constants.suffixes_prefixes_titles)
+        self.assertNotIn("# our titles", constants.titles)
+        self.assertNotIn("", constants.titles)
+        hn = HumanName("Provost Robert Johns", constants)
+        self.m(hn.title, "Provost", hn)
+        with self.assertRaises(ValueError):
+            constants.load_lexicon(self.path, 'regexes')
+
+
+class LexiconPackTests(HumanNameTestBase):
+
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.mkdtemp()
+        self.cache = os.path.join(self.dir, 'cache')
+        self.json = os.path.join(self.dir, 'base.json')
+        with open(self.json, 'w') as f:
+            f.write('{"titles": ["Dean", "Bursar"], "suffix_acronyms": {"remove": ["phd"]}}')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.dir)
+
+    def test_load_json_pack(self):
+        from nameparser.config.packs import load_packs
+        constants = load_packs(self.json, cache_dir=False)
+        self.assertIn('dean', constants.titles)
+        self.assertNotIn('phd', constants.suffix_acronyms)
+        self.assertFalse(os.path.exists(self.cache))
+        hn = HumanName("Bursar Robert Johns", constants)
+        self.m(hn.title, "Bursar", hn)
+
+    @unittest.skipIf(sys.version_info < (3, 11), "requires tomllib")
+    def test_layered_toml_pack(self):
+        from nameparser.config.packs import load_packs
+        path = os.path.join(self.dir, 'tenant.toml')
+        with open(path, 'w') as f:
+            f.write('titles = ["regent"]\n\n[options]\nstring_format = "{first} {last}"\n')
+        constants = load_packs([self.json, path], cache_dir=False)
+        self.assertIn('dean', constants.titles)
+        self.assertIn('regent', constants.titles)
+        self.assertEqual(str(HumanName("Regent Robert Johns", constants)), "Robert Johns")
+
+    def test_compiled_cache(self):
+        import json
+        from nameparser.config.packs import load_packs
+        constants = load_packs(self.json, cache_dir=self.cache)
+        files = os.listdir(self.cache)
+        self.assertEqual(len(files), 1)
+        # the cache holds plain data, not a pickle
+        with open(os.path.join(self.cache, files[0])) as f:
+            self.assertEqual(json.load(f)['fingerprint'], constants.fingerprint())
+        cached = load_packs(self.json, cache_dir=self.cache)
+        self.assertEqual(cached.fingerprint(), constants.fingerprint())
+        self.assertIn('dean', cached.titles)
+        # a damaged cache file is rebuilt, and pickles are never loaded
+        with open(os.path.join(self.cache, files[0]), 'wb') as f:
+            f.write(pickle.dumps(constants))
+        self.assertEqual(load_packs(self.json, cache_dir=self.cache).fingerprint(), constants.fingerprint())
+        # so is a changed pack, under a new key
+        with open(self.json, 'w') as f:
+            f.write('{"titles": ["Dean"]}')
+        changed = load_packs(self.json, cache_dir=self.cache)
+        self.assertNotIn('bursar', changed.titles)
+        self.assertEqual(len(os.listdir(self.cache)), 2)
+
+    def test_cached_options(self):
+        from nameparser.config.packs import load_packs
+        with open(self.json, 'w') as f:
+            f.write('{"options": {"phonetic_encoders": ["soundex"], "capitalize_name": true}}')
+        constants = load_packs(self.json, cache_dir=self.cache)
+        cached = load_packs(self.json, cache_dir=self.cache)
+        self.assertEqual(cached.phonetic_encoders, ('soundex',))
+        self.assertTrue(cached.capitalize_name)
+        cached._fingerprint = None
+        self.assertEqual(cached.fingerprint(), constants.fingerprint())
+
+    def test_not_a_pack(self):
+        from nameparser.config.packs import load_packs
+        with open(self.json, 'w') as f:
+            f.write('["dean"]')
+        with self.assertRaises(ValueError):
+            load_packs(self.json, cache_dir=False)
+
+
 class NicknameTestCase(HumanNameTestBase):
     # https://code.google.com/p/python-nameparser/issues/detail?id=33
     def test_nickname_in_parenthesis(self):
@@ -2155,6 +2584,31 @@ class HumanNameCapitalizationTestCase(HumanNameTestBase):
         hn.capitalize()
         self.m(str(hn), 'Van Nguyen', hn)
 
+    def test_capitalization_cache_reused(self):
+        constants = Constants()
+        hn = HumanName("bob smith", constants)
+        hn.capitalize()
+        hn = HumanName("bob smith", constants)
+        hn.capitalize()
+        self.m(str(hn), 'Bob Smith', hn)
+        self.assertEqual(constants._capitalization_cache.stats()['hits'], 2)
+
+    def test_capitalization_cache_cleared_on_config_change(self):
+        constants = Constants()
+        hn = HumanName("bob smith", constants)
+        hn.capitalize()
+        constants.capitalization_exceptions['smith'] = 'SMITH'
+        hn = HumanName("bob smith", constants)
+        hn.capitalize()
+        self.m(str(hn), 'Bob SMITH', hn)
+
+    def test_capitalization_keeps_pieces(self):
+        hn = HumanName("juan de la vega")
+        pieces = len(hn.last_list)
+        hn.capitalize()
+        self.m(hn.last, 'de la Vega', hn)
+        self.assertEqual(len(hn.last_list), pieces)
+
 
 class HumanNameOutputFormatTests(HumanNameTestBase):
 
@@ -2279,6 +2733,33 @@ class HumanNameOutputFormatTests(HumanNameTestBase):
         # test cleanup
 
 
+    def test_formatter_matches_format_and_clean_up(self):
+        from nameparser.formatting import Formatter
+        formatter = Formatter("{title} {first} {middle} {last} {suffix} ({nickname})", Constants())
+        values = dict(title='', first='John', middle='', last='Doe', suffix='', nickname='')
+        self.assertEqual(formatter.format(values), "John Doe")
+        values['nickname'] = 'Johnny'
+        self.assertEqual(formatter.format(values), "John Doe (Johnny)")
+        self.assertEqual(len(formatter.templates), 2)
+        # values the clean up changes take the slow way
+        values['last'] = 'Doe  ,'
+        self.assertEqual(formatter.format(values), "John Doe , (Johnny)")
+
+    def test_formatter_render_many(self):
+        from nameparser.formatting import Formatter
+        formatter = Formatter("{last}, {first} {middle}")
+        names = [HumanName("John Doe"), HumanName("Jane Q Public"), HumanName("Jack 'Jackie' O'Brien")]
+        self.assertEqual(formatter.render_many(names), ["Doe, John", "Public, Jane Q", "O'Brien, Jack"])
+
+    def test_formatter_compiled_once_per_config(self):
+        hn = HumanName("John Doe")
+        self.assertTrue(hn.formatter(hn.string_format) is HumanName("Jane Doe").formatter(hn.string_format))
+        constants = Constants()
+        constants.empty_attribute_default = None
+        hn = HumanName("John Doe", constants)
+        self.assertEqual(hn.formatter(hn.string_format).empty_attribute_default, None)
+        self.m(str(hn), "John Doe", hn)
+
 class InitialsTestCase(HumanNameTestBase):
     def test_initials(self):
         hn = HumanName("Andrew Boris Petersen")
@@ -2300,6 +2781,30 @@ class InitialsTestCase(HumanNameTestBase):
         hn = HumanName("Doe, John A. Kenneth, Jr.")
         self.m(hn.initials(), "J. A. K. D.", hn)
 
+    def test_initials_recomputed_after_change(self):
+        hn = HumanName("John Doe")
+        self.m(hn.initials(), "J. D.", hn)
+        hn.last = "Smith"
+        self.m(hn.initials(), "J. S.", hn)
+        hn.full_name = "Bob van Dole"
+        self.assertEqual(hn.initials_list(), ["B", "D"])
+
+    def test_initials_recomputed_after_in_place_change(self):
+        hn = HumanName("John Quincy Smith")
+        self.m(hn.initials(), "J. Q. S.", hn)
+        hn.middle_list[0] = 'R'
+        self.m(hn.initials(), "J. R. S.", hn)
+        hn.last_list.append('Jones')
+        self.assertEqual(hn.initials_list(), ["J", "R", "S", "J"])
+
+    def test_initials_many(self):
+        parser = Parser()
+        names = ["John Doe", "Doe, John A. Kenneth, Jr.", HumanName("Bob van Dole"), "Jane de la Doe"]
+        self.assertEqual(parser.initials_many(names),
+                         [HumanName(n).initials() if not isinstance(n, HumanName) else n.initials()
+                          for n in names])
+        self.assertEqual(parser.initials_many(names, as_list=True)[1], ["J", "A", "K", "D"])
+
     def test_initials_format(self):
         hn = HumanName("Doe, John A. Kenneth, Jr.", initials_format="{first} {middle}")
         self.m(hn.initials(), "J. A. K.", hn)
@@ -2566,6 +3071,405 @@ TEST_NAMES = (
 )
 
 
+class SortingTests(HumanNameTestBase):
+
+    def test_sort_key_policies(self):
+        hn = HumanName("Vincent van Gogh")
+        self.assertEqual(hn.sort_key(), ('van gogh', 'vincent', '', ''))
+        self.assertEqual(hn.sort_key('ignore_prefixes'), ('gogh', 'vincent', '', '', 'van gogh'))
+        self.assertEqual(hn.sort_key(lambda name, key: key[3]), 'van gogh')
+        with self.assertRaises(ValueError):
+            hn.sort_key('unknown')
+
+    def test_sort_key_follows_changes(self):
+        constants = Constants()
+        hn = HumanName("Juan de la Vega", constants)
+        self.assertEqual(hn.sort_key('ignore_prefixes')[0], 'vega')
+        constants.prefixes.remove('la')
+        self.assertEqual(hn.sort_key('ignore_prefixes')[0], 'la vega')
+        hn.last = "Smith"
+        self.assertEqual(hn.sort_key('ignore_prefixes')[0], 'smith')
+
+    def test_sort_names(self):
+        from nameparser.sorting import sort_names
+        names = [HumanName(n) for n in ("Johannes Vermeer", "Vincent van Gogh", "frans hals", "Anna Hals")]
+        self.assertEqual([n.first for n in sort_names(names)],
+                         ["Anna", "frans", "Vincent", "Johannes"])
+        self.assertEqual([n.first for n in sort_names(names, policy='ignore_prefixes')],
+                         ["Vincent", "Anna", "frans", "Johannes"])
+        self.assertEqual([n.first for n in sort_names(names, reverse=True)],
+                         ["Johannes", "Vincent", "frans", "Anna"])
+
+
+class NameIndexTests(HumanNameTestBase):
+
+    def test_conjunctive_search(self):
+        from nameparser.index import NameIndex
+        index = NameIndex()
+        ids = index.add_many(["John Smith", "Dr. Jane Smith, PhD", "Bob Jones", HumanName("J. R. Jones Jr.")])
+        self.assertEqual(ids, [0, 1, 2, 3])
+        self.assertEqual(index.search(last='smith', first_initial='J'), [0, 1])
+        self.assertEqual(index.search(last='Smith', title='Dr.'), [1])
+        self.assertEqual(index.search(first_initial='j', suffix='jr'), [3])
+        self.assertEqual(index.search(last='Smith', first='Bob'), [])
+        self.assertEqual([n.first for n in index.find(last='jones')], ["Bob", "J."])
+        self.assertEqual(index.count('last', 'SMITH'), 2)
+        with self.assertRaises(ValueError):
+            index.search(middle='r')
+
+    def test_insert_and_delete(self):
+        from nameparser.index import NameIndex
+        index = NameIndex()
+        index.add("John Smith", 5)
+        index.add("Jane Smith", 2)
+        self.assertEqual(index.search(last='smith'), [2, 5])
+        self.assertEqual(index.add("Jim Smith"), 6)
+        index.remove(5)
+        self.assertTrue(5 not in index)
+        self.assertEqual(index.search(last='smith'), [2, 6])
+        index.add("Jane Doe", 2)
+        self.assertEqual(index.search(last='smith'), [6])
+        self.assertEqual(len(index), 2)
+        index.remove(6)
+        self.assertTrue('smith' not in index.postings['last'])
+        with self.assertRaises(KeyError):
+            index.remove(6)
+
+    def test_remove_changed_name(self):
+        from nameparser.index import NameIndex
+        index = NameIndex()
+        index.add_many(["John Smith", "Jane Jones", "Bob Jones"])
+        index[0].last = 'Jones'
+        index.remove(0)
+        self.assertEqual(index.search(last='jones'), [1, 2])
+        self.assertEqual(index.find(last='smith'), [])
+        self.assertEqual(index.search(first_initial='j'), [1])
+
+
+class BlockingKeysTests(HumanNameTestBase):
+
+    def test_soundex(self):
+        from nameparser.phonetics import soundex
+        self.assertEqual(soundex("Robert"), "R163")
+        self.assertEqual(soundex("Rupert"), "R163")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+        self.assertEqual(soundex("Pfister"), "P236")
+        self.assertEqual(soundex("Müller"), "M460")
+        self.assertEqual(soundex("123"), "")
+
+    def test_default_keys(self):
+        from nameparser.blocking import BlockingKeys
+        blocker = BlockingKeys()
+        self.assertEqual(blocker(HumanName("Bob van Dyke")),
+                         ['last_prefix=dyk', 'first_initial=b&last_soundex=D200',
+                          'first_name=robert&last_soundex=D200'])
+        self.assertEqual(blocker("Robert Van Dijk")[2], 'first_name=robert&last_soundex=D200')
+        self.assertEqual(blocker("Smith"), [])
+
+    def test_configured_keys(self):
+        from nameparser.blocking import BlockingKeys
+
+        def middle_initial(parts, blocker):
+            return parts['middle'][:1]
+
+        blocker = BlockingKeys(keys=['last_prefix', ('first_name', middle_initial)],
+                               prefix_length=5, nicknames={}, ignore_prefixes=False)
+        self.assertEqual(blocker("Bob Q. van Dyke"), ['last_prefix=van d', 'first_name=bob&middle_initial=q'])
+        with self.assertRaises(ValueError):
+            BlockingKeys(keys=['last_metaphone'])
+
+    def test_block(self):
+        from nameparser.blocking import BlockingKeys
+        blocks = BlockingKeys().block(["Bob van Dyke", "Robert Van Dijk", "Jane Smith"])
+        self.assertEqual([n.first for n in blocks['first_name=robert&last_soundex=D200']], ["Bob", "Robert"])
+        self.assertEqual(len(blocks['last_prefix=smi']), 1)
+
+
+class PhoneticsTests(HumanNameTestBase):
+
+    def test_double_metaphone(self):
+        from nameparser.phonetics import double_metaphone
+        self.assertEqual(double_metaphone("Schmidt"), ('XMT', 'SMT'))
+        self.assertEqual(double_metaphone("Smith"), ('SM0', 'XMT'))
+        self.assertEqual(double_metaphone("Thompson"), ('TMPS', 'TMPS'))
+        self.assertEqual(double_metaphone("Michael"), ('MKL', 'MXL'))
+        self.assertEqual(double_metaphone("Xavier"), ('SF', 'SFR'))
+        self.assertEqual(double_metaphone("Knight"), ('NT', 'NT'))
+        self.assertEqual(double_metaphone("Gallegos"), ('KLKS', 'KKS'))
+        self.assertEqual(double_metaphone("Alexander", length=6), ('ALKSNT', 'ALKSNT'))
+        self.assertEqual(double_metaphone("..."), ('', ''))
+
+    def test_codes_computed_while_parsing(self):
+        constants = Constants()
+        hn = HumanName("Dr. Bob Schmidt", constants)
+        self.assertEqual(hn.phonetic_codes, {})
+        self.assertEqual(hn.phonetic('last', 'soundex'), 'S530')
+        constants.phonetic_encoders = ('soundex', 'double_metaphone')
+        hn = HumanName("Dr. Bob Schmidt", constants)
+        self.assertEqual(hn.phonetic_codes, {
+            'first_soundex': 'B100', 'first_double_metaphone': ('PP', 'PP'),
+            'last_soundex': 'S530', 'last_double_metaphone': ('XMT', 'SMT'),
+        })
+        constants.phonetic_encoders = ('nysiis',)
+        with self.assertRaises(ValueError):
+            HumanName("Bob Schmidt", constants)
+
+    def test_memoized(self):
+        from nameparser.phonetics import Memoized, soundex
+        encoder = Memoized(soundex, maxsize=2)
+        self.assertEqual(encoder("Robert"), "R163")
+        self.assertEqual(encoder("Robert"), "R163")
+        self.assertEqual(len(encoder.memo), 1)
+        encoder("Rupert")
+        encoder("Rubin")
+        self.assertEqual(len(encoder.memo), 1)
+
+
+class LSHTests(HumanNameTestBase):
+
+    def test_shingles(self):
+        from nameparser.lsh import MinHasher
+        hasher = MinHasher()
+        self.assertEqual(sorted(hasher.shingles(HumanName("Dr. Bo Smith, Jr."))), [
+            'first0:^b', 'first0:bo', 'first0:o$',
+            'last0:^s', 'last0:h$', 'last0:it', 'last0:mi', 'last0:sm', 'last0:th'])
+        weighted = MinHasher(weights={'suffix': 2, 'middle': 0})
+        shingles = weighted.shingles(HumanName("Bo B. Smith, Jr."))
+        self.assertTrue('suffix1:jr' in shingles)
+        self.assertFalse('middle0:^b' in shingles)
+        self.assertEqual(hasher.signature(HumanName("")), None)
+
+    def test_signatures(self):
+        from nameparser.lsh import MinHasher, similarity
+        hasher = MinHasher()
+        a = hasher.signature(HumanName("John Smith"))
+        self.assertEqual(len(a), 64)
+        self.assertEqual(a, MinHasher().signature(HumanName("Dr. john smith")))
+        self.assertNotEqual(a, MinHasher(seed=2).signature(HumanName("John Smith")))
+        self.assertTrue(similarity(a, hasher.signature(HumanName("Jon Smith"))) > 0.4)
+        self.assertTrue(similarity(a, hasher.signature(HumanName("Jane Doe"))) < 0.2)
+
+    def test_clusters(self):
+        from nameparser.lsh import LSHIndex
+        index = LSHIndex()
+        self.assertEqual(index.add_many(["Jon A. Smith", "John Smith Jr.", "Jane Doe"]), [0, 1, 2])
+        self.assertEqual(index.add("Jane Q. Doe", record_id=10), 10)
+        index.add("Smith")
+        self.assertEqual(index.clusters(), [[0, 1], [2, 10]])
+        self.assertEqual(index.clusters(min_size=1)[-1], [11])
+        self.assertEqual(index.candidates("Jon Smith"), [0, 1])
+        self.assertEqual(index.candidates("Xavier Quint"), [])
+        self.assertEqual(index[10].middle, "Q.")
+        with self.assertRaises(ValueError):
+            index.add("Bob Jones", record_id=0)
+        with self.assertRaises(ValueError):
+            LSHIndex(bands=10)
+
+
+class CompareTests(HumanNameTestBase):
+
+    def test_compare(self):
+        from nameparser.compare import compare
+        self.assertEqual(compare(HumanName("Dr. John Smith"), HumanName("john smith")), 1.0)
+        self.assertEqual(compare(HumanName("J Smith"), HumanName("J. Smith")), 1.0)
+        self.assertEqual(compare(HumanName("John A. Smith"), HumanName("J. Smith")), 0.855)
+        self.assertEqual(compare(HumanName("Bob van Dyke"), HumanName("Bob Dyke")), 0.9)
+        self.assertEqual(compare(HumanName("John Smith"), HumanName("John Smyth")), 0.0)
+        self.assertEqual(compare(HumanName("John Smith"), HumanName("Jane Smith")), 0.0)
+        self.assertEqual(compare(HumanName("John Adam Smith"), HumanName("John Brian Smith")), 0.0)
+        self.assertEqual(compare(HumanName("John A. Smith"), HumanName("John Adam Smith")), 0.97)
+
+    def test_suffix_conflicts(self):
+        from nameparser.compare import compare, generations
+        self.assertEqual(generations(HumanName("John Smith, Jnr., PhD")), set(['jr']))
+        self.assertEqual(generations(HumanName("John Smith, Esq.")), set())
+        self.assertEqual(compare(HumanName("John Smith Jr."), HumanName("John Smith Sr.")), 0.0)
+        self.assertEqual(compare(HumanName("John Smith II"), HumanName("John Smith III")), 0.0)
+        self.assertEqual(compare(HumanName("John Smith Jr."), HumanName("John Smith")), 1.0)
+        self.assertEqual(compare(HumanName("John Smith III"), HumanName("John Smith, PhD")), 1.0)
+
+    def test_compare_many(self):
+        from nameparser.compare import compare_many
+        self.assertEqual(compare_many([("John Smith", "J. Smith"), ("John Smith", HumanName("Jane Doe"))]),
+                         [0.93, 0.0])
+
+
+class NameSearchTests(HumanNameTestBase):
+
+    def test_search(self):
+        from nameparser.search import NameSearch
+        corpus = NameSearch()
+        corpus.add_many(["John Smith", "Jon Smyth", "J. Schmidt", "Jane Doe", "John A. Smith Sr."])
+        self.assertEqual(corpus.search("John Smith", k=3), [(0, 1.0), (4, 0.925), (2, 0.78)])
+        self.assertEqual(corpus.search("John Smith Jr.", k=2), [(0, 1.0), (2, 0.78)])
+        self.assertEqual([record_id for record_id, score in corpus.search("Smith")], [0, 4, 1, 2])
+        self.assertEqual(corpus.search("Xavier Quint"), [])
+        self.assertEqual(corpus.search(""), [])
+
+    def test_incremental_updates(self):
+        from nameparser.search import NameSearch
+        corpus = NameSearch()
+        corpus.add("John Smith")
+        corpus.add("Jane Doe", record_id=5)
+        self.assertEqual(corpus.add("Jane Roe"), 6)
+        self.assertEqual(corpus.search("Jane Doe", k=1), [(5, 1.0)])
+        corpus.add("Jane Poe", record_id=5)
+        self.assertEqual(corpus.search("Jane Doe"), [])
+        self.assertEqual(corpus.search("Jane Poe", k=1), [(5, 1.0)])
+        corpus.remove(0)
+        self.assertEqual(corpus.search("John Smith"), [])
+        self.assertFalse('smith' in corpus._lasts.counts)
+        self.assertEqual(len(corpus), 2)
+        with self.assertRaises(KeyError):
+            corpus.remove(0)
+
+    def test_query_parsed_with_same_constants(self):
+        from nameparser.search import NameSearch
+        constants = Constants()
+        constants.titles.add('capt')
+        corpus = NameSearch(parser=Parser(constants))
+        corpus.add("Capt Bob Smith")
+        self.assertEqual(corpus[0].title, "Capt")
+        self.assertEqual(corpus.search("Capt Bob Smith"), [(0, 1.0)])
+
+
+class ConfigRegistryTests(HumanNameTestBase):
+
+    def test_apply_layer(self):
+        constants = Constants().apply_layer({
+            'titles': ['Dean'],
+            'suffix_acronyms': {'add': ['xyz'], 'remove': ['phd']},
+            'capitalization_exceptions': {'mcdonald': 'McDonald'},
+            'regexes': {'emoji': False},
+            'options': {'string_format': '{first} {last}'},
+        })
+        self.assertTrue('dean' in constants.titles)
+        self.assertTrue('xyz' in constants.suffix_acronyms)
+        self.assertFalse('phd' in constants.suffix_acronyms)
+        self.assertEqual(constants.capitalization_exceptions['mcdonald'], 'McDonald')
+        self.assertEqual(constants.regexes.emoji, False)
+        self.assertEqual(str(HumanName("Dean Robert Johns", constants)), "Robert Johns")
+        self.assertRaises(ValueError, Constants().apply_layer, {'title': ['dean']})
+        self.assertRaises(ValueError, Constants().apply_layer, {'options': {'encoding': 'latin-1'}})
+
+    def test_apply_layer_rejects_strings(self):
+        from nameparser.config.registry import ConfigRegistry
+        for layer in ({'titles': 'dean'}, {'titles': {'add': 'dean'}},
+                      {'titles': {'append': ['dean']}}, {'regexes': ['emoji']}):
+            constants = Constants()
+            self.assertRaises(ValueError, constants.apply_layer, layer)
+            self.assertNotIn('d', constants.titles)
+            self.assertRaises(ValueError, ConfigRegistry().get, layer)
+
+    def test_layer_fingerprint_of_sets(self):
+        from nameparser.config.registry import ConfigRegistry, layer_fingerprint
+        self.assertEqual(layer_fingerprint({'titles': set(['dean', 'bursar'])}),
+                         layer_fingerprint({'titles': ['bursar', 'dean']}))
+        constants = ConfigRegistry().get({'titles': frozenset(['dean'])})
+        self.assertIn('dean', constants.titles)
+        self.assertRaises(TypeError, layer_fingerprint, {'titles': [object()]})
+
+    def test_freeze(self):
+        constants = Constants().freeze()
+        self.assertTrue(constants.frozen)
+        self.assertTrue(constants.thread_safe)
+        self.assertRaises(TypeError, constants.titles.add, 'dean')
+        self.assertRaises(TypeError, constants.capitalization_exceptions.update, {'a': 'A'})
+        self.assertRaises(TypeError, setattr, constants, 'string_format', '{first}')
+        self.assertRaises(TypeError, constants.attach_lexicon, 'titles', 'titles.lex')
+        hn = HumanName("Lt.Gov. John Doe", constants)
+        self.m(hn.title, "Lt.Gov.", hn)
+        self.assertFalse(Constants().frozen)
+
+    def test_registry(self):
+        from nameparser.config.registry import ConfigRegistry, layer_fingerprint
+        registry = ConfigRegistry()
+        constants = registry.get({'titles': ['dean'], 'options': {'string_format': '{first}'}})
+        self.assertTrue(constants.frozen)
+        self.assertTrue(registry.get({'options': {'string_format': '{first}'}, 'titles': ['dean']}) is constants)
+        self.assertTrue(registry.get(key=layer_fingerprint({'titles': ['dean'], 'options': {'string_format': '{first}'}})) is constants)
+        self.assertTrue(registry.get() is not constants)
+        self.assertTrue({'titles': ['dean'], 'options': {'string_format': '{first}'}} in registry)
+        self.assertEqual(registry.stats()['builds'], 2)
+        self.assertEqual(registry.stats()['hits'], 2)
+
+    def test_registry_evicts_least_recently_used(self):
+        from nameparser.config.registry import ConfigRegistry, estimate_size
+        size = estimate_size(Constants().apply_layer({'titles': ['a']}).freeze())
+        registry = ConfigRegistry(max_bytes=size * 2)
+        first = registry.get({'titles': ['a']})
+        registry.get({'titles': ['b']})
+        self.assertTrue(registry.get({'titles': ['a']}) is first)
+        registry.get({'titles': ['c']})
+        self.assertEqual(registry.evictions, 1)
+        self.assertTrue({'titles': ['a']} in registry)
+        self.assertFalse({'titles': ['b']} in registry)
+        self.assertTrue(registry.size <= size * 2)
+
+    def test_registry_builds_outside_lock(self):
+        import threading
+        from nameparser.config import registry as registry_module
+        registry = registry_module.ConfigRegistry()
+        cached = registry.get({'titles': ['a']})
+        building = threading.Event()
+        release = threading.Event()
+
+        class SlowConstants(Constants):
+            def apply_layer(self, layer):
+                building.set()
+                release.wait(5)
+                return super(SlowConstants, self).apply_layer(layer)
+
+        results = []
+        registry_module.Constants = SlowConstants
+        try:
+            threads = [threading.Thread(target=lambda: results.append(registry.get({'titles': ['b']})))
+                       for i in range(2)]
+            for thread in threads:
+                thread.start()
+            building.wait(5)
+            # a cached config is returned while another one is being built
+            self.assertTrue(registry.get({'titles': ['a']}) is cached)
+            self.assertFalse(release.is_set())
+            release.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            registry_module.Constants = Constants
+            release.set()
+        self.assertTrue(results[0] is results[1])
+        self.assertTrue(registry.get({'titles': ['b']}) is results[0])
+        self.assertEqual(registry.stats()['builds'], 2)
+        self.assertEqual(len(registry), 2)
+
+    def test_registry_clear(self):
+        from nameparser.config.registry import ConfigRegistry
+        registry = ConfigRegistry()
+        registry.get({'titles': ['a']})
+        registry.clear()
+        self.assertEqual(len(registry), 0)
+        self.assertEqual(registry.stats()['size'], 0)
+        self.assertEqual(registry.stats()['builds'], 0)
+
+    def test_estimate_size_counts_tuple_entries(self):
+        from nameparser.config.registry import estimate_size
+        pattern = 'x' * 10000
+        constants = Constants().apply_layer({'capitalization_exceptions': {'zz': pattern}})
+        self.assertTrue(estimate_size(constants) - estimate_size(Constants()) >= len(pattern))
+        constants = Constants()
+        constants.regexes['long'] = re.compile(pattern)
+        self.assertTrue(estimate_size(constants) - estimate_size(Constants()) >= len(pattern))
+
+    def test_registry_config_kept_by_pickles(self):
+        from nameparser.config.registry import ConfigRegistry
+        registry = ConfigRegistry()
+        constants = registry.get({'titles': ['bursar']})
+        hn = pickle.loads(pickle.dumps(HumanName("Bursar Robert Johns", constants)))
+        self.assertTrue(hn.C is constants)
+        self.assertTrue(hn.C.frozen)
+        self.m(hn.title, "Bursar", hn)
+
+
 class HumanNameVariationTests(HumanNameTestBase):
     # test automated variations of names in TEST_NAMES.
     # Helps test that the 3 code trees work the same
@@ -2603,6 +3507,238 @@ class HumanNameVariationTests(HumanNameTestBase):
                     self.m(getattr(hn, attr), getattr(suffixcomma, attr), hn)
 
 
+class ParserTests(HumanNameTestBase):
+
+    def test_parse_matches_human_name(self):
+        parser = Parser()
+        for name in HumanNameVariationTests.TEST_NAMES:
+            self.assertEqual(parser.parse(name).as_dict(), HumanName(name).as_dict())
+
+    def test_own_config_shared_by_results(self):
+        parser = Parser(None)
+        self.assertTrue(parser.C is not HumanName.C)
+        parser.C.titles.add('dean')
+        results = parser.parse_many(["Dean Robert Johns", b"Dean Sam Smith"])
+        self.assertEqual([hn.title for hn in results], ["Dean", "Dean"])
+        self.assertEqual([hn.first for hn in results], ["Robert", "Sam"])
+        self.assertTrue(all(hn.C is parser.C for hn in results))
+        self.assertTrue(all(hn.has_own_config for hn in results))
+
+    def test_formats_passed_to_results(self):
+        parser = Parser(string_format="{last}, {first}", initials_delimiter="-")
+        hn = parser.parse("John Doe")
+        self.assertEqual(str(hn), "Doe, John")
+        self.assertEqual(hn.initials(), "J- D-")
+        hn.full_name = "Jane Smith"
+        self.assertEqual(str(hn), "Smith, Jane")
+
+    def test_name_class(self):
+        class LastFirstName(HumanName):
+            def post_process(self):
+                super(LastFirstName, self).post_process()
+                self.last_list = [p.upper() for p in self.last_list]
+
+        hn = Parser(name_class=LastFirstName).parse("John Doe")
+        self.assertTrue(isinstance(hn, LastFirstName))
+        self.m(hn.last, "DOE", hn)
+
+
+class BatchParsingTests(HumanNameTestBase):
+
+    def test_matches_parse_many(self):
+        from nameparser.parser import TokenTable
+        parser = Parser(None)
+        names = list(HumanNameVariationTests.TEST_NAMES) * 2
+        table = TokenTable()
+        batch = parser.parse_batch(names, table)
+        expected = Parser(None).parse_many(names)
+        self.assertEqual([hn.as_dict() for hn in batch], [hn.as_dict() for hn in expected])
+        self.assertTrue(all(type(hn) is HumanName for hn in batch))
+        self.assertTrue(0 < len(table) < sum(len(n.split()) for n in names))
+
+    def test_tokens_classified_once(self):
+        from nameparser.parser import TokenTable, TITLE, ROOTNAME
+        calls = []
+
+        class CountingName(HumanName):
+            def is_title(self, value):
+                calls.append(value)
+                return super(CountingName, self).is_title(value)
+
+        table = TokenTable()
+        results = Parser(name_class=CountingName).parse_batch(["Dr. John Doe", "Dr. Jane Doe"], table)
+        self.assertEqual(calls.count("Dr."), 1)
+        self.assertEqual(calls.count("Doe"), 1)
+        self.m(results[1].title, "Dr.", results[1])
+        self.assertTrue(table.classes[table.ids["Dr."]] & TITLE)
+        self.assertTrue(table.classes[table.ids["Jane"]] & ROOTNAME)
+        self.assertTrue(isinstance(results[0], CountingName))
+
+
+class PlanCacheTests(HumanNameTestBase):
+
+    def test_same_shape_reuses_plan(self):
+        from nameparser.parser import PlanCache
+        cache = PlanCache()
+
+        class CachedName(HumanName):
+            plan_cache = cache
+
+        hn = CachedName("Mrs. Jane Smith")
+        self.assertEqual(cache.stats()['misses'], 1)
+        hn = CachedName("Mr. Bob Dole")
+        self.m(hn.title, "Mr.", hn)
+        self.m(hn.first, "Bob", hn)
+        self.m(hn.last, "Dole", hn)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_bounded(self):
+        from nameparser.parser import PlanCache
+        cache = PlanCache(maxsize=2)
+        cache.get('a', lambda sig: 1)
+        cache.get('b', lambda sig: 2)
+        cache.get('a', lambda sig: 1)
+        cache.get('c', lambda sig: 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(sorted(cache.plans), ['a', 'c'])
+        cache.clear()
+        self.assertEqual(cache.stats()['hits'], 0)
+        self.assertEqual(len(cache), 0)
+
+    def test_shared_by_threads(self):
+        import threading
+        from nameparser.parser import PlanCache
+        cache = PlanCache(maxsize=8)
+        errors = []
+
+        def lookup(seed):
+            try:
+                for i in range(20000):
+                    signature = (seed * 7 + i) % 50
+                    if cache.get(signature, lambda sig: sig * 2) != signature * 2:
+                        errors.append(signature)
+            except Exception as e:
+                errors.append(e)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=lookup, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        self.assertTrue(len(cache) <= 8)
+        self.assertEqual(cache.hits + cache.misses, 8 * 20000)
+
+    def test_not_used_in_thread_safe_mode(self):
+        from nameparser.parser import PlanCache
+        cache = PlanCache()
+
+        class CachedName(HumanName):
+            plan_cache = cache
+
+        constants = Constants()
+        constants.thread_safe = True
+        hn = CachedName("Dr. John Doe", constants)
+        self.m(hn.last, "Doe", hn)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 0)
+
+
+    def test_suffix_tail(self):
+        from nameparser.parser import suffix_tail, SUFFIX, TITLE
+        self.assertEqual(suffix_tail(()), 0)
+        self.assertEqual(suffix_tail((0, 0)), 2)
+        self.assertEqual(suffix_tail((0, SUFFIX, 0, SUFFIX, SUFFIX)), 3)
+        self.assertEqual(suffix_tail((SUFFIX | TITLE, SUFFIX)), 0)
+
+    def test_long_suffix_runs(self):
+        hn = HumanName("John Smith Jr MD PhD MBA CPA CFA")
+        self.m(hn.last, "Smith", hn)
+        self.m(hn.suffix, "Jr, MD, PhD, MBA, CPA, CFA", hn)
+        hn = HumanName("John Smith Jr MD Bob PhD MBA")
+        self.m(hn.middle, "Smith Jr MD", hn)
+        self.m(hn.last, "Bob", hn)
+        self.m(hn.suffix, "PhD, MBA", hn)
+
+
+class ThreadSafeModeTests(HumanNameTestBase):
+
+    def test_does_not_learn_into_config(self):
+        constants = Constants()
+        constants.thread_safe = True
+        hn = HumanName("Lt.Gov. John Doe", constants)
+        self.m(hn.title, "Lt.Gov.", hn)
+        self.m(hn.first, "John", hn)
+        hn = HumanName("Mr. and Mrs. John Doe", constants)
+        self.m(hn.title, "Mr. and Mrs.", hn)
+        self.assertNotIn('lt.gov', constants.titles)
+        self.assertNotIn('mr. and mrs', constants.titles)
+        self.assertEqual(constants._pst, None)
+
+    def test_learns_into_config_by_default(self):
+        constants = Constants()
+        HumanName("Lt.Gov. John Doe", constants)
+        self.assertIn('lt.gov', constants.titles)
+
+    def test_learned_pieces_match_serial_results(self):
+        import random
+        words = ["John", "Von", "bin", "de", "Jr", "Hon.", "Lt.Gov.", "Mr.", "and", "Mrs.",
+                 "2nd", "III", "Smith", "Dr.", "of", "the", "J.", "Doe,", "PhD", "y"]
+        generator = random.Random(3)
+        names = ["Von bin Jr Hon. Hon. Lt.Gov. 2nd", "de Lt.Gov. Lt.Gov. 2nd"]
+        names.extend(" ".join(generator.choice(words) for i in range(generator.randint(2, 7)))
+                     for j in range(500))
+        constants = Constants()
+        constants.thread_safe = True
+        for name in names:
+            self.assertEqual(HumanName(name, constants).as_dict(), HumanName(name, None).as_dict(), name)
+        hn = HumanName("Von bin Jr Hon. Hon. Lt.Gov. 2nd", constants)
+        self.m(hn.first, "Von bin", hn)
+
+    def test_iteration_does_not_use_shared_cursor(self):
+        hn = HumanName("Dr. John Doe")
+        it1, it2 = iter(hn), iter(hn)
+        self.assertEqual(next(it1), "Dr.")
+        self.assertEqual(list(it2), ["Dr.", "John", "Doe"])
+        self.assertEqual(list(it1), ["John", "Doe"])
+
+    def test_parallel_threads_match_serial_results(self):
+        import threading
+        names = list(HumanNameVariationTests.TEST_NAMES)
+        expected = [HumanName(n, None).as_dict() for n in names]
+        constants = Constants()
+        constants.thread_safe = True
+        before = [len(getattr(constants, c)) for c in ('titles', 'conjunctions', 'suffix_not_acronyms')]
+        errors = []
+
+        def work():
+            for _ in range(5):
+                results = [HumanName(n, constants).as_dict() for n in names]
+                if results != expected:
+                    errors.append(results)
+
+        threads = [threading.Thread(target=work) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        after = [len(getattr(constants, c)) for c in ('titles', 'conjunctions', 'suffix_not_acronyms')]
+        self.assertEqual(before, after)
+
+
+if sys.version_info >= (3, 7):
+    # async syntax, so kept out of this module for Python 2
+    from tests_async import AsyncParsingTests  # noqa: F401
+
+
 if __name__ == '__main__':
     import sys
 
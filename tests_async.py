@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of :py:mod:`nameparser.aio`, which needs Python 3.7 or later. They
+are run by ``python tests.py``.
+"""
+from __future__ import unicode_literals
+import asyncio
+import unittest
+
+from nameparser import HumanName
+from nameparser.config import Constants
+
+
+class AsyncParsingTests(unittest.TestCase):
+
+    def collect(self, names, **kwargs):
+        from nameparser.aio import aparse_many
+
+        async def run():
+            return [hn async for hn in aparse_many(names, **kwargs)]
+        return asyncio.run(run())
+
+    def test_results_in_input_order(self):
+        names = ["John Doe", "Dr. Juan Q. Xavier de la Vega III", "Doe, Jane"] * 5
+        results = self.collect(names, batch_size=2)
+        self.assertEqual(len(results), len(names))
+        self.assertEqual([hn.last for hn in results], [HumanName(n).last for n in names])
+
+    def test_async_iterable_input(self):
+        async def names():
+            for name in ["John Doe", "Jane Smith", "Bob Dole"]:
+                yield name
+        results = self.collect(names(), batch_size=2)
+        self.assertEqual([hn.first for hn in results], ["John", "Jane", "Bob"])
+
+    def test_own_config_shared_by_batch(self):
+        constants = Constants()
+        constants.titles.add('dean')
+        results = self.collect(["Dean Robert Johns", "Dean Sam Smith"], constants=constants)
+        self.assertEqual([hn.title for hn in results], ["Dean", "Dean"])
+        self.assertTrue(all(hn.C is constants for hn in results))
+
+    def test_early_exit_cancels_pending_batches(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from nameparser.aio import aparse_many
+        consumed = []
+
+        def names():
+            for i in range(1000):
+                consumed.append(i)
+                yield "John Doe"
+
+        async def run():
+            with ThreadPoolExecutor(1) as executor:
+                async for hn in aparse_many(names(), executor=executor, batch_size=10, max_pending=2):
+                    break
+        asyncio.run(run())
+        self.assertEqual(len(consumed), 20)
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            self.collect(["John Doe"], batch_size=0)
+
+    def test_process_pool(self):
+        from concurrent.futures import ProcessPoolExecutor
+        # the workers learn "Mr. and Mrs." into their own module config
+        names = ["John Doe", "Mr. and Mrs. John Doe", "Lt.Gov. Bob Smith"]
+        with ProcessPoolExecutor(2) as executor:
+            results = self.collect(names, executor=executor, batch_size=1)
+        self.assertEqual([hn.title for hn in results[1:]], ["Mr. and Mrs.", "Lt.Gov."])
+        self.assertEqual([hn.last for hn in results], ["Doe", "Doe", "Smith"])
+
+
+if __name__ == '__main__':
+    unittest.main()